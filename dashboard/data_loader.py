@@ -12,7 +12,9 @@ on first access using a lightweight ``requests``-based downloader
 
 from __future__ import annotations
 
+import json
 import os
+import sys
 from pathlib import Path
 
 import duckdb
@@ -28,6 +30,13 @@ import yaml
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 _CONFIG_PATH = _PROJECT_ROOT / "config.yaml"
 
+# Rows of the (randomly ordered) SHAP sample shown in plots and the instance picker.
+_SHAP_DISPLAY_ROWS = 5000
+
+# Make the ``pricepoint`` package importable from the dashboard pages.
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
 # Google Drive file IDs — used as fallback when files aren't present on disk.
 _GDRIVE_IDS: dict[str, str] = {
     "canonical_products_lite.parquet": "19YDdO6nqpm2Va2JDxSRAljvFHUJH1qL9",
@@ -158,30 +167,125 @@ def get_raw_features_df() -> pd.DataFrame:
 # Model
 
 
-@st.cache_resource
+def _current_manifest() -> dict | None:
+    """Manifest of the model registry's current version, or ``None`` without a registry.
+
+    The pointer is re-read on every call (it is a few bytes), so the
+    loaders below, cached on ``manifest["version"]``, follow a promote or
+    rollback without restarting the app.
+    """
+    cfg = _load_config()
+    registry_dir = _resolve(cfg["model"].get("registry_dir", "models/registry"))
+    pointer = registry_dir / "current.json"
+    if not pointer.exists():
+        return None
+    version = json.loads(pointer.read_text(encoding="utf-8"))["version"]
+    if version is None:
+        return None
+    manifest = json.loads((registry_dir / version / "manifest.json").read_text(encoding="utf-8"))
+    return {**manifest, "version": version}
+
+
+def _current_version() -> str | None:
+    manifest = _current_manifest()
+    return None if manifest is None else manifest["version"]
+
+
 def load_model():
-    """Load the trained LightGBM model from disk."""
+    """Load the trained LightGBM model from disk.
+
+    Prefers the model registry's current native text model, which loads
+    without unpickling; falls back to the newer of the trainers' text
+    and joblib artifacts.
+    """
+    return _load_model(_current_version())
+
+
+@st.cache_resource
+def _load_model(version: str | None):
     cfg = _load_config()
+    if version is not None:
+        import lightgbm as lgb
+
+        registry_dir = _resolve(cfg["model"].get("registry_dir", "models/registry"))
+        return lgb.Booster(model_file=str(registry_dir / version / "model.txt"))
+
     model_path = _resolve(cfg["model"]["output_dir"]) / cfg["model"]["model_filename"]
+    native_path = model_path.with_suffix(".txt")
+    if native_path.exists() and (
+        not model_path.exists() or native_path.stat().st_mtime >= model_path.stat().st_mtime
+    ):
+        import lightgbm as lgb
+
+        return lgb.Booster(model_file=str(native_path))
     _ensure_file(model_path, "price_predictor_lgbm.joblib")
     return joblib.load(model_path)
 
 
+def load_feature_vector_builder(model):
+    """Precompiled input-row builder for the loaded model (built once per version)."""
+    manifest = _current_manifest()
+    categories = {} if manifest is None else manifest.get("categories", {})
+    return _load_feature_vector_builder(model, None if manifest is None else manifest["version"], categories)
+
+
+@st.cache_resource
+def _load_feature_vector_builder(_model, version: str | None, categories: dict[str, list[str]]):
+    from pricepoint.feature_vector import FeatureVectorBuilder
+
+    cfg = _load_config()
+    return FeatureVectorBuilder.for_model(_model, cfg["training"]["categorical_features"], categories)
+
+
+@st.cache_resource
+def load_price_cube():
+    """Memory-mapped price cube, or ``None`` when ``run.py cube`` has not been run."""
+    from pricepoint.price_tensor import PriceTensor
+
+    cfg = _load_config()
+    cube_dir = _resolve(cfg["price_cube"]["output_dir"])
+    if not (cube_dir / "index.json").exists():
+        return None
+    return PriceTensor.load(cube_dir)
+
+
+def load_explainer(model):
+    """On-demand SHAP explainer with an LRU cache, shared across sessions."""
+    return _load_explainer(model, _current_version())
+
+
+@st.cache_resource
+def _load_explainer(_model, version: str | None):
+    from pricepoint.explain import InstanceExplainer, model_fingerprint
+
+    cfg = _load_config()
+    booster = getattr(_model, "booster_", _model)
+    return InstanceExplainer(
+        booster, version or model_fingerprint(booster), cfg["shap"].get("explain_cache_size", 4096)
+    )
+
+
 # SHAP pre-computed artifacts
 
 
 @st.cache_data(ttl=3600)
 def load_shap_sample_data() -> pd.DataFrame | None:
-    """Load pre-computed SHAP sample data."""
+    """Load the first ``_SHAP_DISPLAY_ROWS`` pre-computed SHAP sample rows.
+
+    The sample is already in random order, so its head is a random subset.
+    """
+    import pyarrow.parquet as pq
+
     cfg = _load_config()
     path = _resolve(cfg["shap"]["output_dir"]) / "shap_sample_data.parquet"
     _ensure_file(path, "shap_sample_data.parquet")
-    return pd.read_parquet(path, engine="pyarrow")
+    batch = next(pq.ParquetFile(path).iter_batches(batch_size=_SHAP_DISPLAY_ROWS), None)
+    return None if batch is None else batch.to_pandas()
 
 
 @st.cache_data(ttl=3600)
 def load_shap_values() -> tuple[np.ndarray | None, float | None]:
-    """Load pre-computed SHAP values and base value."""
+    """Load pre-computed SHAP values (matching ``load_shap_sample_data``) and base value."""
     cfg = _load_config()
     shap_dir = _resolve(cfg["shap"]["output_dir"])
 
@@ -191,13 +295,35 @@ def load_shap_values() -> tuple[np.ndarray | None, float | None]:
     _ensure_file(shap_file, "shap_values.npy")
     _ensure_file(base_file, "shap_base_value.txt")
 
-    shap_values = np.load(shap_file)
+    shap_values = np.array(np.load(shap_file, mmap_mode="r")[:_SHAP_DISPLAY_ROWS])
     with open(base_file, "r") as f:
         base_value = float(f.read().strip())
 
     return shap_values, base_value
 
 
+@st.cache_data(ttl=3600)
+def load_shap_summary() -> pd.DataFrame | None:
+    """Global SHAP importance and per-feature statistics over the full sample."""
+    cfg = _load_config()
+    path = _resolve(cfg["shap"]["output_dir"]) / "shap_summary.parquet"
+    if not path.exists():
+        return None
+    return pd.read_parquet(path, engine="pyarrow")
+
+
+@st.cache_resource
+def load_shap_interactions():
+    """Top-K SHAP interaction summaries, or ``None`` before ``precompute --interactions``."""
+    from pricepoint.explain import InteractionSummary
+
+    cfg = _load_config()
+    path = _resolve(cfg["shap"]["output_dir"]) / "shap_interactions.npz"
+    if not path.exists():
+        return None
+    return InteractionSummary.load(path)
+
+
 # Market dynamics pre-computed artifacts
 
 
@@ -217,4 +343,48 @@ def load_price_leadership() -> pd.DataFrame | None:
     cfg = _load_config()
     path = _resolve(cfg["market_dynamics"]["output_dir"]) / "price_leadership.parquet"
     _ensure_file(path, "price_leadership.parquet")
-    return pd.read_parquet(path, engine="pyarrow")
\ No newline at end of file
+    return pd.read_parquet(path, engine="pyarrow")
+
+
+@st.cache_data(ttl=3600)
+def load_leadership_timeline() -> pd.DataFrame | None:
+    """Leadership pairs per calendar window, or ``None`` before ``run.py precompute``."""
+    cfg = _load_config()
+    path = _resolve(cfg["market_dynamics"]["output_dir"]) / "leadership_timeline.parquet"
+    if not path.exists():
+        return None
+    return pd.read_parquet(path, engine="pyarrow")
+
+
+@st.cache_data(ttl=3600)
+def load_price_leadership_window() -> tuple[pd.DataFrame | None, int]:
+    """Leadership over the last ``leadership_window_days`` and that window length.
+
+    The frame is ``None`` before ``run.py precompute --incremental``.
+    """
+    cfg = _load_config()
+    window_days = cfg["market_dynamics"]["leadership_window_days"]
+    path = _resolve(cfg["market_dynamics"]["output_dir"]) / "price_leadership_window.parquet"
+    if not path.exists():
+        return None, window_days
+    return pd.read_parquet(path, engine="pyarrow"), window_days
+
+
+@st.cache_data(ttl=3600)
+def load_market_metrics() -> pd.DataFrame | None:
+    """Daily HHI / dispersion / cheapest-retailer / coverage per category, or ``None``."""
+    cfg = _load_config()
+    path = _resolve(cfg["market_dynamics"]["output_dir"]) / "market_metrics.parquet"
+    if not path.exists():
+        return None
+    return pd.read_parquet(path, engine="pyarrow")
+
+
+@st.cache_data(ttl=3600)
+def load_price_events() -> pd.DataFrame | None:
+    """Dips, spikes and steps per (product, retailer) series, or ``None``."""
+    cfg = _load_config()
+    path = _resolve(cfg["market_dynamics"]["output_dir"]) / "price_events.parquet"
+    if not path.exists():
+        return None
+    return pd.read_parquet(path, engine="pyarrow")
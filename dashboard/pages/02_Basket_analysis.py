@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from data_loader import load_canonical_data
+from data_loader import load_canonical_data, load_price_cube
 
 st.set_page_config(layout="wide")
 st.title("🧺 Basket-Level Price Comparison") 
@@ -11,6 +11,9 @@ st.markdown("Here we compare the cost of standardised shopping baskets across su
 @st.cache_data
 def get_pivot_table():
     """Takes the loaded canonical data and creates the pivot table needed for this page."""
+    cube = load_price_cube()
+    if cube is not None:
+        return cube.day_frame()
     df = load_canonical_data() 
     latest_date = pd.to_datetime(df['date']).max()
     df_latest = df[df['date'] == latest_date].copy()
@@ -1,8 +1,7 @@
 import time
 
 import streamlit as st
-import pandas as pd
-from data_loader import load_model, get_raw_features_df
+from data_loader import load_model, get_raw_features_df, load_explainer, load_feature_vector_builder
 
 st.set_page_config(layout="wide")
 st.title("🤖 Interactive Price Predictor")
@@ -10,6 +9,8 @@ st.markdown("Select a product's features using the sidebar to get a real-time pr
 
 # Load Model and Data
 model = load_model()
+builder = load_feature_vector_builder(model)
+explainer = load_explainer(model)
 df = get_raw_features_df()
 
 st.sidebar.header("Product Features")
@@ -37,16 +38,6 @@ supermarket = st.sidebar.selectbox(
     options=['Aldi', 'ASDA', 'Morrisons', 'Sains', 'Tesco']
 )
 
-def prepare_input_data(user_input, original_columns):
-    input_df = pd.DataFrame([user_input])
-    # One hot encode the supermarket
-    input_df["supermarket"] = supermarket
-    input_df = pd.get_dummies(input_df, columns=["supermarket"])
-
-    # We use reindex to ensure all model columns are present, filling missing ones with 0.
-    final_df = input_df.reindex(columns=original_columns, fill_value=0)
-    return final_df[original_columns]
-
 # PREDICTION
 if st.sidebar.button("Predict Price"): 
     user_data = {
@@ -57,10 +48,11 @@ if st.sidebar.button("Predict Price"):
         'price_diff_1d': price_lag_1d - (price_rol_mean_7d * 0.95),
     }
 
-    model_features = model.feature_name_
-    input_vector = prepare_input_data(user_data, model_features)
+    # Input building and model latency are timed separately
+    start = time.perf_counter()
+    input_vector = builder.build(user_data, supermarket=supermarket)
+    build_ms = (time.perf_counter() - start) * 1000
 
-    # Timed prediction for latency display
     start = time.perf_counter()
     prediction = model.predict(input_vector)[0]
     latency_ms = (time.perf_counter() - start) * 1000
@@ -69,5 +61,20 @@ if st.sidebar.button("Predict Price"):
     with col1:
         st.success(f"Predicted Price: **£{prediction:.2f}**")
     with col2:
-        st.info(f"⚡ Inference latency: **{latency_ms:.2f} ms**")
+        st.info(f"⚡ Inference latency: **{latency_ms:.2f} ms** (input build: {build_ms:.3f} ms)")
+
+    # Native tree contributions for this exact input, cached per model version
+    start = time.perf_counter()
+    explanation = explainer.explain(input_vector)
+    explain_ms = (time.perf_counter() - start) * 1000
+
+    st.markdown("##### What Drove This Price?")
+    st.caption(
+        f"Contributions relative to the average prediction of £{explanation.base_value:.2f} "
+        f"· explained in {explain_ms:.2f} ms"
+    )
+    st.dataframe(
+        explanation.top(8).style.format({'value': '{:.3f}', 'contribution': '{:+.3f}'}),
+        width='stretch',
+    )
     st.balloons()
\ No newline at end of file
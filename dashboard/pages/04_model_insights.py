@@ -3,7 +3,9 @@ import pandas as pd
 import shap
 import matplotlib.pyplot as plt
 import streamlit.components.v1 as components
-from data_loader import load_model, load_shap_sample_data, load_shap_values
+from data_loader import (
+    load_model, load_shap_interactions, load_shap_sample_data, load_shap_summary, load_shap_values,
+)
 from utils import set_plot_style
 
 # Page Configuration
@@ -93,6 +95,42 @@ with st.container(border=True):
 
 st.divider()
 
+# Feature Interactions
+interactions = load_shap_interactions()
+if interactions is not None:
+    with st.container(border=True):
+        st.subheader("🔗 Feature Interactions: Which Features Work Together?")
+        st.markdown(
+            f"Interaction effects between the {len(interactions.features)} most important features, "
+            f"from {interactions.n_rows:,} explained samples."
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            set_plot_style()
+            strength = interactions.strength
+            pair_strength = strength + strength.T
+            pair_strength[range(len(strength)), range(len(strength))] = strength.diagonal()
+            fig3, ax3 = plt.subplots(figsize=(7, 6))
+            im = ax3.imshow(pair_strength, cmap='YlOrRd')
+            ax3.set_xticks(range(len(interactions.features)), interactions.features, rotation=90, fontsize=8)
+            ax3.set_yticks(range(len(interactions.features)), interactions.features, fontsize=8)
+            fig3.colorbar(im, ax=ax3, label="mean |SHAP interaction| (diagonal: main effect)")
+            plt.tight_layout()
+            st.pyplot(fig3, width='stretch')
+        with col2:
+            feature = st.selectbox("Feature", interactions.features)
+            partner = st.selectbox("Interacting with", [f for f in interactions.features if f != feature])
+            i, j = interactions.features.index(feature), interactions.features.index(partner)
+            edges = interactions.edges[i]
+            dependence = pd.DataFrame({
+                f"{feature} (main effect)": interactions.dependence[i, i],
+                f"× {partner}": 2 * interactions.dependence[i, j],
+            }, index=pd.Index((edges[:-1] + edges[1:]) / 2, name=feature))
+            st.line_chart(dependence)
+            st.caption("Mean SHAP effect by value bin of the selected feature.")
+
+    st.divider()
+
 # Local Explanations
 with st.container(border=True):
     st.subheader("🔬 Local Prediction Explanations")
@@ -161,10 +199,16 @@ with st.container(border=True):
 
 # Optional: Feature Importance Table
 with st.expander("📊 View Detailed Feature Importance Table"):
-    feature_importance = pd.DataFrame({
-        'Feature': X_sample.columns,
-        'Mean |SHAP|': abs(shap_values_sample).mean(axis=0)
-    }).sort_values('Mean |SHAP|', ascending=False)
+    shap_summary = load_shap_summary()
+    if shap_summary is not None:
+        feature_importance = shap_summary.rename(
+            columns={'feature': 'Feature', 'mean_abs_shap': 'Mean |SHAP|'}
+        )[['Feature', 'Mean |SHAP|']]
+    else:
+        feature_importance = pd.DataFrame({
+            'Feature': X_sample.columns,
+            'Mean |SHAP|': abs(shap_values_sample).mean(axis=0)
+        }).sort_values('Mean |SHAP|', ascending=False)
     
     st.dataframe(
         feature_importance.style.format({'Mean |SHAP|': '{:.4f}'}).background_gradient(
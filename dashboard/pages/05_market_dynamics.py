@@ -2,7 +2,14 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 from streamlit_agraph import agraph, Node, Edge, Config
-from data_loader import load_market_dispersion, load_price_leadership
+from data_loader import (
+    load_leadership_timeline,
+    load_market_dispersion,
+    load_market_metrics,
+    load_price_events,
+    load_price_leadership,
+    load_price_leadership_window,
+)
 from utils import set_plot_style
 
 # Page Configuration
@@ -29,6 +36,10 @@ st.divider()
 with st.spinner("Loading market dynamics data..."):
     market_dispersion = load_market_dispersion()
     leader_df = load_price_leadership()
+    window_leader_df, leadership_window_days = load_price_leadership_window()
+    market_metrics = load_market_metrics()
+    leadership_timeline = load_leadership_timeline()
+    price_events = load_price_events()
 
 # Check if data loaded successfully
 if market_dispersion is None or leader_df is None:
@@ -44,7 +55,7 @@ if market_dispersion is None or leader_df is None:
 
 st.success("✓ Market dynamics data loaded successfully!")
 
-tab1, tab2 = st.tabs(["📊 Market Competitiveness", "🕸️ Price Leadership Network"])
+tab1, tab2, tab3, tab4 = st.tabs(["📊 Market Competitiveness", "🕸️ Price Leadership Network", "🗂️ Category Metrics", "🏷️ Price Events"])
 
 with tab1:
     st.header("Market Competitiveness Over Time")
@@ -76,6 +87,10 @@ with tab1:
 with tab2:
     st.header("Who Leads and Who Follows?")
     st.markdown("This network visualizes price leadership. An arrow from `A` to `B` means `A`'s price changes tend to happen before `B`'s.")
+    if window_leader_df is not None:
+        span = st.radio("Leadership over", ["Full history", f"Last {leadership_window_days} days"], horizontal=True)
+        if span != "Full history":
+            leader_df = window_leader_df
 
     col1, col2 = st.columns([3, 2], gap="large")
 
@@ -136,4 +151,89 @@ with tab2:
             width='stretch'
         )
 
-    st.info("**Insight:** The graph and table clearly show that Aldi is a primary price-setter. Arrows consistently point from Aldi to the 'Big Four,' with a lag of several days. Among the 'Big Four,' the relationships are much faster and more reciprocal, indicating a tight, reactive competitive cluster.", icon="💡")
\ No newline at end of file
+    if leadership_timeline is not None and not leadership_timeline.empty:
+        st.subheader("How Leadership Shifts Over Time")
+        st.markdown("Median lag per window: negative values mean the first retailer moves first.")
+        pairs = leadership_timeline[["leader", "follower"]].drop_duplicates()
+        pair_labels = [f"{a} → {b}" for a, b in zip(pairs["leader"], pairs["follower"])]
+        selected = st.multiselect("Retailer pairs", pair_labels, default=pair_labels[:3])
+        labelled = leadership_timeline.assign(
+            pair=leadership_timeline["leader"].astype(str) + " → " + leadership_timeline["follower"].astype(str)
+        )
+        chart = labelled[labelled["pair"].isin(selected)].pivot_table(
+            index="window_start", columns="pair", values="median_lag_days"
+        )
+        with st.container(border=True):
+            st.line_chart(chart, height=320)
+
+    st.info("**Insight:** The graph and table clearly show that Aldi is a primary price-setter. Arrows consistently point from Aldi to the 'Big Four,' with a lag of several days. Among the 'Big Four,' the relationships are much faster and more reciprocal, indicating a tight, reactive competitive cluster.", icon="💡")
+
+with tab3:
+    st.header("Competition by Category Over Time")
+    if market_metrics is None:
+        st.info("Daily category metrics are not available yet. Run `python run.py precompute` to build them.")
+    else:
+        st.markdown("Daily **HHI** (listing concentration), **price dispersion**, the share of contested products the **cheapest retailer** undercuts, and **coverage** (average fraction of retailers stocking each product).")
+        group_col = market_metrics.columns[0]
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            category = st.selectbox("Category", sorted(market_metrics[group_col].unique()))
+        view = market_metrics[market_metrics[group_col] == category]
+        if "own_brand" in view.columns:
+            with col2:
+                brand = st.radio("Products", ["Own brand", "Branded"], horizontal=True)
+            view = view[view["own_brand"] == (brand == "Own brand")]
+        view = view.set_index("date").sort_index()
+
+        latest = view.iloc[-1]
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("HHI", f"{latest['hhi']:,.0f}", help="Sum of squared listing shares (0–10,000).")
+        m2.metric("Dispersion", f"{latest['dispersion']:.3f}")
+        m3.metric("Cheapest-Retailer Share", f"{latest['cheapest_share']:.0%}")
+        m4.metric("Coverage", f"{latest['coverage']:.0%}")
+
+        with st.container(border=True):
+            left, right = st.columns(2)
+            left.line_chart(view[["hhi"]], height=260)
+            right.line_chart(view[["dispersion"]], height=260)
+            left.line_chart(view[["cheapest_share"]], height=260)
+            right.line_chart(view[["coverage"]], height=260)
+
+        st.subheader("Latest Day, All Categories")
+        last_day = market_metrics[market_metrics["date"] == market_metrics["date"].max()]
+        st.dataframe(last_day.drop(columns="date").sort_values("hhi", ascending=False), width='stretch', hide_index=True)
+
+with tab4:
+    st.header("Promotions, Spikes and Repricings")
+    if price_events is None:
+        st.info("Price events are not available yet. Run `python run.py precompute` to detect them.")
+    else:
+        st.markdown("Every (product, retailer) price series is split into runs at one price. A **dip** is a temporary drop that returns to the prior price (a promotion), a **spike** its upward counterpart (often a scraping error), and a **step** a lasting repricing. **Depth** is the change relative to the price before the event.")
+        events_by_type = price_events["event"].value_counts()
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Dips", f"{events_by_type.get('dip', 0):,}")
+        m2.metric("Spikes", f"{events_by_type.get('spike', 0):,}")
+        m3.metric("Steps", f"{events_by_type.get('step', 0):,}")
+
+        kind = st.radio("Event", ["dip", "spike", "step"], horizontal=True)
+        view = price_events[price_events["event"] == kind]
+        with st.container(border=True):
+            st.subheader("Events Starting per Week")
+            weekly = view.pivot_table(
+                index=pd.Grouper(key="start", freq="W"), columns="supermarket",
+                values="depth", aggfunc="size", fill_value=0, observed=True,
+            )
+            st.line_chart(weekly, height=300)
+
+        by_retailer = view.groupby("supermarket", observed=True).agg(
+            events=("depth", "size"), median_depth=("depth", "median"), median_days=("days", "median"),
+        ).sort_values("events", ascending=False)
+        st.dataframe(by_retailer.style.format({"median_depth": "{:+.1%}", "median_days": "{:.0f}"}), width='stretch')
+
+        product = st.selectbox("Product", ["All products", *sorted(view["canonical_name"].astype(str).unique())])
+        if product != "All products":
+            view = view[view["canonical_name"] == product]
+        st.dataframe(
+            view.sort_values("start", ascending=False).head(1000).style.format({"depth": "{:+.1%}", "price_before": "£{:.2f}", "price": "£{:.2f}"}),
+            width='stretch', hide_index=True,
+        )
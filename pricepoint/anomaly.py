@@ -1,7 +1,10 @@
 """Anomaly detection pipeline using Isolation Forest.
 
 Identifies pricing irregularities such as scraping errors, algorithmic
-A/B testing, and oscillation patterns.
+A/B testing, and oscillation patterns.  When ``run.py precompute`` has
+detected price events, flagged rows are labelled with the event (dip,
+spike or step) they fall in, so promotions can be triaged apart from
+genuine irregularities.
 """
 
 from __future__ import annotations
@@ -13,6 +16,7 @@ import pandas as pd
 from sklearn.ensemble import IsolationForest
 
 from pricepoint.config import Settings
+from pricepoint.price_events import events_path, label_rows
 
 logger = logging.getLogger(__name__)
 
@@ -93,6 +97,15 @@ def run_anomaly_detection(settings: Settings) -> Path:
         random_state=settings.anomaly.random_state,
     )
 
+    price_events = events_path(settings)
+    if price_events.exists() and {"canonical_name", "supermarket", "date"} <= set(df.columns):
+        df["price_event"] = label_rows(df, pd.read_parquet(price_events, engine="pyarrow"))
+        explained = df.loc[df["is_anomaly"], "price_event"].notna().sum()
+        logger.info(
+            "%s of %s anomalies fall within a price event.",
+            f"{explained:,}", f"{df['is_anomaly'].sum():,}",
+        )
+
     output_path = settings.data.processed_dir / "anomalies_flagged.parquet"
     logger.info("Saving anomaly-flagged data to %s …", output_path)
     df.to_parquet(output_path, compression="snappy", index=False)
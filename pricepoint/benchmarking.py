@@ -1,19 +1,40 @@
 """Inference benchmarking utility.
 
-Measures model prediction latency and reports percentile statistics.
+Measures model prediction latency and reports percentile statistics,
+comparing the pandas ``predict`` path with raw-array Booster and
+flat-array (:mod:`pricepoint.tree_export`) evaluation.  Building the
+input row is timed separately, for the DataFrame/``get_dummies`` route
+and for :class:`~pricepoint.feature_vector.FeatureVectorBuilder`.
+
+:func:`run_sweep` scores real feature rows over a grid of batch sizes
+and LightGBM thread counts, for sizing batch scoring and the service.
+:func:`run_load_benchmark` drives the model from several concurrent
+clients (threads or processes) at a fixed open-loop request rate and
+finds the throughput at which it saturates.
 """
 
 from __future__ import annotations
 
+import functools
+import itertools
+import json
 import logging
+import os
 import time
-from dataclasses import dataclass
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
 
-import joblib
 import numpy as np
 import pandas as pd
 
 from pricepoint.config import Settings
+from pricepoint.feature_vector import FeatureVectorBuilder
+from pricepoint.parallel import spawn_pool, worker_state
+from pricepoint.scoring import ColumnPlan
+from pricepoint.tree_export import export_booster
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +65,7 @@ class BenchmarkResult:
 
 def benchmark_inference(
     model,
-    sample_input: pd.DataFrame,
+    sample_input: pd.DataFrame | np.ndarray,
     n_iterations: int = 1000,
     warmup_iterations: int = 100,
 ) -> BenchmarkResult:
@@ -54,8 +75,8 @@ def benchmark_inference(
     ----------
     model
         Trained model with a ``predict`` method.
-    sample_input : pd.DataFrame
-        A single-row DataFrame matching the model's feature schema.
+    sample_input : pd.DataFrame or np.ndarray
+        A single row matching the model's feature schema.
     n_iterations : int
         Number of timed iterations.
     warmup_iterations : int
@@ -71,21 +92,29 @@ def benchmark_inference(
         warmup_iterations,
         n_iterations,
     )
+    result = benchmark_callable(lambda: model.predict(sample_input), n_iterations, warmup_iterations)
+    logger.info("Benchmark complete:\n%s", result)
+    return result
+
 
-    # Warmup
+def benchmark_callable(
+    fn: Callable[[], object],
+    n_iterations: int = 1000,
+    warmup_iterations: int = 100,
+) -> BenchmarkResult:
+    """Time ``n_iterations`` calls of ``fn`` after ``warmup_iterations`` untimed ones."""
     for _ in range(warmup_iterations):
-        model.predict(sample_input)
+        fn()
 
-    # Timed runs
     latencies: list[float] = []
     for _ in range(n_iterations):
         start = time.perf_counter()
-        model.predict(sample_input)
+        fn()
         elapsed = (time.perf_counter() - start) * 1000  # ms
         latencies.append(elapsed)
 
     arr = np.array(latencies)
-    result = BenchmarkResult(
+    return BenchmarkResult(
         n_iterations=n_iterations,
         p50_ms=round(float(np.percentile(arr, 50)), 3),
         p95_ms=round(float(np.percentile(arr, 95)), 3),
@@ -95,12 +124,21 @@ def benchmark_inference(
         max_ms=round(float(np.max(arr)), 3),
     )
 
-    logger.info("Benchmark complete:\n%s", result)
-    return result
 
+def _dataframe_input(values: dict[str, float], categoricals: dict[str, str], features: list[str]) -> pd.DataFrame:
+    """The per-request DataFrame → ``get_dummies`` → ``reindex`` route."""
+    input_df = pd.DataFrame([{**values, **categoricals}])
+    input_df = pd.get_dummies(input_df, columns=list(categoricals))
+    return input_df.reindex(columns=features, fill_value=0)
+
+
+def run_benchmark(settings: Settings) -> dict[str, BenchmarkResult]:
+    """Run a full inference benchmark using the current model.
 
-def run_benchmark(settings: Settings) -> BenchmarkResult:
-    """Run a full inference benchmark using the saved model.
+    The same single row is scored through ``Booster.predict`` on a
+    DataFrame, ``Booster.predict`` on a float32 array, and the exported
+    flat-array evaluator.  Input construction is benchmarked on its own
+    (``input: …`` entries) so that it does not blur model latency.
 
     Parameters
     ----------
@@ -109,20 +147,436 @@ def run_benchmark(settings: Settings) -> BenchmarkResult:
 
     Returns
     -------
-    BenchmarkResult
-        Latency statistics.
+    dict[str, BenchmarkResult]
+        Latency statistics per input-building route and prediction path.
     """
-    model_path = settings.model.model_path
-    if not model_path.exists():
-        raise FileNotFoundError(f"Model not found at {model_path}. Run training first.")
-
-    model = joblib.load(model_path)
-    features = model.feature_name_
-    sample = pd.DataFrame([{f: 1.0 for f in features}])
-
-    return benchmark_inference(
-        model,
-        sample,
-        n_iterations=settings.benchmarking.n_iterations,
-        warmup_iterations=settings.benchmarking.warmup_iterations,
+    from pricepoint.registry import load_current_model
+
+    booster, schema = load_current_model(settings)
+    categories: dict[str, list[str]] = schema.get("categories", {})
+    features = schema["feature_names"]
+    categorical_columns = settings.training.categorical_features
+    builder = FeatureVectorBuilder(features, categorical_columns, categories)
+
+    # One level per categorical column, preferring one that has a model slot.
+    categoricals = {
+        col: next(iter(categories.get(col) or builder.onehot.get(col) or ["unknown"]))
+        for col in categorical_columns
+    }
+    values = dict.fromkeys(builder.numeric_features, 1.0)
+    row = builder.build(values, **categoricals).copy()
+    sample = pd.DataFrame(row, columns=features)
+    forest = export_booster(booster)
+
+    diff = abs(float(forest.predict(row)[0]) - float(booster.predict(sample)[0]))
+    if diff > 1e-6:
+        raise RuntimeError(f"Flat-array prediction differs from Booster.predict by {diff:.3g}.")
+
+    n, warmup = settings.benchmarking.n_iterations, settings.benchmarking.warmup_iterations
+    results = {}
+    if not categories:
+        results["input: DataFrame + get_dummies"] = benchmark_callable(
+            lambda: _dataframe_input(values, categoricals, features), n, warmup
+        )
+    results["input: FeatureVectorBuilder"] = benchmark_callable(
+        lambda: builder.build(values, **categoricals), n, warmup
     )
+
+    paths = {
+        "Booster.predict (DataFrame)": (booster, sample),
+        "Booster.predict (ndarray)": (booster, row),
+        "flat arrays (ndarray)": (forest, row),
+    }
+    for name, (predictor, sample_input) in paths.items():
+        results[name] = benchmark_inference(predictor, sample_input, n_iterations=n, warmup_iterations=warmup)
+    return results
+
+
+def sample_feature_rows(path: Path, plan: ColumnPlan, n_rows: int, seed: int = 0) -> np.ndarray:
+    """Model-ready rows sampled from random row groups of a feature file.
+
+    Parameters
+    ----------
+    path : Path
+        Feature Parquet file.
+    plan : ColumnPlan
+        How model features are filled from the file's columns.
+    n_rows : int
+        Rows to return (sampled with replacement if the file is smaller).
+    seed : int
+        Sampling seed.
+
+    Returns
+    -------
+    np.ndarray
+        ``(n_rows, n_features)`` float64 matrix.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from pricepoint.scoring import fill_matrix
+
+    rng = np.random.default_rng(seed)
+    pf = pq.ParquetFile(path)
+    tables, total = [], 0
+    for rg in rng.permutation(pf.num_row_groups):
+        tables.append(pf.read_row_group(int(rg), columns=plan.input_columns))
+        total += tables[-1].num_rows
+        if total >= n_rows:
+            break
+    table = pa.concat_tables(tables)
+    picks = rng.choice(table.num_rows, size=n_rows, replace=table.num_rows < n_rows)
+    sample = table.take(pa.array(picks)).combine_chunks()
+    return fill_matrix(plan, sample, np.empty((n_rows, len(plan.feature_names))))
+
+
+def default_thread_counts(max_threads: int | None = None) -> list[int]:
+    """1, 2, 4, … up to ``max_threads`` (default: every core), always including the maximum."""
+    max_threads = max_threads or os.cpu_count() or 1
+    counts = [2**i for i in range(max_threads.bit_length()) if 2**i < max_threads]
+    return [*counts, max_threads]
+
+
+@dataclass
+class SweepCell(BenchmarkResult):
+    """Latency of one (batch size, thread count) cell, plus throughput."""
+
+    batch_size: int = 1
+    threads: int = 1
+    rows_per_s: float = 0.0
+
+
+def sweep_inference(
+    predictor,
+    rows: np.ndarray,
+    batch_sizes: list[int],
+    thread_counts: list[int],
+    rows_per_cell: int = 300_000,
+    max_iterations: int = 1000,
+    warmup_iterations: int = 2,
+) -> list[SweepCell]:
+    """Time ``predictor.predict`` for every batch size × thread count.
+
+    Each timed call scores the next ``batch_size`` rows of ``rows``
+    (cycling), so tree paths vary as they do in production.  A cell runs
+    ``rows_per_cell / batch_size`` calls, clamped to
+    ``[5, max_iterations]``.
+
+    Returns
+    -------
+    list[SweepCell]
+        One entry per cell; ``rows_per_s`` is ``batch_size / mean``.
+    """
+    n = len(rows)
+    cells = []
+    for batch_size in batch_sizes:
+        batch_size = min(batch_size, n)
+        starts = itertools.cycle(range(0, n - batch_size + 1, batch_size))
+        n_iterations = int(np.clip(-(-rows_per_cell // batch_size), 5, max_iterations))
+        for threads in thread_counts:
+
+            def call(starts=starts, batch_size=batch_size, threads=threads) -> None:
+                start = next(starts)
+                predictor.predict(rows[start:start + batch_size], num_threads=threads)
+
+            result = benchmark_callable(call, n_iterations, warmup_iterations)
+            cell = SweepCell(
+                **asdict(result),
+                batch_size=batch_size,
+                threads=threads,
+                rows_per_s=round(batch_size / max(result.mean_ms, 1e-6) * 1000, 1),
+            )
+            logger.info(
+                "batch=%s threads=%s: p50 %.3f ms, p99 %.3f ms, %s rows/s",
+                batch_size, threads, cell.p50_ms, cell.p99_ms, f"{cell.rows_per_s:,.0f}",
+            )
+            cells.append(cell)
+    return cells
+
+
+def run_sweep(settings: Settings, output_dir: Path | None = None) -> pd.DataFrame:
+    """Sweep batch size × thread count on real feature rows and save the grid.
+
+    Parameters
+    ----------
+    settings : Settings
+        Application settings.
+    output_dir : Path, optional
+        Where ``benchmark_sweep.csv`` / ``.json`` go; defaults to
+        ``benchmarking.sweep_output_dir``.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (batch size, threads) cell.
+    """
+    import pyarrow.parquet as pq
+
+    from pricepoint.registry import load_current_model
+    from pricepoint.scoring import build_column_plan
+
+    cfg = settings.benchmarking
+    feature_path = settings.data.processed_dir / settings.features.output_filename
+    if not feature_path.exists():
+        raise FileNotFoundError(f"Feature data not found at {feature_path}. Run features first.")
+
+    predictor, schema = load_current_model(settings)
+    plan = build_column_plan(schema["feature_names"], pq.read_schema(feature_path), schema.get("categories"))
+    rows = sample_feature_rows(feature_path, plan, cfg.sweep_sample_rows)
+    thread_counts = cfg.sweep_threads or default_thread_counts()
+    logger.info(
+        "Sweeping batch sizes %s × threads %s on %s sampled rows …",
+        cfg.sweep_batch_sizes, thread_counts, f"{len(rows):,}",
+    )
+    cells = sweep_inference(
+        predictor, rows, cfg.sweep_batch_sizes, thread_counts,
+        rows_per_cell=cfg.sweep_rows_per_cell, max_iterations=cfg.n_iterations,
+    )
+
+    results = pd.DataFrame([asdict(c) for c in cells])
+    results = results[["batch_size", "threads", *[c for c in results.columns if c not in ("batch_size", "threads")]]]
+    output_dir = output_dir or cfg.sweep_output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results.to_csv(output_dir / "benchmark_sweep.csv", index=False)
+    with open(output_dir / "benchmark_sweep.json", "w", encoding="utf-8") as fh:
+        json.dump(
+            {"model_version": schema.get("version"), "sample_rows": len(rows), "cells": results.to_dict("records")},
+            fh,
+            indent=2,
+        )
+    logger.info("Benchmark sweep saved to %s", output_dir / "benchmark_sweep.csv")
+    return results
+
+
+# Latency histogram buckets: 10 per decade from 10 µs to 100 s.
+HISTOGRAM_EDGES_MS = np.logspace(-2, 5, 71)
+
+
+def _load_client_state(model_str: str, rows: np.ndarray) -> dict[str, Any]:
+    """Load the model once per load-generating process."""
+    import lightgbm as lgb
+
+    predictor = lgb.Booster(model_str=model_str)
+    predictor.predict(rows[:1])
+    return {"predictor": predictor, "rows": rows}
+
+
+def _ready(delay: float) -> int:
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _client_loop(
+    predictor,
+    rows: np.ndarray,
+    intended: np.ndarray,
+    batch_size: int,
+    lgbm_threads: int | None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Issue one request per intended send time (wall clock, seconds).
+
+    Latency runs from the *intended* send time, so a stalled client still
+    charges the delay to every request queued behind the stall (the
+    coordinated-omission correction); service time runs from the actual send.
+    """
+    kwargs = {"num_threads": lgbm_threads} if lgbm_threads else {}
+    n_starts = max(1, len(rows) - batch_size + 1)
+    latency = np.empty(len(intended))
+    service = np.empty(len(intended))
+    for i, t in enumerate(intended):
+        wait = t - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        sent = time.time()
+        start = (i * batch_size) % n_starts
+        predictor.predict(rows[start:start + batch_size], **kwargs)
+        done = time.time()
+        latency[i] = done - t
+        service[i] = done - sent
+    return latency * 1000, service * 1000
+
+
+def _process_client(intended: np.ndarray, batch_size: int, lgbm_threads: int | None):
+    state = worker_state()
+    return _client_loop(state["predictor"], state["rows"], intended, batch_size, lgbm_threads)
+
+
+def _summarise(latency: np.ndarray, service: np.ndarray, elapsed: float) -> dict[str, Any]:
+    counts, _ = np.histogram(latency, bins=HISTOGRAM_EDGES_MS)
+    return {
+        "requests": len(latency),
+        "achieved_rps": round(len(latency) / elapsed, 1),
+        **{
+            f"p{q:g}_ms".replace(".", "_"): round(float(np.percentile(latency, q)), 3)
+            for q in (50, 90, 99, 99.9)
+        },
+        "max_ms": round(float(latency.max()), 3),
+        "mean_service_ms": round(float(service.mean()), 3),
+        "histogram": {f"{HISTOGRAM_EDGES_MS[i]:.3g}": int(c) for i, c in enumerate(counts) if c},
+    }
+
+
+def open_loop_run(
+    pool,
+    target_rps: float,
+    duration_s: float,
+    clients: int,
+    batch_size: int = 1,
+    lgbm_threads: int | None = None,
+    predictor=None,
+    rows: np.ndarray | None = None,
+) -> dict[str, Any]:
+    """Send requests at ``target_rps`` for ``duration_s`` from ``clients`` clients.
+
+    The request schedule is fixed up front (request ``k`` is due at
+    ``k / target_rps``) and dealt round-robin to the clients, so a slow
+    model makes requests late instead of making the load generator slower.
+
+    Parameters
+    ----------
+    pool : ThreadPoolExecutor or ProcessPoolExecutor
+        Executor with at least ``clients`` workers; a process pool must
+        come from ``spawn_pool(clients, _load_client_state, model_str, rows)``.
+    predictor, rows
+        Model and input rows for thread clients (unused by process pools).
+
+    Returns
+    -------
+    dict
+        Achieved throughput, corrected latency percentiles, mean service
+        time and a log-bucketed latency histogram (bucket lower edge in ms).
+    """
+    n_requests = max(clients, int(target_rps * duration_s))
+    start = time.time() + 0.05
+    schedule = start + np.arange(n_requests) / target_rps
+    if isinstance(pool, ProcessPoolExecutor):
+        futures = [
+            pool.submit(_process_client, schedule[c::clients], batch_size, lgbm_threads) for c in range(clients)
+        ]
+    else:
+        futures = [
+            pool.submit(_client_loop, predictor, rows, schedule[c::clients], batch_size, lgbm_threads)
+            for c in range(clients)
+        ]
+    results = [f.result() for f in futures]
+    elapsed = time.time() - start
+    latency = np.concatenate([r[0] for r in results])
+    service = np.concatenate([r[1] for r in results])
+    return {"target_rps": round(target_rps, 1), **_summarise(latency, service, elapsed)}
+
+
+def find_saturation(
+    run: Callable[[float], dict[str, Any]],
+    start_rps: float,
+    max_steps: int = 12,
+    sustain_ratio: float = 0.95,
+) -> list[dict[str, Any]]:
+    """Double the target rate until the achieved rate falls behind it.
+
+    Returns every step; the saturation throughput is the highest
+    ``achieved_rps`` among them.
+    """
+    steps = []
+    rate = start_rps
+    for _ in range(max_steps):
+        result = run(rate)
+        steps.append(result)
+        logger.info(
+            "target %s rps → achieved %s rps, p99 %.3f ms",
+            f"{rate:,.0f}", f"{result['achieved_rps']:,.0f}", result["p99_ms"],
+        )
+        if result["achieved_rps"] < sustain_ratio * rate:
+            break
+        rate *= 2
+    return steps
+
+
+def run_load_benchmark(
+    settings: Settings,
+    processes: bool = False,
+    output_dir: Path | None = None,
+) -> pd.DataFrame:
+    """Open-loop concurrent benchmark over clients × LightGBM threads.
+
+    For every combination of ``benchmarking.load_clients`` and
+    ``benchmarking.load_lgbm_threads`` the request rate is doubled from
+    ``load_start_rps`` until the model stops keeping up.  Steps are saved
+    to ``benchmark_load.csv`` and, with latency histograms, to
+    ``benchmark_load.json``.
+
+    Parameters
+    ----------
+    settings : Settings
+        Application settings.
+    processes : bool
+        Use one process per client instead of threads.
+    output_dir : Path, optional
+        Defaults to ``benchmarking.sweep_output_dir``.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per step, with a ``saturated_rps`` column per configuration.
+    """
+    import pyarrow.parquet as pq
+
+    from pricepoint.registry import load_current_model
+    from pricepoint.scoring import build_column_plan
+
+    cfg = settings.benchmarking
+    feature_path = settings.data.processed_dir / settings.features.output_filename
+    if not feature_path.exists():
+        raise FileNotFoundError(f"Feature data not found at {feature_path}. Run features first.")
+
+    predictor, schema = load_current_model(settings)
+    plan = build_column_plan(schema["feature_names"], pq.read_schema(feature_path), schema.get("categories"))
+    rows = sample_feature_rows(feature_path, plan, min(cfg.sweep_sample_rows, 10_000))
+    mode = "process" if processes else "thread"
+
+    records = []
+    for clients in cfg.load_clients:
+        if processes:
+            pool = spawn_pool(clients, _load_client_state, predictor.model_to_string(), rows)
+            # Every worker must be up before the clock starts.
+            pids: set[int] = set()
+            while len(pids) < clients:
+                pids.update(pool.map(_ready, [0.05] * clients))
+        else:
+            pool = ThreadPoolExecutor(clients)
+        with pool:
+            for lgbm_threads in cfg.load_lgbm_threads:
+                logger.info("Load: %s %s clients, LightGBM threads=%s …", clients, mode, lgbm_threads or "all")
+                run = functools.partial(
+                    open_loop_run,
+                    pool,
+                    duration_s=cfg.load_duration_s,
+                    clients=clients,
+                    batch_size=cfg.load_batch_size,
+                    lgbm_threads=lgbm_threads,
+                    predictor=predictor,
+                    rows=rows,
+                )
+                steps = find_saturation(run, cfg.load_start_rps, cfg.load_max_steps)
+                saturated = max(step["achieved_rps"] for step in steps)
+                for step in steps:
+                    records.append({
+                        "mode": mode, "clients": clients, "lgbm_threads": lgbm_threads or 0,
+                        "batch_size": cfg.load_batch_size, **step, "saturated_rps": saturated,
+                    })
+
+    results = pd.DataFrame(records)
+    output_dir = output_dir or cfg.sweep_output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results.drop(columns="histogram").to_csv(output_dir / "benchmark_load.csv", index=False)
+    with open(output_dir / "benchmark_load.json", "w", encoding="utf-8") as fh:
+        json.dump(
+            {
+                "model_version": schema.get("version"),
+                "histogram_edges_ms": HISTOGRAM_EDGES_MS.round(4).tolist(),
+                "steps": records,
+            },
+            fh,
+            indent=2,
+        )
+    logger.info("Load benchmark saved to %s", output_dir / "benchmark_load.csv")
+    return results
@@ -33,17 +33,83 @@ class ModelConfig:
     output_dir: Path
     model_filename: str
     lgbm_params: dict[str, Any]
+    registry_dir: Path
+    keep_versions: int
 
     @property
     def model_path(self) -> Path:
         return self.output_dir / self.model_filename
 
+    @property
+    def native_model_path(self) -> Path:
+        """LightGBM text model written by the native-categorical and streaming trainers."""
+        return self.output_dir / f"{Path(self.model_filename).stem}.txt"
+
+    @property
+    def schema_path(self) -> Path:
+        """Sidecar with feature names and category codes for native models."""
+        return self.output_dir / f"{Path(self.model_filename).stem}.schema.json"
+
+
+@dataclass(frozen=True)
+class TrainingConfig:
+    test_days: int
+    native_categorical: bool
+    categorical_features: list[str]
+    dataset_cache_dir: Path
+    cv_horizon_days: int
+    core_budget: int | None
+    threads_per_fold: int | None
+    stream_batch_rows: int
+    incremental_mode: str
+    incremental_window_days: int
+    incremental_rounds: int
+    refit_decay_rate: float
+    min_improvement: float
+
+
+@dataclass(frozen=True)
+class ScoringConfig:
+    output_dir: Path
+    batch_rows: int
+    num_threads: int | None
+    forecast_horizon: int
+    forecast_dir: Path
+
+
+@dataclass(frozen=True)
+class ServiceConfig:
+    host: str
+    port: int
+    max_batch_size: int
+    max_wait_ms: float
+    workers: int
+    lgbm_threads: int | None
+    metrics_window: int
+
+
+@dataclass(frozen=True)
+class TuningConfig:
+    n_trials: int
+    eta: int
+    min_rounds: int
+    max_rounds: int
+    early_stopping_rounds: int
+    time_budget_minutes: float
+    cpu_hours_budget: float | None
+    threads_per_trial: int | None
+    latency_rows: int
+    random_seed: int
+    overlay_path: Path
+    search_space: dict[str, dict[str, Any]]
+
 
 @dataclass(frozen=True)
 class FeaturesConfig:
     rolling_windows: list[int]
     lag_days: list[int]
     output_filename: str
+    store_dir: Path
 
 
 @dataclass(frozen=True)
@@ -59,15 +125,50 @@ class ShapConfig:
     sample_size: int
     output_dir: Path
     random_seed: int
+    chunk_rows: int
+    num_threads: int | None
+    explain_cache_size: int
+    interaction_top_k: int
+    interaction_rows: int
+    interaction_bins: int
+    interaction_chunk_rows: int
+    interaction_workers: int | None
 
 
 @dataclass(frozen=True)
 class MarketDynamicsConfig:
     output_dir: Path
-    sample_size: int
+    sample_size: int | None
     max_lag_days: int
     min_correlation: float
     min_stores_for_common: int
+    metrics_by_own_brand: bool
+    leadership_window_days: int
+    leadership_timeline_freq: str
+    leadership_timeline_window_days: int | None
+    leadership_timeline_step_days: int
+
+
+@dataclass(frozen=True)
+class PrecomputeConfig:
+    workers: int | None
+    tasks: list[str]
+
+
+@dataclass(frozen=True)
+class PriceCubeConfig:
+    output_dir: Path
+    max_fill_days: int | None
+    headroom: float
+
+
+@dataclass(frozen=True)
+class PriceEventsConfig:
+    min_depth: float
+    max_event_days: int
+    return_tolerance: float
+    min_step: float
+    min_step_days: int
 
 
 @dataclass(frozen=True)
@@ -80,6 +181,23 @@ class AnomalyConfig:
 class BenchmarkingConfig:
     n_iterations: int
     warmup_iterations: int
+    sweep_batch_sizes: list[int]
+    sweep_threads: list[int] | None
+    sweep_sample_rows: int
+    sweep_rows_per_cell: int
+    sweep_output_dir: Path
+    load_clients: list[int]
+    load_lgbm_threads: list[int | None]
+    load_batch_size: int
+    load_duration_s: float
+    load_start_rps: float
+    load_max_steps: int
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    enabled: bool
+    hash_inputs: bool
 
 
 @dataclass(frozen=True)
@@ -95,12 +213,20 @@ class Settings:
 
     data: DataConfig
     model: ModelConfig
+    training: TrainingConfig
+    scoring: ScoringConfig
+    service: ServiceConfig
+    tuning: TuningConfig
     features: FeaturesConfig
     matching: MatchingConfig
     shap: ShapConfig
     market_dynamics: MarketDynamicsConfig
+    price_cube: PriceCubeConfig
+    price_events: PriceEventsConfig
+    precompute: PrecomputeConfig
     anomaly: AnomalyConfig
     benchmarking: BenchmarkingConfig
+    cache: CacheConfig
     logging: LoggingConfig
 
 
@@ -109,6 +235,17 @@ def _resolve_path(raw: str) -> Path:
     return PROJECT_ROOT / raw
 
 
+def _deep_merge(base: dict[str, Any], overlay: dict[str, Any]) -> dict[str, Any]:
+    """Recursively merge ``overlay`` into a copy of ``base``."""
+    merged = dict(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
 def load_settings(config_path: Path | None = None) -> Settings:
     """Load and validate settings from a YAML config file.
 
@@ -128,6 +265,13 @@ def load_settings(config_path: Path | None = None) -> Settings:
     with open(path, "r", encoding="utf-8") as fh:
         raw: dict[str, Any] = yaml.safe_load(fh)
 
+    for overlay in raw.pop("overlays", None) or []:
+        overlay_path = path.parent / overlay
+        if overlay_path.exists():
+            logger.info("Applying config overlay %s", overlay_path)
+            with open(overlay_path, "r", encoding="utf-8") as fh:
+                raw = _deep_merge(raw, yaml.safe_load(fh) or {})
+
     data_cfg = raw["data"]
     model_cfg = raw["model"]
 
@@ -143,22 +287,60 @@ def load_settings(config_path: Path | None = None) -> Settings:
             output_dir=_resolve_path(model_cfg["output_dir"]),
             model_filename=model_cfg["model_filename"],
             lgbm_params=model_cfg["lgbm_params"],
+            registry_dir=_resolve_path(model_cfg["registry_dir"]),
+            keep_versions=model_cfg["keep_versions"],
         ),
-        features=FeaturesConfig(**raw["features"]),
-        matching=MatchingConfig(**raw["matching"]),
-        shap=ShapConfig(
-            sample_size=raw["shap"]["sample_size"],
-            output_dir=_resolve_path(raw["shap"]["output_dir"]),
-            random_seed=raw["shap"]["random_seed"],
+        training=TrainingConfig(
+            **{
+                **raw["training"],
+                "dataset_cache_dir": _resolve_path(raw["training"]["dataset_cache_dir"]),
+            }
+        ),
+        scoring=ScoringConfig(
+            output_dir=_resolve_path(raw["scoring"]["output_dir"]),
+            batch_rows=raw["scoring"]["batch_rows"],
+            num_threads=raw["scoring"]["num_threads"],
+            forecast_horizon=raw["scoring"]["forecast_horizon"],
+            forecast_dir=_resolve_path(raw["scoring"]["forecast_dir"]),
         ),
+        service=ServiceConfig(**raw["service"]),
+        tuning=TuningConfig(
+            **{**raw["tuning"], "overlay_path": _resolve_path(raw["tuning"]["overlay_path"])}
+        ),
+        features=FeaturesConfig(
+            rolling_windows=raw["features"]["rolling_windows"],
+            lag_days=raw["features"]["lag_days"],
+            output_filename=raw["features"]["output_filename"],
+            store_dir=_resolve_path(raw["features"]["store_dir"]),
+        ),
+        matching=MatchingConfig(**raw["matching"]),
+        shap=ShapConfig(**{**raw["shap"], "output_dir": _resolve_path(raw["shap"]["output_dir"])}),
         market_dynamics=MarketDynamicsConfig(
             output_dir=_resolve_path(raw["market_dynamics"]["output_dir"]),
             sample_size=raw["market_dynamics"]["sample_size"],
             max_lag_days=raw["market_dynamics"]["max_lag_days"],
             min_correlation=raw["market_dynamics"]["min_correlation"],
             min_stores_for_common=raw["market_dynamics"]["min_stores_for_common"],
+            metrics_by_own_brand=raw["market_dynamics"]["metrics_by_own_brand"],
+            leadership_window_days=raw["market_dynamics"]["leadership_window_days"],
+            leadership_timeline_freq=raw["market_dynamics"]["leadership_timeline_freq"],
+            leadership_timeline_window_days=raw["market_dynamics"]["leadership_timeline_window_days"],
+            leadership_timeline_step_days=raw["market_dynamics"]["leadership_timeline_step_days"],
         ),
+        price_cube=PriceCubeConfig(
+            output_dir=_resolve_path(raw["price_cube"]["output_dir"]),
+            max_fill_days=raw["price_cube"]["max_fill_days"],
+            headroom=raw["price_cube"]["headroom"],
+        ),
+        price_events=PriceEventsConfig(**raw["price_events"]),
+        precompute=PrecomputeConfig(**raw["precompute"]),
         anomaly=AnomalyConfig(**raw["anomaly"]),
-        benchmarking=BenchmarkingConfig(**raw["benchmarking"]),
+        benchmarking=BenchmarkingConfig(
+            **{
+                **raw["benchmarking"],
+                "sweep_output_dir": _resolve_path(raw["benchmarking"]["sweep_output_dir"]),
+            }
+        ),
+        cache=CacheConfig(**raw["cache"]),
         logging=LoggingConfig(**raw["logging"]),
     )
@@ -0,0 +1,191 @@
+"""Rolling-origin time-series cross-validation.
+
+Builds expanding-window folds by date over the shared binary Dataset
+from :func:`pricepoint.training.load_or_build_dataset` and trains the
+folds concurrently in a process pool, splitting a core budget between
+concurrent folds and LightGBM threads.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from pricepoint.config import Settings
+from pricepoint.training import (
+    booster_metrics,
+    dataset_params,
+    load_or_build_dataset,
+    train_booster,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def time_series_folds(
+    dates: np.ndarray,
+    n_folds: int,
+    horizon_days: int,
+) -> list[tuple[np.datetime64, np.datetime64]]:
+    """Expanding-window fold boundaries, oldest fold first.
+
+    Each fold tests on ``horizon_days`` consecutive days and trains on
+    every earlier day; the last fold ends on the latest date.
+
+    Parameters
+    ----------
+    dates : np.ndarray
+        Row dates (``datetime64[D]``).
+    n_folds : int
+        Number of folds.
+    horizon_days : int
+        Length of each test window in days.
+
+    Returns
+    -------
+    list[tuple]
+        ``(test_start, test_end)`` inclusive bounds for each fold with a
+        non-empty training window.
+    """
+    first, last = dates.min(), dates.max()
+    horizon = np.timedelta64(horizon_days, "D")
+    folds = []
+    for k in range(n_folds - 1, -1, -1):
+        test_end = last - k * horizon
+        test_start = test_end - horizon + np.timedelta64(1, "D")
+        if test_start <= first:
+            logger.warning("Skipping fold ending %s: no training history.", test_end)
+            continue
+        folds.append((test_start, test_end))
+    return folds
+
+
+def split_core_budget(
+    n_folds: int,
+    core_budget: int,
+    threads_per_fold: int | None = None,
+) -> tuple[int, int]:
+    """Split a core budget into (concurrent folds, LightGBM threads per fold)."""
+    core_budget = max(1, core_budget)
+    if threads_per_fold:
+        threads = min(threads_per_fold, core_budget)
+        workers = max(1, min(n_folds, core_budget // threads))
+    else:
+        workers = max(1, min(n_folds, core_budget))
+        threads = max(1, core_budget // workers)
+    return workers, threads
+
+
+def _train_fold(
+    cache_dir: str,
+    params: dict[str, Any],
+    lgbm_params: dict[str, Any],
+    fold: int,
+    test_start: np.datetime64,
+    test_end: np.datetime64,
+) -> dict[str, Any]:
+    """Train and score one fold (runs in a worker process)."""
+    import lightgbm as lgb
+
+    start = time.perf_counter()
+    dates = np.load(Path(cache_dir) / "dates.npy", mmap_mode="r")
+    train_idx = np.flatnonzero(dates < test_start).astype(np.int32)
+    test_idx = np.flatnonzero((dates >= test_start) & (dates <= test_end)).astype(np.int32)
+
+    dataset = lgb.Dataset(str(Path(cache_dir) / "dataset.bin"), params=params).construct()
+    train_set = dataset.subset(train_idx)
+    valid_set = dataset.subset(test_idx)
+    _, evals = train_booster(train_set, valid_set, lgbm_params)
+
+    return {
+        "fold": fold,
+        "test_start": str(test_start),
+        "test_end": str(test_end),
+        "train_rows": len(train_idx),
+        "test_rows": len(test_idx),
+        **booster_metrics(evals, valid_set),
+        "fit_seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def run_cross_validation(settings: Settings, n_folds: int) -> pd.DataFrame:
+    """Run parallel rolling-origin cross-validation.
+
+    Parameters
+    ----------
+    settings : Settings
+        Application settings.
+    n_folds : int
+        Number of expanding-window folds.
+
+    Returns
+    -------
+    pd.DataFrame
+        Per-fold metrics followed by ``mean`` and ``std`` rows.
+    """
+    cfg = settings.training
+    native = load_or_build_dataset(settings)
+    folds = time_series_folds(native.dates, n_folds, cfg.cv_horizon_days)
+    del native
+    if not folds:
+        raise ValueError("Not enough history for any cross-validation fold.")
+
+    workers, threads = split_core_budget(
+        len(folds), cfg.core_budget or os.cpu_count() or 1, cfg.threads_per_fold
+    )
+    logger.info(
+        "Cross-validating %s folds (%s-day horizon): %s concurrent × %s threads …",
+        len(folds),
+        cfg.cv_horizon_days,
+        workers,
+        threads,
+    )
+
+    lgbm_params = {**settings.model.lgbm_params, "num_threads": threads}
+    params = dataset_params(settings.model.lgbm_params)
+    # Spawn rather than fork: the parent has already used OpenMP to bin the data.
+    ctx = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [
+            pool.submit(
+                _train_fold, str(cfg.dataset_cache_dir), params, lgbm_params, i, test_start, test_end
+            )
+            for i, (test_start, test_end) in enumerate(folds, start=1)
+        ]
+        results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - start
+
+    per_fold = pd.DataFrame(results)
+    for row in results:
+        logger.info(
+            "Fold %s [%s → %s]: MAE=£%.4f, RMSE=£%.4f (%.1fs)",
+            row["fold"], row["test_start"], row["test_end"], row["MAE"], row["RMSE"], row["fit_seconds"],
+        )
+
+    metric_cols = ["MAE", "RMSE", "R2"]
+    summary = per_fold[metric_cols].agg(["mean", "std"]).round(4)
+    summary.insert(0, "fold", summary.index)
+    report = pd.concat([per_fold, summary], ignore_index=True)
+
+    output_path = settings.model.output_dir / "cv_metrics.csv"
+    settings.model.output_dir.mkdir(parents=True, exist_ok=True)
+    report.to_csv(output_path, index=False)
+    logger.info(
+        "Cross-validation complete in %.1fs. MAE=£%.4f ± %.4f, RMSE=£%.4f ± %.4f. Output: %s",
+        elapsed,
+        summary.loc["mean", "MAE"],
+        summary.loc["std", "MAE"],
+        summary.loc["mean", "RMSE"],
+        summary.loc["std", "RMSE"],
+        output_path,
+    )
+    return report
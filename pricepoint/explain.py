@@ -0,0 +1,541 @@
+"""SHAP contributions from LightGBM's native ``pred_contrib``.
+
+``booster.predict(X, pred_contrib=True)`` computes exact TreeSHAP values
+inside LightGBM, parallelised over rows with its own threads, without
+the ``shap`` package's per-call model conversion.  Rows are explained in
+fixed-size chunks (the float64 result is ``n_features + 1`` wide) and
+written as float32 into a preallocated — typically memory-mapped —
+output, so the sample size is bounded by disk rather than memory.
+Global importance and per-feature statistics are accumulated in the
+same chunked pass.
+
+:class:`InstanceExplainer` explains arbitrary rows on demand (a few
+milliseconds per row) and keeps recent results in a bounded LRU cache.
+
+SHAP interaction values are ``n × F × F`` per sample, so
+:func:`interaction_summary` never keeps them: chunks are explained in
+worker processes, cut down to the top-K features straight away and
+folded into an :class:`InteractionSummary` of pair strengths and
+dependence bins.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from pricepoint.config import Settings
+from pricepoint.parallel import init_worker, spawn_pool, worker_state
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_COLUMNS = [
+    "feature", "mean_abs_shap", "mean_shap", "std_shap", "min_shap", "max_shap", "value_corr",
+]
+
+
+def sample_feature_matrix(
+    path: Path,
+    plan,
+    n_rows: int,
+    seed: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Model-ready rows sampled uniformly (without replacement) from a feature file.
+
+    Row groups are read one at a time and only the sampled rows are
+    kept, so memory is bounded by the sample rather than the file.
+
+    Parameters
+    ----------
+    path : Path
+        Feature Parquet file.
+    plan : pricepoint.scoring.ColumnPlan
+        How model features are filled from the file's columns.
+    n_rows : int
+        Rows to sample (all rows if the file is smaller).
+    seed : int
+        Sampling seed.
+
+    Returns
+    -------
+    tuple
+        ``(X, rows)``: the ``(n, n_features)`` float64 matrix and the
+        sampled row numbers in the file, ascending.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from pricepoint.scoring import fill_matrix
+
+    pf = pq.ParquetFile(path)
+    total = pf.metadata.num_rows
+    rows = np.sort(np.random.default_rng(seed).choice(total, size=min(n_rows, total), replace=False))
+    X = np.empty((len(rows), len(plan.feature_names)), dtype=np.float64)
+
+    offset = filled = 0
+    for rg in range(pf.num_row_groups):
+        group_rows = pf.metadata.row_group(rg).num_rows
+        lo, hi = np.searchsorted(rows, [offset, offset + group_rows])
+        if hi > lo:
+            table = pf.read_row_group(rg, columns=plan.input_columns)
+            picked = table.take(pa.array(rows[lo:hi] - offset)).combine_chunks()
+            fill_matrix(plan, picked, X[filled:])
+            filled += hi - lo
+        offset += group_rows
+    return X, rows
+
+
+def shap_contributions(
+    booster,
+    X: np.ndarray,
+    out: np.ndarray | None = None,
+    chunk_rows: int = 16384,
+    num_threads: int | None = None,
+) -> tuple[np.ndarray, float]:
+    """Per-row, per-feature SHAP values via ``pred_contrib``.
+
+    Parameters
+    ----------
+    booster : lightgbm.Booster
+        Model to explain.
+    X : np.ndarray
+        ``(n_rows, n_features)`` model inputs.
+    out : np.ndarray, optional
+        ``(n_rows, n_features)`` destination (e.g. an ``open_memmap``);
+        float32 is allocated when omitted.
+    chunk_rows : int
+        Rows per ``predict`` call.
+    num_threads : int, optional
+        LightGBM threads per call; LightGBM's default (all cores) when unset.
+
+    Returns
+    -------
+    tuple
+        ``(out, base_value)`` — contributions and the model's expected value.
+    """
+    n_rows, n_features = X.shape
+    if out is None:
+        out = np.empty((n_rows, n_features), dtype=np.float32)
+    predict_kwargs = {"num_threads": num_threads} if num_threads else {}
+
+    base_value = float("nan")
+    started = time.perf_counter()
+    for start in range(0, n_rows, chunk_rows):
+        contrib = booster.predict(X[start:start + chunk_rows], pred_contrib=True, **predict_kwargs)
+        out[start:start + len(contrib)] = contrib[:, :n_features]
+        base_value = float(contrib[0, n_features])
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "SHAP contributions: %s rows in %.1fs (%s rows/s)",
+        f"{n_rows:,}", elapsed, f"{n_rows / max(elapsed, 1e-9):,.0f}",
+    )
+    return out, base_value
+
+
+def summarise_contributions(
+    contrib: np.ndarray,
+    X: np.ndarray,
+    feature_names: list[str],
+    chunk_rows: int = 65536,
+) -> pd.DataFrame:
+    """Global importance and per-feature SHAP statistics.
+
+    ``value_corr`` is the Pearson correlation between a feature's value
+    and its SHAP value over rows where the value is present: positive
+    when higher values push the prediction up.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per feature (``SUMMARY_COLUMNS``), most important first.
+    """
+    n_features = len(feature_names)
+    s_abs, s, s2 = (np.zeros(n_features) for _ in range(3))
+    lo = np.full(n_features, np.inf)
+    hi = np.full(n_features, -np.inf)
+    n_x, sx, sxx, sv, svv, sxv = (np.zeros(n_features) for _ in range(6))
+
+    for start in range(0, len(contrib), chunk_rows):
+        v = np.asarray(contrib[start:start + chunk_rows], dtype=np.float64)
+        x = X[start:start + chunk_rows]
+        s_abs += np.abs(v).sum(axis=0)
+        s += v.sum(axis=0)
+        s2 += (v * v).sum(axis=0)
+        lo = np.minimum(lo, v.min(axis=0, initial=np.inf))
+        hi = np.maximum(hi, v.max(axis=0, initial=-np.inf))
+
+        present = ~np.isnan(x)
+        xm = np.where(present, x, 0.0)
+        vm = np.where(present, v, 0.0)
+        n_x += present.sum(axis=0)
+        sx += xm.sum(axis=0)
+        sxx += (xm * xm).sum(axis=0)
+        sv += vm.sum(axis=0)
+        svv += (vm * vm).sum(axis=0)
+        sxv += (xm * vm).sum(axis=0)
+
+    n = max(len(contrib), 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s / n
+        std = np.sqrt(np.maximum(s2 / n - mean * mean, 0.0))
+        cov = n_x * sxv - sx * sv
+        norm = np.sqrt((n_x * sxx - sx * sx) * (n_x * svv - sv * sv))
+        value_corr = np.where(norm > 0, cov / norm, np.nan)
+
+    summary = pd.DataFrame({
+        "feature": feature_names,
+        "mean_abs_shap": s_abs / n,
+        "mean_shap": mean,
+        "std_shap": std,
+        "min_shap": lo,
+        "max_shap": hi,
+        "value_corr": value_corr,
+    }, columns=SUMMARY_COLUMNS)
+    return summary.sort_values("mean_abs_shap", ascending=False, ignore_index=True)
+
+
+# ---------------------------------------------------------------------------
+# On-demand explanations
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Explanation:
+    """SHAP contributions for one model input row."""
+
+    feature_names: list[str]
+    values: np.ndarray
+    contributions: np.ndarray
+    base_value: float
+
+    @property
+    def prediction(self) -> float:
+        """Model output: base value plus every contribution."""
+        return self.base_value + float(self.contributions.sum())
+
+    def top(self, k: int = 10) -> pd.DataFrame:
+        """The ``k`` largest contributions by magnitude."""
+        order = np.argsort(-np.abs(self.contributions), kind="stable")[:k]
+        return pd.DataFrame({
+            "feature": [self.feature_names[j] for j in order],
+            "value": self.values[order],
+            "contribution": self.contributions[order],
+        })
+
+
+def model_fingerprint(booster) -> str:
+    """Short content hash of a booster, for models without a registry version."""
+    return hashlib.sha256(booster.model_to_string().encode("utf-8")).hexdigest()[:16]
+
+
+class InstanceExplainer:
+    """On-demand SHAP contributions with a bounded LRU cache.
+
+    Results are cached by model version and a hash of the float64 row
+    bytes, so repeated rows (the same product re-selected, a refreshed
+    page) are served without touching the model, and entries computed
+    under another model version are never returned.  Safe to share
+    between threads.
+
+    Parameters
+    ----------
+    booster : lightgbm.Booster or LGBMRegressor
+        Model to explain.
+    model_version : str
+        Registry version (or :func:`model_fingerprint`) of ``booster``.
+    max_entries : int
+        Cached rows kept before the least recently used is evicted.
+    num_threads : int
+        LightGBM threads per call; one is fastest for a handful of rows.
+    """
+
+    def __init__(
+        self,
+        booster,
+        model_version: str,
+        max_entries: int = 4096,
+        num_threads: int = 1,
+    ) -> None:
+        self.max_entries = max_entries
+        self.num_threads = num_threads
+        self.hits = self.misses = 0
+        self._cache: OrderedDict[tuple[str, bytes], np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.set_model(booster, model_version)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> InstanceExplainer:
+        """Explainer for the current registry (or joblib) model."""
+        from pricepoint.registry import load_current_model
+
+        booster, schema = load_current_model(settings)
+        version = schema.get("version") or model_fingerprint(booster)
+        return cls(booster, version, settings.shap.explain_cache_size)
+
+    def set_model(self, booster, model_version: str) -> None:
+        """Switch models; cached rows of other versions stay until evicted."""
+        booster = getattr(booster, "booster_", booster)
+        with self._lock:
+            self.booster = booster
+            self.model_version = model_version
+            self.feature_names = list(booster.feature_name())
+
+    def _key(self, row: np.ndarray) -> tuple[str, bytes]:
+        return self.model_version, hashlib.blake2b(row.tobytes(), digest_size=16).digest()
+
+    def explain(self, row: np.ndarray) -> Explanation:
+        """Explain one ``(n_features,)`` or ``(1, n_features)`` row."""
+        return self.explain_many(np.reshape(row, (1, -1)))[0]
+
+    def explain_many(self, X: np.ndarray) -> list[Explanation]:
+        """Explain each row of ``X``; cache misses share one ``pred_contrib`` call."""
+        X = np.ascontiguousarray(np.atleast_2d(X), dtype=np.float64)
+        with self._lock:
+            booster, feature_names = self.booster, self.feature_names
+            keys = [self._key(row) for row in X]
+            found = [self._cache.get(key) for key in keys]
+            for key, contrib in zip(keys, found):
+                if contrib is not None:
+                    self._cache.move_to_end(key)
+        missing = [i for i, contrib in enumerate(found) if contrib is None]
+
+        if missing:
+            computed = booster.predict(X[missing], pred_contrib=True, num_threads=self.num_threads)
+            with self._lock:
+                for i, contrib in zip(missing, computed):
+                    found[i] = contrib
+                    self._cache[keys[i]] = contrib
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        with self._lock:
+            self.hits += len(X) - len(missing)
+            self.misses += len(missing)
+
+        n_features = X.shape[1]
+        return [
+            Explanation(feature_names, row, contrib[:n_features], float(contrib[n_features]))
+            for row, contrib in zip(X, found)
+        ]
+
+    def cache_info(self) -> dict[str, int]:
+        """Hit and miss counts and current cache size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._cache),
+                "max_entries": self.max_entries,
+            }
+
+
+# ---------------------------------------------------------------------------
+# Top-K interaction summaries
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class InteractionSummary:
+    """Streaming aggregates of SHAP interaction values for ``K`` features.
+
+    ``phi[n, i, j]`` follows the ``shap`` convention: the interaction
+    effect is split evenly between ``phi[i, j]`` and ``phi[j, i]``, and
+    the diagonal holds each feature's main effect.
+
+    Attributes
+    ----------
+    features : list[str]
+        The ``K`` features, most important first.
+    edges : np.ndarray
+        ``(K, n_bins + 1)`` value bin edges per feature.
+    n_rows : int
+        Rows folded in so far.
+    abs_sum, sum : np.ndarray
+        ``(K, K)`` sums of ``|phi|`` and ``phi``.
+    bin_counts : np.ndarray
+        ``(K, n_bins)`` rows whose value of feature ``i`` falls in each bin.
+    bin_sums : np.ndarray
+        ``(K, K, n_bins)`` sums of ``phi[i, j]`` by bin of feature ``i``.
+    """
+
+    features: list[str]
+    edges: np.ndarray
+    n_rows: int
+    abs_sum: np.ndarray
+    sum: np.ndarray
+    bin_counts: np.ndarray
+    bin_sums: np.ndarray
+
+    @classmethod
+    def empty(cls, features: list[str], edges: np.ndarray) -> InteractionSummary:
+        k, n_bins = len(features), edges.shape[1] - 1
+        return cls(
+            features=list(features),
+            edges=edges,
+            n_rows=0,
+            abs_sum=np.zeros((k, k)),
+            sum=np.zeros((k, k)),
+            bin_counts=np.zeros((k, n_bins), dtype=np.int64),
+            bin_sums=np.zeros((k, k, n_bins)),
+        )
+
+    def update(self, phi: np.ndarray, values: np.ndarray) -> None:
+        """Fold in ``(n, K, K)`` interactions for rows with ``(n, K)`` feature values."""
+        k, n_bins = self.bin_counts.shape
+        self.n_rows += len(phi)
+        self.abs_sum += np.abs(phi).sum(axis=0)
+        self.sum += phi.sum(axis=0)
+        for i in range(k):
+            present = ~np.isnan(values[:, i])
+            bins = np.searchsorted(self.edges[i, 1:-1], values[present, i], side="right")
+            self.bin_counts[i] += np.bincount(bins, minlength=n_bins)
+            for j in range(k):
+                self.bin_sums[i, j] += np.bincount(bins, phi[present, i, j], minlength=n_bins)
+
+    def merge(self, other: InteractionSummary) -> None:
+        """Add another summary over the same features and edges."""
+        self.n_rows += other.n_rows
+        self.abs_sum += other.abs_sum
+        self.sum += other.sum
+        self.bin_counts += other.bin_counts
+        self.bin_sums += other.bin_sums
+
+    @property
+    def strength(self) -> np.ndarray:
+        """``(K, K)`` mean ``|phi|``; off-diagonal entries are half of each pair's effect."""
+        return self.abs_sum / max(self.n_rows, 1)
+
+    @property
+    def dependence(self) -> np.ndarray:
+        """``(K, K, n_bins)`` mean ``phi[i, j]`` per bin of feature ``i`` (NaN for empty bins)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.bin_sums / self.bin_counts[:, None, :]
+
+    def pairs(self) -> pd.DataFrame:
+        """Feature pairs by total interaction strength (``phi[i, j] + phi[j, i]``)."""
+        a, b = np.triu_indices(len(self.features), k=1)
+        n = max(self.n_rows, 1)
+        frame = pd.DataFrame({
+            "feature_a": [self.features[i] for i in a],
+            "feature_b": [self.features[j] for j in b],
+            "mean_abs_interaction": (self.abs_sum[a, b] + self.abs_sum[b, a]) / n,
+            "mean_interaction": (self.sum[a, b] + self.sum[b, a]) / n,
+        })
+        return frame.sort_values("mean_abs_interaction", ascending=False, ignore_index=True)
+
+    def save(self, path: Path) -> Path:
+        np.savez_compressed(
+            path,
+            features=np.asarray(self.features),
+            edges=self.edges,
+            n_rows=self.n_rows,
+            abs_sum=self.abs_sum,
+            sum=self.sum,
+            bin_counts=self.bin_counts,
+            bin_sums=self.bin_sums,
+        )
+        return Path(path)
+
+    @classmethod
+    def load(cls, path: Path) -> InteractionSummary:
+        with np.load(path) as data:
+            return cls(
+                features=data["features"].tolist(),
+                edges=data["edges"],
+                n_rows=int(data["n_rows"]),
+                abs_sum=data["abs_sum"],
+                sum=data["sum"],
+                bin_counts=data["bin_counts"],
+                bin_sums=data["bin_sums"],
+            )
+
+
+def quantile_edges(values: np.ndarray, n_bins: int) -> np.ndarray:
+    """``(K, n_bins + 1)`` quantile bin edges per column, ignoring NaNs."""
+    with np.errstate(invalid="ignore"):
+        edges = np.nanquantile(values, np.linspace(0, 1, n_bins + 1), axis=0).T
+    return np.nan_to_num(edges)
+
+
+def _interaction_state(model_str: str, top: np.ndarray) -> dict[str, Any]:
+    """Build the TreeSHAP explainer once per worker process."""
+    import lightgbm as lgb
+    import shap
+
+    return {"explainer": shap.TreeExplainer(lgb.Booster(model_str=model_str)), "top": top}
+
+
+def _interaction_chunk(X: np.ndarray, features: list[str], edges: np.ndarray) -> InteractionSummary:
+    """Explain one chunk and reduce it to a top-K summary (runs in a worker)."""
+    state = worker_state()
+    top = state["top"]
+    phi = np.asarray(state["explainer"].shap_interaction_values(X))
+    summary = InteractionSummary.empty(features, edges)
+    summary.update(phi[:, top][:, :, top], X[:, top])
+    return summary
+
+
+def interaction_summary(
+    booster,
+    X: np.ndarray,
+    top: list[int],
+    n_bins: int = 20,
+    chunk_rows: int = 1024,
+    workers: int | None = None,
+) -> InteractionSummary:
+    """SHAP interaction aggregates for the features at indices ``top``.
+
+    Uses ``shap.TreeExplainer(...).shap_interaction_values`` (LightGBM
+    has no native interaction output).  Each chunk's ``chunk_rows × F × F``
+    result lives only inside its worker.
+
+    Parameters
+    ----------
+    booster : lightgbm.Booster
+        Model to explain.
+    X : np.ndarray
+        ``(n_rows, n_features)`` model inputs.
+    top : list[int]
+        Feature indices to keep, most important first.
+    n_bins : int
+        Quantile bins per feature for the dependence curves.
+    chunk_rows : int
+        Rows per task.
+    workers : int, optional
+        Worker processes; every core by default.  ``1`` runs in-process.
+
+    Returns
+    -------
+    InteractionSummary
+    """
+    top_idx = np.asarray(top, dtype=np.intp)
+    features = [booster.feature_name()[j] for j in top_idx]
+    edges = quantile_edges(X[:, top_idx], n_bins)
+    summary = InteractionSummary.empty(features, edges)
+    chunks = [X[start:start + chunk_rows] for start in range(0, len(X), chunk_rows)]
+    workers = min(workers or os.cpu_count() or 1, max(len(chunks), 1))
+    model_str = booster.model_to_string()
+
+    started = time.perf_counter()
+    if workers == 1:
+        init_worker(_interaction_state, model_str, top_idx)
+        for chunk in chunks:
+            summary.merge(_interaction_chunk(chunk, features, edges))
+    else:
+        with spawn_pool(workers, _interaction_state, model_str, top_idx) as pool:
+            for part in pool.map(_interaction_chunk, chunks, [features] * len(chunks), [edges] * len(chunks)):
+                summary.merge(part)
+    logger.info(
+        "SHAP interactions (top %s): %s rows in %.1fs with %s workers",
+        len(features), f"{len(X):,}", time.perf_counter() - started, workers,
+    )
+    return summary
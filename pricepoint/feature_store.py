@@ -0,0 +1,431 @@
+"""Online feature store for incremental feature updates.
+
+Keeps a compact ring buffer of recent prices per
+(canonical_name, supermarket) series so that the temporal features
+produced by :func:`pricepoint.feature_engineering.add_temporal_features`
+can be emitted for a micro-batch of new observations without
+re-running the batch pipeline over the full history.
+
+State is persisted as plain ``.npy`` arrays plus a Parquet key index,
+so it can be opened memory-mapped and updated in place.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pricepoint.config import Settings
+from pricepoint.feature_engineering import (
+    add_competitive_features,
+    add_cyclical_features,
+)
+
+logger = logging.getLogger(__name__)
+
+KEY_COLS = ["canonical_name", "supermarket"]
+
+_ARRAY_FILES = ("values", "head", "count", "last_date")
+
+
+class OnlineFeatureStore:
+    """Per-series ring buffers of recent prices.
+
+    Parameters
+    ----------
+    keys : pd.MultiIndex
+        Series keys as (canonical_name, supermarket).
+    values : np.ndarray
+        ``(n_keys, capacity)`` float32 ring buffer of prices.
+    head : np.ndarray
+        Next write position for each series.
+    count : np.ndarray
+        Number of valid observations in each buffer (capped at capacity).
+    last_date : np.ndarray
+        Day number (days since epoch) of the latest observation per series.
+    rolling_windows : list[int]
+        Rolling window sizes, as in ``features.rolling_windows``.
+    lag_days : list[int]
+        Lag periods, as in ``features.lag_days``.
+    """
+
+    def __init__(
+        self,
+        keys: pd.MultiIndex,
+        values: np.ndarray,
+        head: np.ndarray,
+        count: np.ndarray,
+        last_date: np.ndarray,
+        rolling_windows: list[int],
+        lag_days: list[int],
+    ) -> None:
+        self.keys = keys
+        self.values = values
+        self.head = head
+        self.count = count
+        self.last_date = last_date
+        self.rolling_windows = list(rolling_windows)
+        self.lag_days = list(lag_days)
+        self._path: Path | None = None
+        self._grown = False
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def required_capacity(rolling_windows: list[int], lag_days: list[int]) -> int:
+        """Smallest buffer length that serves every window and lag."""
+        return max([*rolling_windows, *(lag + 1 for lag in lag_days), 2])
+
+    @classmethod
+    def from_history(
+        cls,
+        df: pd.DataFrame,
+        rolling_windows: list[int],
+        lag_days: list[int],
+    ) -> OnlineFeatureStore:
+        """Bootstrap the store from historical canonical price data.
+
+        Only the last ``capacity`` observations of each series are kept.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Canonical products data with ``canonical_name``, ``supermarket``,
+            ``date`` and ``prices``.
+        rolling_windows : list[int]
+            Rolling window sizes.
+        lag_days : list[int]
+            Lag periods.
+
+        Returns
+        -------
+        OnlineFeatureStore
+            Store positioned after the latest observation of every series.
+        """
+        capacity = cls.required_capacity(rolling_windows, lag_days)
+        logger.info(
+            "Bootstrapping online feature store from %s rows (capacity=%s) …",
+            f"{len(df):,}",
+            capacity,
+        )
+
+        hist = df[[*KEY_COLS, "date", "prices"]].sort_values([*KEY_COLS, "date"])
+        hist = hist.groupby(KEY_COLS, observed=True, sort=False).tail(capacity)
+
+        codes, keys = pd.MultiIndex.from_frame(hist[KEY_COLS].astype(str)).factorize()
+        keys = keys.set_names(KEY_COLS)
+        pos = hist.groupby(codes, sort=False).cumcount().to_numpy()
+
+        n_keys = len(keys)
+        values = np.full((n_keys, capacity), np.nan, dtype=np.float32)
+        values[codes, pos] = hist["prices"].to_numpy(dtype=np.float32)
+
+        count = np.bincount(codes, minlength=n_keys).astype(np.int32)
+        head = (count % capacity).astype(np.int32)
+        last_date = np.full(n_keys, np.iinfo(np.int64).min, dtype=np.int64)
+        np.maximum.at(last_date, codes, _day_numbers(hist["date"]))
+
+        logger.info("Online feature store initialised with %s series.", f"{n_keys:,}")
+        return cls(keys, values, head, count, last_date, rolling_windows, lag_days)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, store_dir: Path) -> Path:
+        """Persist the store to ``store_dir``.
+
+        When the store was opened memory-mapped from the same directory and
+        no new series were added, dirty pages are flushed in place.
+        """
+        store_dir = Path(store_dir)
+        if self._path == store_dir and not self._grown:
+            for name in _ARRAY_FILES:
+                arr = getattr(self, name)
+                if isinstance(arr, np.memmap):
+                    arr.flush()
+            logger.info("Flushed online feature store in place at %s", store_dir)
+            return store_dir
+
+        store_dir.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAY_FILES:
+            np.save(store_dir / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        self.keys.to_frame(index=False).to_parquet(store_dir / "keys.parquet", index=False)
+        meta = {
+            "rolling_windows": self.rolling_windows,
+            "lag_days": self.lag_days,
+            "capacity": int(self.values.shape[1]),
+        }
+        with open(store_dir / "meta.json", "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, indent=2)
+
+        logger.info("Saved online feature store (%s series) to %s", f"{len(self.keys):,}", store_dir)
+        return store_dir
+
+    @classmethod
+    def load(cls, store_dir: Path, mmap: bool = True) -> OnlineFeatureStore:
+        """Open a persisted store.
+
+        Parameters
+        ----------
+        store_dir : Path
+            Directory written by :meth:`save`.
+        mmap : bool
+            Memory-map the state arrays (read/write) instead of loading them.
+        """
+        store_dir = Path(store_dir)
+        with open(store_dir / "meta.json", "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+
+        mode = "r+" if mmap else None
+        arrays = {name: np.load(store_dir / f"{name}.npy", mmap_mode=mode) for name in _ARRAY_FILES}
+        keys = pd.MultiIndex.from_frame(pd.read_parquet(store_dir / "keys.parquet"))
+
+        store = cls(
+            keys=keys,
+            rolling_windows=meta["rolling_windows"],
+            lag_days=meta["lag_days"],
+            **arrays,
+        )
+        store._path = store_dir
+        return store
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    @property
+    def capacity(self) -> int:
+        return int(self.values.shape[1])
+
+    @property
+    def feature_columns(self) -> list[str]:
+        """Temporal feature columns, in the batch pipeline's order."""
+        return temporal_feature_columns(self.rolling_windows, self.lag_days)
+
+    def update(self, batch: pd.DataFrame) -> pd.DataFrame:
+        """Ingest a micro-batch of prices and emit model-ready features.
+
+        Observations that are not newer than the latest stored date of
+        their series are skipped.  Competitive features are computed
+        within the batch, so a batch should contain every retailer's
+        prices for the dates it covers.
+
+        Parameters
+        ----------
+        batch : pd.DataFrame
+            New rows with ``canonical_name``, ``supermarket``, ``date`` and
+            ``prices`` (extra columns are passed through).
+
+        Returns
+        -------
+        pd.DataFrame
+            The accepted rows with temporal, competitive and cyclical
+            features appended.
+        """
+        batch = batch.copy()
+        batch["date"] = pd.to_datetime(batch["date"])
+        batch = batch.sort_values("date", kind="stable").reset_index(drop=True)
+
+        ids = self._ensure_keys(batch)
+        days = _day_numbers(batch["date"])
+        prices = batch["prices"].to_numpy(dtype=np.float64)
+
+        # Observations of the same series are applied in date order, one
+        # "round" per occurrence; a daily batch normally has a single round.
+        rounds = pd.Series(ids).groupby(ids).cumcount().to_numpy()
+        accepted = np.zeros(len(batch), dtype=bool)
+        features = {col: np.full(len(batch), np.nan) for col in self.feature_columns}
+
+        for r in range(int(rounds.max()) + 1 if len(batch) else 0):
+            rows = np.flatnonzero(rounds == r)
+            fresh = days[rows] > self.last_date[ids[rows]]
+            rows = rows[fresh]
+            if not len(rows):
+                continue
+            self._push(ids[rows], prices[rows], days[rows])
+            self._compute(ids[rows], prices[rows], rows, features)
+            accepted[rows] = True
+
+        n_stale = int((~accepted).sum())
+        if n_stale:
+            logger.warning("Skipped %s stale observations already in the store.", f"{n_stale:,}")
+
+        for col, arr in features.items():
+            batch[col] = arr
+        batch = batch[accepted]
+
+        batch = add_competitive_features(batch)
+        batch = add_cyclical_features(batch)
+        return batch.reset_index(drop=True)
+
+    def latest(self, ids: np.ndarray) -> np.ndarray:
+        """Newest stored price of each series (NaN for an empty series)."""
+        return self._recent(ids, 1)[:, 0]
+
+    def step(self, ids: np.ndarray, prices: np.ndarray, day: int | np.ndarray) -> dict[str, np.ndarray]:
+        """Push one price per series and return their temporal features.
+
+        Unlike :meth:`update` there is no key lookup or staleness check:
+        ``ids`` must be distinct, existing series ids and ``day`` (days
+        since the epoch) is taken as their new latest date.
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            ``feature_columns`` mapped to arrays aligned with ``ids``.
+        """
+        self._push(ids, prices, day)
+        features = {col: np.full(len(ids), np.nan) for col in self.feature_columns}
+        self._compute(ids, prices, np.arange(len(ids)), features)
+        return features
+
+    def overwrite_latest(self, ids: np.ndarray, prices: np.ndarray) -> None:
+        """Replace the newest stored price of each series in place."""
+        self.values[ids, (self.head[ids] - 1) % self.capacity] = prices
+
+    def _ensure_keys(self, batch: pd.DataFrame) -> np.ndarray:
+        """Map batch rows to series ids, appending unseen series."""
+        lookup = pd.MultiIndex.from_frame(batch[KEY_COLS].astype(str))
+        ids = self.keys.get_indexer(lookup)
+
+        missing = ids < 0
+        if missing.any():
+            new_keys = lookup[missing].unique()
+            n_new = len(new_keys)
+            logger.info("Adding %s new series to the online feature store.", f"{n_new:,}")
+            self.keys = self.keys.append(new_keys)
+            self.values = np.concatenate(
+                [self.values, np.full((n_new, self.capacity), np.nan, dtype=np.float32)]
+            )
+            self.head = np.concatenate([self.head, np.zeros(n_new, dtype=np.int32)])
+            self.count = np.concatenate([self.count, np.zeros(n_new, dtype=np.int32)])
+            self.last_date = np.concatenate(
+                [self.last_date, np.full(n_new, np.iinfo(np.int64).min, dtype=np.int64)]
+            )
+            self._grown = True
+            ids = self.keys.get_indexer(lookup)
+
+        return ids.astype(np.intp)
+
+    def _push(self, ids: np.ndarray, prices: np.ndarray, days: int | np.ndarray) -> None:
+        """Write one observation per series into its ring buffer."""
+        self.values[ids, self.head[ids]] = prices
+        self.head[ids] = (self.head[ids] + 1) % self.capacity
+        self.count[ids] = np.minimum(self.count[ids] + 1, self.capacity)
+        self.last_date[ids] = days
+
+    def _recent(self, ids: np.ndarray, n: int) -> np.ndarray:
+        """Last ``n`` prices per series, newest first (NaN where absent)."""
+        offsets = np.arange(n)
+        idx = (self.head[ids, None] - 1 - offsets) % self.capacity
+        vals = self.values[ids[:, None], idx].astype(np.float64)
+        return np.where(offsets < self.count[ids, None], vals, np.nan)
+
+    def _compute(
+        self,
+        ids: np.ndarray,
+        prices: np.ndarray,
+        rows: np.ndarray,
+        out: dict[str, np.ndarray],
+    ) -> None:
+        """Fill temporal features for series that were just pushed."""
+        recent = self._recent(ids, self.capacity)
+        valid = ~np.isnan(recent)
+
+        for window in self.rolling_windows:
+            vals, mask = recent[:, :window], valid[:, :window]
+            n = mask.sum(axis=1)
+            mean = np.nansum(vals, axis=1) / n
+            sq = np.where(mask, (vals - mean[:, None]) ** 2, 0.0).sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                std = np.where(n > 1, np.sqrt(sq / (n - 1)), np.nan)
+            out[f"price_rol_mean_{window}d"][rows] = mean
+            out[f"price_rol_std_{window}d"][rows] = std
+            out[f"price_rol_max_{window}d"][rows] = np.nanmax(vals, axis=1)
+            out[f"price_rol_min_{window}d"][rows] = np.nanmin(vals, axis=1)
+
+        for lag in self.lag_days:
+            out[f"price_lag_{lag}d"][rows] = recent[:, lag]
+
+        out["price_diff_1d"][rows] = prices - recent[:, 1]
+
+
+def temporal_feature_columns(rolling_windows: list[int], lag_days: list[int]) -> list[str]:
+    """Columns produced by ``add_temporal_features``, in its order."""
+    cols: list[str] = []
+    for window in rolling_windows:
+        cols += [
+            f"price_rol_mean_{window}d",
+            f"price_rol_std_{window}d",
+            f"price_rol_max_{window}d",
+            f"price_rol_min_{window}d",
+        ]
+    cols += [f"price_lag_{lag}d" for lag in lag_days]
+    cols.append("price_diff_1d")
+    return cols
+
+
+def _day_numbers(dates: pd.Series) -> np.ndarray:
+    """Convert datetimes to integer days since the epoch."""
+    return pd.to_datetime(dates).to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+
+def run_online_features(settings: Settings, batch_path: Path) -> Path:
+    """Update the online feature store with a batch file and emit features.
+
+    The store is bootstrapped from the canonical products data the first
+    time it is used.
+
+    Parameters
+    ----------
+    settings : Settings
+        Application settings.
+    batch_path : Path
+        Parquet or CSV file with new price observations.
+
+    Returns
+    -------
+    Path
+        Path to the emitted feature Parquet file.
+    """
+    store_dir = settings.features.store_dir
+    cfg = settings.features
+
+    if (store_dir / "meta.json").exists():
+        store = OnlineFeatureStore.load(store_dir)
+    else:
+        canonical_path = settings.data.processed_dir / settings.matching.output_filename
+        if not canonical_path.exists():
+            raise FileNotFoundError(
+                f"Canonical products not found at {canonical_path}. Run matching first."
+            )
+        logger.info("Loading canonical products from %s …", canonical_path)
+        history = pd.read_parquet(
+            canonical_path, columns=[*KEY_COLS, "date", "prices"], engine="pyarrow"
+        )
+        history["date"] = pd.to_datetime(history["date"])
+        store = OnlineFeatureStore.from_history(history, cfg.rolling_windows, cfg.lag_days)
+
+    batch_path = Path(batch_path)
+    logger.info("Loading price batch from %s …", batch_path)
+    if batch_path.suffix == ".csv":
+        batch = pd.read_csv(batch_path)
+    else:
+        batch = pd.read_parquet(batch_path, engine="pyarrow")
+
+    features = store.update(batch)
+    store.save(store_dir)
+
+    output_path = settings.data.processed_dir / f"{batch_path.stem}_features.parquet"
+    features.to_parquet(output_path, compression="snappy", index=False)
+    logger.info(
+        "Online features emitted for %s rows. Output: %s", f"{len(features):,}", output_path
+    )
+    return output_path
@@ -0,0 +1,107 @@
+"""Precompiled single-row feature vectors for interactive prediction.
+
+Building a model input through ``pd.DataFrame`` → ``pd.get_dummies`` →
+``reindex`` costs far more than scoring one row with a LightGBM model.
+:class:`FeatureVectorBuilder` resolves, once per model, which slot of
+the input vector every numeric value, one-hot level and native category
+code lands in, and then fills a preallocated row in place.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import numpy as np
+
+from pricepoint.training import model_feature_names
+
+
+class FeatureVectorBuilder:
+    """Fill a reusable model input row from raw feature values.
+
+    Features absent from a :meth:`build` call are 0, matching the
+    training-time ``reindex(fill_value=0)``.  Categorical columns are
+    written either to their one-hot slot (``<column>_<level>``; the
+    dropped first level and unseen levels leave every slot at 0) or, for
+    native-categorical models, as the category code (NaN when unseen).
+
+    Parameters
+    ----------
+    feature_names : list[str]
+        Model features, in order.
+    categorical_columns : Sequence[str]
+        Raw categorical columns (e.g. ``["supermarket", "category"]``).
+    categories : dict, optional
+        Native-categorical vocabularies (from the model schema).
+    dtype : numpy dtype
+        Row dtype; float32 by default.
+
+    Notes
+    -----
+    :meth:`build` returns the builder's own buffer, overwritten by the
+    next call — copy it if it must outlive the prediction.
+    """
+
+    def __init__(
+        self,
+        feature_names: list[str],
+        categorical_columns: Sequence[str] = ("supermarket",),
+        categories: dict[str, list[str]] | None = None,
+        dtype=np.float32,
+    ) -> None:
+        categories = categories or {}
+        self.feature_names = list(feature_names)
+        self.index: dict[str, int] = {name: j for j, name in enumerate(self.feature_names)}
+        self.onehot: dict[str, dict[str, int]] = {}
+        self.codes: dict[str, tuple[int, dict[str, int]]] = {}
+        for col in categorical_columns:
+            if col in categories and col in self.index:
+                self.codes[col] = (self.index[col], {v: i for i, v in enumerate(categories[col])})
+                continue
+            prefix = f"{col}_"
+            self.onehot[col] = {
+                name[len(prefix):]: j for j, name in enumerate(self.feature_names) if name.startswith(prefix)
+            }
+        categorical_slots = {j for j, _ in self.codes.values()}
+        categorical_slots.update(j for slots in self.onehot.values() for j in slots.values())
+        self.numeric_features = [n for j, n in enumerate(self.feature_names) if j not in categorical_slots]
+        self._row = np.zeros((1, len(self.feature_names)), dtype=dtype)
+
+    @classmethod
+    def for_model(
+        cls,
+        model,
+        categorical_columns: Sequence[str] = ("supermarket",),
+        categories: dict[str, list[str]] | None = None,
+        dtype=np.float32,
+    ) -> FeatureVectorBuilder:
+        """Builder for an ``LGBMRegressor`` or native ``Booster``."""
+        return cls(model_feature_names(model), categorical_columns, categories, dtype)
+
+    def build(self, values: Mapping[str, Any], **categoricals: str | None) -> np.ndarray:
+        """Return a ``(1, n_features)`` row for ``values`` and categorical levels.
+
+        Parameters
+        ----------
+        values : Mapping[str, Any]
+            Numeric features by model feature name; unknown keys are ignored.
+        **categoricals
+            Categorical levels by raw column, e.g. ``supermarket="Tesco"``.
+        """
+        row = self._row[0]
+        row.fill(0.0)
+        index = self.index
+        for name, value in values.items():
+            j = index.get(name)
+            if j is not None:
+                row[j] = np.nan if value is None else value
+        for col, level in categoricals.items():
+            if col in self.codes:
+                j, codes = self.codes[col]
+                row[j] = codes.get(level, np.nan)
+            else:
+                j = self.onehot.get(col, {}).get(level)
+                if j is not None:
+                    row[j] = 1.0
+        return self._row
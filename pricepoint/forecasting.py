@@ -0,0 +1,295 @@
+"""Vectorized multi-horizon recursive forecasting.
+
+The model predicts a day's price from that day's lag, rolling-window,
+competitive and calendar features.  Forecasting ``h`` days ahead rolls
+those features forward for every (canonical_name, supermarket) series at
+once: the price history lives in an
+:class:`~pricepoint.feature_store.OnlineFeatureStore` ring buffer, and each
+horizon step is
+
+1. push a provisional price (the series' latest known or forecast
+   price) for the new day — the feature pipeline's rolling windows
+   include the current day, whose price is exactly what is unknown;
+2. recompute temporal features from the buffers and the market average,
+   rank and cheapest flag per product, all in NumPy;
+3. one batched ``predict`` over all series;
+4. overwrite the provisional price with the forecast, which feeds the
+   next step's lags and windows.
+
+Static features (one-hot or native-categorical retailer/category,
+``own_brand`` …) are written into the input matrix once; each step only
+overwrites the dynamic columns.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pricepoint.config import Settings
+from pricepoint.feature_store import (
+    KEY_COLS,
+    OnlineFeatureStore,
+    temporal_feature_columns,
+)
+from pricepoint.registry import load_current_model
+from pricepoint.scoring import build_column_plan, fill_matrix
+from pricepoint.training import NON_FEATURE_COLS, TARGET_COL
+
+logger = logging.getLogger(__name__)
+
+COMPETITIVE_COLS = ["price_vs_market_avg", "price_rank", "is_cheapest_in_market"]
+CYCLICAL_COLS = [
+    "day_of_week_sin", "day_of_week_cos",
+    "day_of_month_sin", "day_of_month_cos",
+    "week_of_year_sin", "week_of_year_cos",
+]
+
+
+@dataclass
+class ForecastCube:
+    """Forecast prices for every series and horizon day.
+
+    Attributes
+    ----------
+    keys : pd.DataFrame
+        ``canonical_name`` and ``supermarket`` per series (cube rows).
+    dates : np.ndarray
+        ``datetime64[D]`` forecast dates (cube columns).
+    values : np.ndarray
+        ``(n_series, horizon)`` float32 forecast prices.
+    """
+
+    keys: pd.DataFrame
+    dates: np.ndarray
+    values: np.ndarray
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long format: one row per series and date."""
+        n_series, horizon = self.values.shape
+        frame = self.keys.iloc[np.repeat(np.arange(n_series), horizon)].reset_index(drop=True)
+        frame["date"] = np.tile(self.dates.astype("datetime64[ns]"), n_series)
+        frame["horizon"] = np.tile(np.arange(1, horizon + 1, dtype=np.int16), n_series)
+        frame["forecast"] = self.values.ravel()
+        return frame
+
+    def save(self, output_dir: Path) -> Path:
+        """Write ``values.npy``, ``dates.npy`` and ``keys.parquet``."""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        np.save(output_dir / "values.npy", self.values)
+        np.save(output_dir / "dates.npy", self.dates)
+        self.keys.to_parquet(output_dir / "keys.parquet", index=False)
+        return output_dir
+
+    @classmethod
+    def load(cls, output_dir: Path, mmap: bool = True) -> ForecastCube:
+        output_dir = Path(output_dir)
+        return cls(
+            keys=pd.read_parquet(output_dir / "keys.parquet"),
+            dates=np.load(output_dir / "dates.npy"),
+            values=np.load(output_dir / "values.npy", mmap_mode="r" if mmap else None),
+        )
+
+
+def competitive_features(product_codes: np.ndarray, prices: np.ndarray) -> dict[str, np.ndarray]:
+    """Market average gap, dense price rank and cheapest flag per product.
+
+    Vectorized equivalent of
+    :func:`pricepoint.feature_engineering.add_competitive_features` for
+    one day, where ``product_codes`` groups the series of each product.
+    """
+    n_products = int(product_codes.max()) + 1 if len(product_codes) else 0
+    valid = ~np.isnan(prices)
+    sums = np.bincount(product_codes[valid], prices[valid], minlength=n_products)
+    counts = np.bincount(product_codes[valid], minlength=n_products)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        market_avg = sums / counts
+
+    # Dense rank: count distinct prices up to each one within its product.
+    order = np.lexsort((prices, product_codes))
+    p, g = prices[order], product_codes[order]
+    new_group = np.r_[True, g[1:] != g[:-1]]
+    new_value = new_group | np.r_[True, p[1:] != p[:-1]]
+    dense = np.cumsum(new_value)
+    dense -= np.maximum.accumulate(np.where(new_group, dense - 1, 0))
+    rank = np.empty(len(prices))
+    rank[order] = dense
+    rank[~valid] = np.nan
+
+    return {
+        "price_vs_market_avg": prices - market_avg[product_codes],
+        "price_rank": rank,
+        "is_cheapest_in_market": (rank == 1).astype(np.float64),
+    }
+
+
+def dynamic_columns(rolling_windows: list[int], lag_days: list[int]) -> list[str]:
+    """Feature columns recomputed at every horizon step."""
+    return [*temporal_feature_columns(rolling_windows, lag_days), *COMPETITIVE_COLS, *CYCLICAL_COLS]
+
+
+def static_columns(columns: list[str], feature_names: list[str], dynamic: list[str]) -> list[str]:
+    """Input columns the model needs that stay fixed over the horizon."""
+    return [
+        c for c in columns
+        if c not in {*dynamic, *NON_FEATURE_COLS, *KEY_COLS, TARGET_COL}
+        and (c in feature_names or any(f.startswith(f"{c}_") for f in feature_names))
+    ]
+
+
+def cyclical_features(day: np.datetime64) -> dict[str, float]:
+    """Calendar encodings of one date, as in ``add_cyclical_features``."""
+    ts = pd.Timestamp(day)
+    week = ts.isocalendar().week
+    return {
+        "day_of_week_sin": np.sin(2 * np.pi * ts.dayofweek / 7),
+        "day_of_week_cos": np.cos(2 * np.pi * ts.dayofweek / 7),
+        "day_of_month_sin": np.sin(2 * np.pi * ts.day / 31),
+        "day_of_month_cos": np.cos(2 * np.pi * ts.day / 31),
+        "week_of_year_sin": np.sin(2 * np.pi * week / 52),
+        "week_of_year_cos": np.cos(2 * np.pi * week / 52),
+    }
+
+
+def recursive_forecast(
+    predictor,
+    feature_names: list[str],
+    history: pd.DataFrame,
+    horizon: int,
+    rolling_windows: list[int],
+    lag_days: list[int],
+    categories: dict[str, list[str]] | None = None,
+    num_threads: int | None = None,
+) -> ForecastCube:
+    """Forecast ``horizon`` days for every series in ``history``.
+
+    Parameters
+    ----------
+    predictor
+        Object with ``predict(X)`` over ``feature_names`` columns.
+    feature_names : list[str]
+        Model features, in order.
+    history : pd.DataFrame
+        Feature data (or canonical prices) with ``canonical_name``,
+        ``supermarket``, ``date`` and ``prices``; other non-derived columns
+        are carried forward from each series' latest row.
+    horizon : int
+        Days to forecast past the latest date in ``history``.
+    rolling_windows, lag_days : list[int]
+        As in ``features`` settings.
+    categories : dict, optional
+        Native-categorical vocabularies from the model schema.
+    num_threads : int, optional
+        LightGBM prediction threads.
+
+    Returns
+    -------
+    ForecastCube
+    """
+    import pyarrow as pa
+
+    history = history.sort_values([*KEY_COLS, "date"])
+    store = OnlineFeatureStore.from_history(history, rolling_windows, lag_days)
+    dynamic = dynamic_columns(rolling_windows, lag_days)
+
+    # Latest row per series.  ``history`` is sorted by key like the
+    # store's own bootstrap, so series boundaries follow the store's key order.
+    key_values = [history[c].astype(str).to_numpy() for c in KEY_COLS]
+    is_last = np.r_[np.logical_or.reduce([k[1:] != k[:-1] for k in key_values]), True]
+    static = history.loc[is_last, static_columns(list(history.columns), feature_names, dynamic)]
+    static = static.reset_index(drop=True)
+    static[KEY_COLS] = store.keys.to_frame(index=False)
+
+    n_series = len(store.keys)
+    ids = np.arange(n_series, dtype=np.intp)
+    product_codes = pd.factorize(store.keys.get_level_values("canonical_name"))[0]
+    table = pa.Table.from_pandas(static.assign(**dict.fromkeys(dynamic, 0.0)), preserve_index=False)
+    plan = build_column_plan(feature_names, table.schema, categories)
+    X = np.empty((n_series, len(feature_names)), dtype=np.float64)
+    fill_matrix(plan, table, X)
+    slots = {name: j for j, name in enumerate(feature_names) if name in dynamic}
+
+    start_day = np.datetime64(int(store.last_date.max()), "D")
+    dates = start_day + np.arange(1, horizon + 1)
+    values = np.empty((n_series, horizon), dtype=np.float32)
+    logger.info(
+        "Forecasting %s series × %s days from %s …", f"{n_series:,}", horizon, start_day
+    )
+
+    started = time.perf_counter()
+    for h, day in enumerate(dates):
+        provisional = store.latest(ids)
+        features = store.step(ids, provisional, day.astype(np.int64))
+        features.update(competitive_features(product_codes, provisional))
+        features.update(cyclical_features(day))
+        for name, j in slots.items():
+            X[:, j] = features[name]
+
+        preds = predictor.predict(X, **({"num_threads": num_threads} if num_threads else {}))
+        store.overwrite_latest(ids, preds)
+        values[:, h] = preds
+
+    logger.info(
+        "Forecast complete: %s predictions in %.2fs", f"{values.size:,}", time.perf_counter() - started
+    )
+    return ForecastCube(keys=store.keys.to_frame(index=False), dates=dates, values=values)
+
+
+def run_forecast(settings: Settings, horizon: int | None = None, output_dir: Path | None = None) -> Path:
+    """Forecast every series with the current model and save the cube.
+
+    Parameters
+    ----------
+    settings : Settings
+        Application settings.
+    horizon : int, optional
+        Days ahead; defaults to ``scoring.forecast_horizon``.
+    output_dir : Path, optional
+        Cube directory; defaults to ``scoring.forecast_dir``.
+
+    Returns
+    -------
+    Path
+        Directory holding the saved :class:`ForecastCube`.
+    """
+    import pyarrow.parquet as pq
+
+    cfg = settings.scoring
+    feature_path = settings.data.processed_dir / settings.features.output_filename
+    if not feature_path.exists():
+        raise FileNotFoundError(f"Feature data not found at {feature_path}. Run features first.")
+
+    predictor, schema = load_current_model(settings)
+    capacity = OnlineFeatureStore.required_capacity(
+        settings.features.rolling_windows, settings.features.lag_days
+    )
+    columns = pq.read_schema(feature_path).names
+    dynamic = dynamic_columns(settings.features.rolling_windows, settings.features.lag_days)
+    logger.info("Loading price history from %s …", feature_path)
+    history = pd.read_parquet(
+        feature_path,
+        columns=[*KEY_COLS, "date", TARGET_COL, *static_columns(columns, schema["feature_names"], dynamic)],
+        engine="pyarrow",
+    )
+    history["date"] = pd.to_datetime(history["date"])
+    history = history.sort_values([*KEY_COLS, "date"]).groupby(KEY_COLS, observed=True).tail(capacity)
+
+    cube = recursive_forecast(
+        predictor,
+        schema["feature_names"],
+        history,
+        horizon or cfg.forecast_horizon,
+        settings.features.rolling_windows,
+        settings.features.lag_days,
+        schema.get("categories"),
+        cfg.num_threads,
+    )
+    path = cube.save(output_dir or cfg.forecast_dir)
+    logger.info("Forecast cube (%s × %s) saved to %s", *cube.values.shape, path)
+    return path
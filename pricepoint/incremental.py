@@ -0,0 +1,190 @@
+"""Warm-start incremental retraining.
+
+Instead of refitting every tree on the full history, a daily refresh
+loads the current model (the registry's current version) and either
+
+* **continues** boosting a few rounds on a recent-data window
+  (``init_model``), or
+* **refits** the existing trees' leaf values on that window while keeping
+  their structure (``Booster.refit``).
+
+The candidate is scored against the current model on the trailing
+holdout days and only replaces it when it is better: the promoted
+Booster is registered as a new registry version and made current, and
+the previous version stays in the registry for ``run.py registry
+rollback``.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from pricepoint.config import Settings
+from pricepoint.registry import load_current_model, register_trained_model
+from pricepoint.training import (
+    NON_FEATURE_COLS,
+    TARGET_COL,
+    dataset_params,
+    encode_categorical,
+    train_booster,
+)
+
+logger = logging.getLogger(__name__)
+
+INCREMENTAL_MODES = ("continue", "refit")
+
+
+def feature_matrix(
+    df: pd.DataFrame,
+    feature_names: list[str],
+    schema: dict[str, Any] | None = None,
+) -> tuple[pd.DataFrame, pd.Series]:
+    """Build model-ordered features and the target for already-trained models.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Feature-engineered rows.
+    feature_names : list[str]
+        The model's feature names, in order.
+    schema : dict, optional
+        Native-categorical schema sidecar; one-hot encoding is used when
+        omitted.
+
+    Returns
+    -------
+    tuple
+        (X, y) restricted to rows with a target (and, for one-hot models,
+        complete features, as in :func:`prepare_training_data`).
+    """
+    y = df[TARGET_COL]
+    if schema is not None:
+        X = pd.DataFrame(
+            {
+                col: encode_categorical(df[col], schema["categories"][col])
+                if col in schema["categories"]
+                else df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+                for col in feature_names
+            },
+            index=df.index,
+        )
+        mask = y.notna()
+    else:
+        drop_cols = [c for c in NON_FEATURE_COLS if c in df.columns]
+        cat_cols = [
+            c for c in df.select_dtypes(include=["object", "category"]).columns if c not in drop_cols
+        ]
+        # Without drop_first, every level gets a column and the reindex drops
+        # whichever baseline level the model was trained without.
+        X = pd.get_dummies(df.drop(columns=drop_cols), columns=cat_cols).reindex(
+            columns=feature_names, fill_value=0
+        )
+        mask = y.notna() & X.notna().all(axis=1)
+    return X[mask], y[mask]
+
+
+def _load_recent(feature_path: Path, days: int) -> pd.DataFrame:
+    """Read only the trailing ``days`` of feature data."""
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    latest = pc.max(pq.read_table(feature_path, columns=["date"]).column("date")).as_py()
+    start = pd.Timestamp(latest) - pd.Timedelta(days=days)
+    df = pd.read_parquet(feature_path, engine="pyarrow", filters=[("date", ">", start)])
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def _mae(booster, X: pd.DataFrame, y: pd.Series) -> float:
+    return float(np.mean(np.abs(booster.predict(X) - y.to_numpy())))
+
+
+def run_incremental_training(settings: Settings, mode: str | None = None) -> dict[str, Any]:
+    """Warm-start the current model on recent days; promote it only if it improves.
+
+    Parameters
+    ----------
+    settings : Settings
+        Application settings.
+    mode : str, optional
+        ``"continue"`` or ``"refit"``; defaults to
+        ``settings.training.incremental_mode``.
+
+    Returns
+    -------
+    dict
+        Holdout MAE of the previous and candidate models and whether the
+        candidate was promoted.
+    """
+    cfg = settings.training
+    mode = mode or cfg.incremental_mode
+    if mode not in INCREMENTAL_MODES:
+        raise ValueError(f"Unknown incremental mode {mode!r}; expected one of {INCREMENTAL_MODES}.")
+
+    feature_path = settings.data.processed_dir / settings.features.output_filename
+    if not feature_path.exists():
+        raise FileNotFoundError(
+            f"Feature data not found at {feature_path}. Run feature engineering first."
+        )
+
+    # The registry's current version, so a rollback also moves the warm start.
+    booster, manifest = load_current_model(settings)
+    schema = manifest if manifest.get("categorical_features") else None
+
+    df = _load_recent(feature_path, cfg.incremental_window_days + cfg.test_days)
+    cutoff = df["date"].max() - pd.Timedelta(days=cfg.test_days)
+    features = manifest["feature_names"]
+    X_recent, y_recent = feature_matrix(df[df["date"] <= cutoff], features, schema)
+    X_hold, y_hold = feature_matrix(df[df["date"] > cutoff], features, schema)
+    del df
+    logger.info(
+        "Incremental %s: %s recent rows (%s days), %s holdout rows (%s days)",
+        mode, f"{len(X_recent):,}", cfg.incremental_window_days, f"{len(X_hold):,}", cfg.test_days,
+    )
+
+    if mode == "continue":
+        import lightgbm as lgb
+
+        categorical = schema["categorical_features"] if schema else []
+        recent_set = lgb.Dataset(
+            X_recent, y_recent, categorical_feature=categorical,
+            params=dataset_params(settings.model.lgbm_params),
+        )
+        hold_set = recent_set.create_valid(X_hold, y_hold)
+        candidate, _ = train_booster(
+            recent_set, hold_set, settings.model.lgbm_params,
+            init_model=booster, num_boost_round=cfg.incremental_rounds,
+        )
+    else:
+        candidate = booster.refit(X_recent, y_recent, decay_rate=cfg.refit_decay_rate)
+
+    previous_mae = _mae(booster, X_hold, y_hold)
+    candidate_mae = _mae(candidate, X_hold, y_hold)
+    promoted = candidate_mae < previous_mae * (1 - cfg.min_improvement)
+    report = {
+        "mode": mode,
+        "previous_MAE": round(previous_mae, 4),
+        "candidate_MAE": round(candidate_mae, 4),
+        "num_trees": candidate.num_trees(),
+        "promoted": bool(promoted),
+    }
+
+    if promoted:
+        report["version"] = register_trained_model(
+            settings, candidate, {"MAE": report["candidate_MAE"]}, schema, source=f"incremental-{mode}"
+        )
+        logger.info(
+            "Promoted incremental model %s: MAE £%.4f → £%.4f.",
+            report["version"], previous_mae, candidate_mae,
+        )
+    else:
+        logger.info(
+            "Kept current model: candidate MAE £%.4f did not beat £%.4f.",
+            candidate_mae, previous_mae,
+        )
+    return report
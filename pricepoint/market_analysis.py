@@ -1,24 +1,40 @@
 """Market analysis: HHI, price dispersion, leadership, and SHAP precomputation.
 
-Consolidates logic from ``precompute_market_dynamics.py`` and
-``precompute_shap_values.py`` into a single, professionally
-structured module.
+``run_precompute`` is the single orchestrator behind ``run.py precompute``
+and the ``dashboard/precompute_*.py`` scripts: one column-pruned scan of
+the canonical table, shared inputs, and concurrent, individually timed
+tasks.
 """
 
 from __future__ import annotations
 
+import json
 import logging
-import warnings
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import Any
 
-import joblib
 import numpy as np
 import pandas as pd
 
 from pricepoint.config import Settings
+from pricepoint.price_events import compute_price_events, events_path
+from pricepoint.price_tensor import (
+    CUBE_COLUMNS,
+    PriceTensor,
+    build_price_cube,
+    lagged_correlations,
+    update_price_cube,
+)
+from pricepoint.stage_cache import is_stage_current, run_cached
 
 logger = logging.getLogger(__name__)
 
+LEADERSHIP_COLUMNS = ["leader", "follower", "median_lag_days", "n_products_analyzed"]
+
 
 # ---------------------------------------------------------------------------
 # Herfindahl-Hirschman Index (HHI) — NEW feature
@@ -110,21 +126,171 @@ def compute_market_dispersion(df: pd.DataFrame) -> pd.Series:
     return series
 
 
+def dispersion_from_tensor(tensor: PriceTensor, block_size: int = 4096) -> pd.Series:
+    """Daily market dispersion from the observed cells of a price tensor.
+
+    Same statistic as :func:`compute_market_dispersion`, with each
+    retailer's same-day duplicates already averaged in the tensor;
+    carried-forward prices are ignored.
+    """
+    logger.info("Computing market dispersion from the price cube …")
+    n_days = len(tensor.dates)
+    total = np.zeros(n_days)
+    count = np.zeros(n_days, dtype=np.int64)
+    for start in range(0, len(tensor.products), block_size):
+        block = tensor.select(tensor.products[start:start + block_size])
+        x = np.where(block.observed, block.values, np.nan).astype(np.float64)
+        n = (~np.isnan(x)).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nansum(x, axis=1) / n
+            std = np.sqrt(np.nansum((x - mean[:, None, :]) ** 2, axis=1) / (n - 1))
+            dispersion = np.where(mean > 0, std / mean, 0.0)
+        valid = (n > 0) & ~np.isnan(dispersion)
+        total += np.where(valid, dispersion, 0.0).sum(axis=0)
+        count += valid.sum(axis=0)
+
+    has_value = count > 0
+    series = pd.Series(
+        total[has_value] / count[has_value],
+        index=pd.DatetimeIndex(tensor.dates[has_value].astype("datetime64[ns]"), name="date"),
+        name="dispersion",
+    )
+    logger.info("Dispersion computed. %s data points.", f"{len(series):,}")
+    return series
+
+
+# ---------------------------------------------------------------------------
+# Market metrics cube (category × day)
+# ---------------------------------------------------------------------------
+
+METRICS_COLUMNS = [
+    "n_products",
+    "n_listings",
+    "n_retailers",
+    "hhi",
+    "dispersion",
+    "cheapest_retailer",
+    "cheapest_share",
+    "coverage",
+]
+
+
+def compute_market_metrics(
+    df: pd.DataFrame, group_col: str = "category", by_own_brand: bool = False
+) -> pd.DataFrame:
+    """Daily competition metrics for every category in one grouped pass.
+
+    The rows are reduced once to one cell per (category, [own brand,]
+    day, product, retailer) holding the listing count and mean price;
+    every metric is derived from that cell table:
+
+    * ``hhi`` — :func:`calculate_hhi` on the day's listing shares;
+    * ``dispersion`` — mean coefficient of variation of retailer prices
+      over products stocked by two or more retailers (as
+      :func:`dispersion_from_tensor`);
+    * ``cheapest_retailer`` / ``cheapest_share`` — the retailer most often
+      cheapest on those products, and the fraction of them it undercuts;
+    * ``coverage`` — mean fraction of all retailers stocking a product.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Canonical products data with ``canonical_name``, ``supermarket``,
+        ``date``, ``prices`` and ``group_col`` (plus ``own_brand``).
+    group_col : str
+        Category column (default: ``category``).
+    by_own_brand : bool
+        Also split every category by the ``own_brand`` flag.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (``group_col``, [``own_brand``,] ``date``) with
+        ``METRICS_COLUMNS``, sorted by those keys.
+    """
+    logger.info("Computing daily market metrics by '%s' …", group_col)
+
+    if group_col not in df.columns:
+        logger.warning("Column '%s' not found. Using canonical_name instead.", group_col)
+        group_col = "canonical_name"
+    keys = [group_col, *(["own_brand"] if by_own_brand else []), "date"]
+    product_keys = keys if group_col == "canonical_name" else [*keys, "canonical_name"]
+
+    # The single pass over the rows; everything below works on the cells.
+    cells = (
+        df.groupby([*product_keys, "supermarket"], observed=True)["prices"]
+        .agg(n_listings="size", price="mean")
+        .reset_index()
+    )
+
+    listings = cells.groupby([*keys, "supermarket"], observed=True)["n_listings"].sum()
+    per_day = listings.groupby(level=keys, observed=True)
+    share = listings / per_day.transform("sum") * 100
+
+    products = cells.groupby(product_keys, observed=True)["price"].agg(["mean", "std", "size"])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        products["cv"] = np.where(products["mean"] > 0, products["std"] / products["mean"], 0.0)
+    products.loc[products["size"] < 2, "cv"] = np.nan
+
+    comparable = cells[cells.groupby(product_keys, observed=True)["price"].transform("size") > 1]
+    cheapest = comparable.loc[comparable.groupby(product_keys, observed=True)["price"].idxmin()]
+    wins = (
+        cheapest.groupby([*keys, "supermarket"], observed=True)
+        .size()
+        .rename("wins")
+        .reset_index()
+        .sort_values([*keys, "wins", "supermarket"], ascending=[True] * len(keys) + [False, True])
+    )
+    wins["contested"] = wins.groupby(keys, observed=True)["wins"].transform("sum")
+    top = wins.drop_duplicates(keys).set_index(keys)
+
+    by_product = products.groupby(level=keys, observed=True)
+    metrics = pd.DataFrame({
+        "n_products": by_product.size(),
+        "n_listings": per_day.sum(),
+        "n_retailers": per_day.size(),
+        "hhi": (share**2).groupby(level=keys, observed=True).sum(),
+        "dispersion": by_product["cv"].mean(),
+        "cheapest_retailer": top["supermarket"],
+        "cheapest_share": top["wins"] / top["contested"],
+        "coverage": by_product["size"].mean() / df["supermarket"].nunique(),
+    })
+    metrics = metrics.sort_index().reset_index()
+    for col in ("n_products", "n_listings", "n_retailers"):
+        metrics[col] = metrics[col].astype(np.int32)
+    for col in ("hhi", "dispersion", "cheapest_share", "coverage"):
+        metrics[col] = metrics[col].astype(np.float32)
+    for col in (group_col, "cheapest_retailer"):
+        metrics[col] = metrics[col].astype("category")
+
+    logger.info(
+        "Market metrics computed: %s rows over %s categories.",
+        f"{len(metrics):,}",
+        f"{metrics[group_col].nunique():,}",
+    )
+    return metrics
+
+
 # ---------------------------------------------------------------------------
 # Price leadership cross-correlation
 # ---------------------------------------------------------------------------
 
 
 def compute_price_leadership(
-    df: pd.DataFrame,
+    df: pd.DataFrame | PriceTensor,
     settings: Settings,
 ) -> pd.DataFrame:
     """Analyse cross-correlation to identify price leaders and followers.
 
+    Every common product (or a random ``sample_size`` of them, when set)
+    is pivoted once into a :class:`~pricepoint.price_tensor.PriceTensor`,
+    or sliced from the price cube, and all lagged retailer-pair
+    correlations are computed in batch.
+
     Parameters
     ----------
-    df : pd.DataFrame
-        Canonical products data.
+    df : pd.DataFrame or PriceTensor
+        Canonical products data, or the price cube.
     settings : Settings
         Application settings (sample_size, max_lag, min_correlation).
 
@@ -135,65 +301,215 @@ def compute_price_leadership(
         n_products_analyzed.
     """
     cfg = settings.market_dynamics
-    logger.info("Computing price leadership (sample=%s) …", cfg.sample_size)
+    logger.info("Computing price leadership (sample=%s) …", cfg.sample_size or "all")
 
     # Products in 3+ stores
-    product_counts = df.groupby("canonical_name", observed=True)["supermarket"].nunique()
-    common = product_counts[product_counts >= cfg.min_stores_for_common].index
+    if isinstance(df, PriceTensor):
+        common = df.products[df.listed.sum(axis=1) >= cfg.min_stores_for_common]
+    else:
+        product_counts = df.groupby("canonical_name", observed=True)["supermarket"].nunique()
+        common = product_counts[product_counts >= cfg.min_stores_for_common].index
 
     logger.info("Common products (≥%s stores): %s", cfg.min_stores_for_common, f"{len(common):,}")
     if len(common) == 0:
         logger.warning("No common products found.")
-        return pd.DataFrame(columns=["leader", "follower", "median_lag_days", "n_products_analyzed"])
+        return pd.DataFrame(columns=LEADERSHIP_COLUMNS)
+
+    if cfg.sample_size and cfg.sample_size < len(common):
+        common = np.random.choice(common, cfg.sample_size, replace=False)
+
+    if isinstance(df, PriceTensor):
+        tensor = df.select(common)
+    else:
+        tensor = PriceTensor.from_frame(df, products=common)
+    result_df = leadership_from_tensor(tensor, cfg.max_lag_days, cfg.min_correlation)
+    logger.info("Leadership analysis complete. %s pairs found.", len(result_df))
+    return result_df
+
+
+def leadership_from_tensor(tensor: PriceTensor, max_lag: int, min_correlation: float) -> pd.DataFrame:
+    """Median best-correlation lag per (leader, follower) retailer pair.
+
+    For each product whose two series are complete, the lag with the
+    largest absolute correlation counts when it exceeds ``min_correlation``.
+    Pairs with a median lag of zero are dropped.
+    """
+    corr = lagged_correlations(tensor.values, max_lag)
+    return leadership_from_correlations(corr, tensor.complete, tensor.retailers, min_correlation)
+
+
+def leadership_from_correlations(
+    corr: np.ndarray,
+    complete: np.ndarray,
+    retailers: np.ndarray,
+    min_correlation: float,
+) -> pd.DataFrame:
+    """Leadership pairs from ``(n_products, R, R, n_lags)`` lagged correlations.
+
+    ``complete`` marks the ``(n_products, R)`` series without gaps; see
+    :func:`leadership_from_tensor`.
+    """
+    return leadership_pairs(*best_correlation_lags(corr, complete, min_correlation), retailers)
 
-    sampled = np.random.choice(common, min(cfg.sample_size, len(common)), replace=False)
 
-    pivot = (
-        df[df["canonical_name"].isin(sampled)]
-        .pivot_table(index="date", columns=["supermarket", "canonical_name"], values="prices")
-        .ffill()
+def best_correlation_lags(
+    corr: np.ndarray, complete: np.ndarray, min_correlation: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Strongest lag per product and retailer pair, and whether it counts.
+
+    Leading axes of ``corr`` (``(..., n_products, R, R, n_lags)``) and
+    ``complete`` (``(..., n_products, R)``) are carried through.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        ``(..., n_products, R, R)`` int16 best lags, and the mask of pairs
+        where both series are complete and ``|corr|`` exceeds ``min_correlation``.
+    """
+    max_lag = corr.shape[-1] // 2
+    corr = np.abs(corr)
+    has_corr = ~np.isnan(corr).all(axis=-1)
+    corr = np.where(np.isnan(corr), -np.inf, corr)
+    best_lag = (corr.argmax(axis=-1) - max_lag).astype(np.int16)
+    usable = (
+        complete[..., :, :, None]
+        & complete[..., :, None, :]
+        & has_corr
+        & (corr.max(axis=-1) > min_correlation)
     )
+    return best_lag, usable
 
-    supermarkets = df["supermarket"].unique()
-    results: list[dict] = []
 
-    for leader in supermarkets:
-        for follower in supermarkets:
-            if leader == follower:
+def leadership_pairs(best_lag: np.ndarray, usable: np.ndarray, retailers: np.ndarray) -> pd.DataFrame:
+    """Median best lag per (leader, follower) pair; zero-lag pairs are dropped."""
+    results: list[dict] = []
+    for a, leader in enumerate(retailers):
+        for b, follower in enumerate(retailers):
+            if a == b or not usable[:, a, b].any():
                 continue
+            lags = best_lag[usable[:, a, b], a, b]
+            results.append({
+                "leader": leader,
+                "follower": follower,
+                "median_lag_days": float(np.median(lags)),
+                "n_products_analyzed": len(lags),
+            })
+
+    result_df = pd.DataFrame(results, columns=LEADERSHIP_COLUMNS)
+    return result_df[result_df["median_lag_days"] != 0].reset_index(drop=True)
 
-            lags: list[int] = []
-            for product in sampled:
-                try:
-                    if (leader, product) not in pivot.columns or (follower, product) not in pivot.columns:
-                        continue
-                    s1 = pivot[leader][product]
-                    s2 = pivot[follower][product]
-                    if s1.isnull().any() or s2.isnull().any() or s1.var() == 0 or s2.var() == 0:
-                        continue
-
-                    with warnings.catch_warnings():
-                        warnings.simplefilter("ignore", RuntimeWarning)
-                        corrs = [s1.corr(s2.shift(lag)) for lag in range(-cfg.max_lag_days, cfg.max_lag_days + 1)]
-
-                    if np.nanmax(np.abs(corrs)) > cfg.min_correlation:
-                        lag_val = np.arange(-cfg.max_lag_days, cfg.max_lag_days + 1)[np.nanargmax(np.abs(corrs))]
-                        lags.append(int(lag_val))
-                except (KeyError, ValueError):
-                    continue
-
-            if lags:
-                results.append({
-                    "leader": leader,
-                    "follower": follower,
-                    "median_lag_days": float(np.median(lags)),
-                    "n_products_analyzed": len(lags),
-                })
-
-    result_df = pd.DataFrame(results)
-    result_df = result_df[result_df["median_lag_days"] != 0].copy()
-    logger.info("Leadership analysis complete. %s pairs found.", len(result_df))
-    return result_df
+
+TIMELINE_COLUMNS = ["window_start", "window_end", *LEADERSHIP_COLUMNS]
+
+
+def timeline_windows(
+    dates: np.ndarray, freq: str = "M", window_days: int | None = None, step_days: int = 7
+) -> tuple[np.ndarray, np.ndarray]:
+    """Day-position bounds ``[starts, stops)`` of the leadership timeline windows.
+
+    Calendar periods of ``freq`` by default; with ``window_days``, rolling
+    windows of that many cube days every ``step_days`` days, the last one
+    ending on the last day.
+    """
+    if window_days:
+        stops = np.arange(len(dates), min(window_days, len(dates)) - 1, -step_days)[::-1]
+        return stops - min(window_days, len(dates)), stops
+    periods = pd.PeriodIndex(pd.DatetimeIndex(dates), freq=freq)
+    starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+    return starts, np.r_[starts[1:], len(periods)]
+
+
+def leadership_timeline(
+    tensor: PriceTensor,
+    max_lag: int,
+    min_correlation: float,
+    freq: str = "M",
+    window_days: int | None = None,
+    step_days: int = 7,
+    block_size: int = 256,
+) -> pd.DataFrame:
+    """Leadership pairs per window of the tensor's days (see :func:`timeline_windows`).
+
+    Each block of products is read from the tensor once and every window
+    is evaluated on it with the batched
+    :func:`~pricepoint.price_tensor.lagged_correlations`; only the best
+    lag and its usability are kept per window.  Within a window a series
+    counts when it has a price on each of the window's days; windows of
+    ``2 * max_lag + 1`` days or fewer are skipped.  Each window's pairs
+    equal :func:`leadership_from_tensor` on its slice.
+
+    Parameters
+    ----------
+    tensor : PriceTensor
+        Products to analyse (e.g. the common products of the price cube).
+    max_lag : int
+        Lags ``-max_lag … max_lag`` are evaluated.
+    min_correlation : float
+        Minimum absolute correlation for a product to count.
+    freq : str
+        Pandas period alias of calendar windows (``"M"``: months).
+    window_days : int, optional
+        Use rolling windows of this many days instead.
+    step_days : int
+        Days between consecutive rolling windows.
+    block_size : int
+        Products per batch (bounds memory).
+
+    Returns
+    -------
+    pd.DataFrame
+        ``TIMELINE_COLUMNS``: first and last cube day of each window, then
+        its leadership pairs.
+    """
+    starts, stops = timeline_windows(tensor.dates, freq, window_days, step_days)
+    keep = stops - starts > 2 * max_lag + 1
+    starts, stops = starts[keep], stops[keep]
+    logger.info(
+        "Computing leadership over %s windows for %s products …",
+        len(starts), f"{len(tensor.products):,}",
+    )
+    if len(starts) == 0:
+        return pd.DataFrame(columns=TIMELINE_COLUMNS)
+
+    n_products, n_retailers = len(tensor.products), len(tensor.retailers)
+    shape = (len(starts), n_products, n_retailers, n_retailers)
+    best_lag = np.zeros(shape, dtype=np.int16)
+    usable = np.zeros(shape, dtype=bool)
+    for block in range(0, n_products, block_size):
+        part = slice(block, block + block_size)
+        x = np.asarray(tensor.values[part], dtype=np.float32)
+        gaps = np.zeros((*x.shape[:2], x.shape[-1] + 1), dtype=np.int32)
+        np.cumsum(np.isnan(x), axis=-1, out=gaps[..., 1:])
+        for w, (start, stop) in enumerate(zip(starts, stops)):
+            corr = lagged_correlations(x[..., start:stop], max_lag, block_size=len(x))
+            complete = gaps[..., stop] == gaps[..., start]
+            best_lag[w, part], usable[w, part] = best_correlation_lags(corr, complete, min_correlation)
+
+    frames = []
+    for w in range(len(starts)):
+        pairs = leadership_pairs(best_lag[w], usable[w], tensor.retailers)
+        pairs.insert(0, "window_start", pd.Timestamp(tensor.dates[starts[w]]))
+        pairs.insert(1, "window_end", pd.Timestamp(tensor.dates[stops[w] - 1]))
+        frames.append(pairs)
+    timeline = pd.concat(frames, ignore_index=True)
+    logger.info("Leadership timeline: %s pair-windows.", f"{len(timeline):,}")
+    return timeline
+
+
+def compute_leadership_timeline(cube: PriceTensor, settings: Settings) -> pd.DataFrame:
+    """Leadership timeline of the cube's common products (see :func:`leadership_timeline`)."""
+    cfg = settings.market_dynamics
+    common = cube.products[cube.listed.sum(axis=1) >= cfg.min_stores_for_common]
+    if cfg.sample_size and cfg.sample_size < len(common):
+        common = np.random.choice(common, cfg.sample_size, replace=False)
+    return leadership_timeline(
+        cube.select(common),
+        cfg.max_lag_days,
+        cfg.min_correlation,
+        freq=cfg.leadership_timeline_freq,
+        window_days=cfg.leadership_timeline_window_days,
+        step_days=cfg.leadership_timeline_step_days,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -204,6 +520,11 @@ def compute_price_leadership(
 def precompute_shap(settings: Settings) -> Path:
     """Pre-compute SHAP values for dashboard consumption.
 
+    Explains a uniform sample of ``shap.sample_size`` feature rows with
+    the booster's native ``pred_contrib`` (see :mod:`pricepoint.explain`)
+    and writes float32 values to a memory-mapped ``shap_values.npy``,
+    plus global importance and per-feature statistics.
+
     Parameters
     ----------
     settings : Settings
@@ -214,53 +535,113 @@ def precompute_shap(settings: Settings) -> Path:
     Path
         Output directory containing SHAP artifacts.
     """
-    import shap
+    import pyarrow.parquet as pq
+
+    from pricepoint.explain import (
+        sample_feature_matrix,
+        shap_contributions,
+        summarise_contributions,
+    )
+    from pricepoint.registry import load_current_model
+    from pricepoint.scoring import build_column_plan
 
     cfg = settings.shap
     output_dir = cfg.output_dir
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    model_path = settings.model.model_path
     feature_path = settings.data.processed_dir / settings.features.output_filename
+    if not feature_path.exists():
+        raise FileNotFoundError(f"Feature data not found at {feature_path}. Run features first.")
+
+    booster, schema = load_current_model(settings)
+    model_features = schema["feature_names"]
+    plan = build_column_plan(model_features, pq.read_schema(feature_path), schema.get("categories"))
+
+    logger.info("Sampling up to %s rows from %s …", f"{cfg.sample_size:,}", feature_path)
+    X, rows = sample_feature_matrix(feature_path, plan, cfg.sample_size, cfg.random_seed)
+    # Store in random order so any prefix (e.g. the dashboard's) is itself a random sample.
+    order = np.random.default_rng(cfg.random_seed).permutation(len(rows))
+    X, rows = X[order], rows[order]
+    logger.info("Sampled %s rows for SHAP.", f"{len(X):,}")
+
+    shap_values = np.lib.format.open_memmap(
+        output_dir / "shap_values.npy", mode="w+", dtype=np.float32, shape=X.shape
+    )
+    _, base_value = shap_contributions(booster, X, shap_values, cfg.chunk_rows, cfg.num_threads)
+    summary = summarise_contributions(shap_values, X, model_features)
+    shap_values.flush()
+    del shap_values
 
-    logger.info("Loading model from %s …", model_path)
-    model = joblib.load(model_path)
+    # Save artifacts
+    sample = pd.DataFrame(X, columns=model_features, index=pd.Index(rows, name="row"))
+    sample.to_parquet(output_dir / "shap_sample_data.parquet", compression="snappy")
+    summary.to_parquet(output_dir / "shap_summary.parquet", compression="snappy", index=False)
+    with open(output_dir / "shap_base_value.txt", "w") as f:
+        f.write(str(base_value))
+    with open(output_dir / "feature_names.txt", "w") as f:
+        f.write("\n".join(model_features))
+
+    logger.info("SHAP precomputation complete. Output: %s", output_dir)
+    return output_dir
 
-    logger.info("Loading feature data from %s …", feature_path)
-    df = pd.read_parquet(feature_path, engine="pyarrow")
 
-    # Sample
-    sample_size = min(cfg.sample_size, len(df))
-    df_sample = df.sample(n=sample_size, random_state=cfg.random_seed)
-    logger.info("Sampled %s rows for SHAP.", f"{sample_size:,}")
+def precompute_shap_interactions(settings: Settings) -> Path:
+    """Pre-compute SHAP interaction summaries for the top-K features.
 
-    # Encode categoricals
-    cat_cols = df_sample.select_dtypes(include=["object", "category"]).columns.tolist()
-    if cat_cols:
-        df_sample = pd.get_dummies(df_sample, columns=cat_cols, drop_first=True)
+    Picks the ``shap.interaction_top_k`` most important features from the
+    :func:`precompute_shap` artifacts and explains the first
+    ``shap.interaction_rows`` rows of its (randomly ordered) sample.
+    Only the compact aggregates are stored: ``shap_interactions.npz``
+    (see :class:`~pricepoint.explain.InteractionSummary`) and
+    ``shap_interaction_pairs.parquet``.
 
-    df_sample = df_sample.select_dtypes(include=["number"])
+    Parameters
+    ----------
+    settings : Settings
+        Application settings.
 
-    # Align with model features
-    model_features = model.feature_name_
-    for col in set(model_features) - set(df_sample.columns):
-        df_sample[col] = 0
-    df_sample = df_sample[model_features].dropna()
+    Returns
+    -------
+    Path
+        Path to ``shap_interactions.npz``.
+    """
+    import pyarrow.parquet as pq
 
-    logger.info("Computing SHAP values for %s samples …", f"{len(df_sample):,}")
-    explainer = shap.TreeExplainer(model)
-    shap_values = explainer.shap_values(df_sample)
+    from pricepoint.explain import interaction_summary
+    from pricepoint.registry import load_current_model
 
-    # Save artifacts
-    df_sample.to_parquet(output_dir / "shap_sample_data.parquet", compression="snappy")
-    np.save(output_dir / "shap_values.npy", shap_values)
-    with open(output_dir / "shap_base_value.txt", "w") as f:
-        f.write(str(explainer.expected_value))
-    with open(output_dir / "feature_names.txt", "w") as f:
-        f.write("\n".join(model_features))
+    cfg = settings.shap
+    sample_path = cfg.output_dir / "shap_sample_data.parquet"
+    summary_path = cfg.output_dir / "shap_summary.parquet"
+    if not sample_path.exists():
+        raise FileNotFoundError(f"SHAP sample not found at {sample_path}. Run precompute first.")
+
+    booster, schema = load_current_model(settings)
+    model_features = schema["feature_names"]
+    if summary_path.exists():
+        ranked = pd.read_parquet(summary_path)["feature"].tolist()
+    else:
+        mean_abs = np.abs(np.load(cfg.output_dir / "shap_values.npy", mmap_mode="r")).mean(axis=0)
+        ranked = [model_features[j] for j in np.argsort(-mean_abs)]
+    sample_features = pq.read_schema(sample_path).names
+    if [c for c in sample_features if c != "row"] != model_features:
+        raise ValueError("SHAP sample was computed for a different model. Run precompute first.")
+
+    top = [model_features.index(f) for f in ranked[:cfg.interaction_top_k]]
+    batches = pq.ParquetFile(sample_path).iter_batches(batch_size=cfg.interaction_rows, columns=model_features)
+    X = next(batches).to_pandas().to_numpy(dtype=np.float64)
+    logger.info(
+        "Computing SHAP interactions for %s rows × top %s features: %s …",
+        f"{len(X):,}", len(top), [model_features[j] for j in top],
+    )
+    summary = interaction_summary(
+        booster, X, top, cfg.interaction_bins, cfg.interaction_chunk_rows, cfg.interaction_workers
+    )
 
-    logger.info("SHAP precomputation complete. Output: %s", output_dir)
-    return output_dir
+    output_path = summary.save(cfg.output_dir / "shap_interactions.npz")
+    summary.pairs().to_parquet(cfg.output_dir / "shap_interaction_pairs.parquet", index=False)
+    logger.info("SHAP interaction summaries saved to %s", output_path)
+    return output_path
 
 
 # ---------------------------------------------------------------------------
@@ -268,35 +649,199 @@ def precompute_shap(settings: Settings) -> Path:
 # ---------------------------------------------------------------------------
 
 
-def run_precompute(settings: Settings) -> None:
-    """Run all precomputation pipelines (SHAP + market dynamics).
+PRECOMPUTE_TASKS = ("dispersion", "leadership", "timeline", "hhi", "metrics", "events", "shap")
+# Tasks with an append-only refresh (``run_precompute(incremental=True)``).
+INCREMENTAL_TASKS = ("dispersion", "leadership")
+
+
+@dataclass(frozen=True)
+class TaskTiming:
+    """Wall-clock record of one precompute task."""
+
+    task: str
+    started_s: float
+    seconds: float
+    status: str
+
+
+def _canonical_columns(canonical_path: Path) -> set[str]:
+    import pyarrow.parquet as pq
+
+    return set(pq.read_schema(canonical_path).names)
+
+
+def _hhi_column(columns: set[str]) -> str:
+    return "category" if "category" in columns else "canonical_name"
+
+
+def _save_hhi(settings: Settings, hhi: pd.DataFrame) -> Path:
+    output_path = settings.market_dynamics.output_dir / "hhi_index.parquet"
+    settings.market_dynamics.output_dir.mkdir(parents=True, exist_ok=True)
+    hhi.to_parquet(output_path, compression="snappy", index=False)
+    logger.info("HHI saved to %s", output_path)
+    return output_path
+
+
+def run_precompute(
+    settings: Settings,
+    tasks: Sequence[str] | None = None,
+    workers: int | None = None,
+    incremental: bool = False,
+) -> list[TaskTiming]:
+    """Run the dashboard precomputation tasks concurrently.
+
+    The canonical table is scanned once, for only the columns the
+    selected tasks need: the HHI columns, plus the price columns when
+    the price cube is missing or stale, or price events are detected.
+    Dispersion, leadership and the leadership timeline share the
+    (memory-mapped) cube, HHI, the daily category metrics and the price
+    events the in-memory table, and SHAP reads the feature data and
+    model.  The tasks are independent and run on a thread pool — their
+    heavy lifting is NumPy, Arrow and LightGBM code that releases the
+    GIL.  Per-task timings are logged and written to
+    ``precompute_timings.json`` in the market dynamics directory.
 
     Parameters
     ----------
     settings : Settings
         Application settings.
-    """
-    canonical_path = settings.data.processed_dir / settings.matching.output_filename
-    if not canonical_path.exists():
-        raise FileNotFoundError(f"Canonical products not found at {canonical_path}.")
+    tasks : Sequence[str], optional
+        Subset of ``PRECOMPUTE_TASKS``; defaults to ``precompute.tasks``
+        (``INCREMENTAL_TASKS`` when ``incremental``).
+    workers : int, optional
+        Concurrent tasks; defaults to ``precompute.workers`` (or one per task).
+    incremental : bool
+        Append the canonical table's new days to the price cube, then
+        append dispersion for those days only and slide the persisted
+        leadership window, written to ``price_leadership_window.parquet``
+        (see :mod:`pricepoint.market_incremental`).  Only
+        ``INCREMENTAL_TASKS`` can run this way.
 
-    df = pd.read_parquet(canonical_path, engine="pyarrow")
-    df["date"] = pd.to_datetime(df["date"])
-
-    # Market dispersion
-    dispersion = compute_market_dispersion(df)
+    Returns
+    -------
+    list[TaskTiming]
+        One record per task, in completion order.
+    """
+    allowed = INCREMENTAL_TASKS if incremental else PRECOMPUTE_TASKS
+    tasks = list(tasks or (INCREMENTAL_TASKS if incremental else settings.precompute.tasks))
+    unknown = set(tasks) - set(allowed)
+    if unknown:
+        mode = "incremental precompute" if incremental else "precompute"
+        raise ValueError(f"Unknown {mode} tasks {sorted(unknown)}; choose from {allowed}.")
+    workers = workers or settings.precompute.workers or len(tasks)
+    if incremental:
+        from pricepoint.market_incremental import refresh_dispersion, refresh_leadership
     md_dir = settings.market_dynamics.output_dir
     md_dir.mkdir(parents=True, exist_ok=True)
-    dispersion.to_frame("dispersion").to_parquet(md_dir / "market_dispersion.parquet", compression="snappy")
-
-    # Price leadership
-    leadership = compute_price_leadership(df, settings)
-    leadership.to_parquet(md_dir / "price_leadership.parquet", compression="snappy")
-
-    # SHAP
-    precompute_shap(settings)
+    started = time.perf_counter()
 
-    logger.info("All precomputation complete. ✓")
+    # Single scan of the canonical table.
+    needs_cube = bool({"dispersion", "leadership", "timeline"} & set(tasks))
+    cube_dir = settings.price_cube.output_dir
+    # Through the stage cache, so a cube built from an older canonical table is rebuilt.
+    build_cube = needs_cube and not is_stage_current(settings, "cube")
+    canonical_path = settings.data.processed_dir / settings.matching.output_filename
+    columns: set[str] = set()
+    if ({"hhi", "metrics", "events"} & set(tasks) or build_cube) and not canonical_path.exists():
+        raise FileNotFoundError(f"Canonical products not found at {canonical_path}.")
+    if {"hhi", "metrics"} & set(tasks):
+        available = _canonical_columns(canonical_path)
+        hhi_col = _hhi_column(available)
+        columns |= {hhi_col, "supermarket"}
+    by_own_brand = settings.market_dynamics.metrics_by_own_brand
+    if "metrics" in tasks:
+        if by_own_brand and "own_brand" not in available:
+            logger.warning("Column 'own_brand' not found. Metrics are not split by own brand.")
+            by_own_brand = False
+        columns |= {"canonical_name", "date", "prices", *(["own_brand"] if by_own_brand else [])}
+    if (build_cube and not incremental) or "events" in tasks:
+        columns |= set(CUBE_COLUMNS)
+    df = pd.read_parquet(canonical_path, columns=sorted(columns), engine="pyarrow") if columns else None
+    if build_cube and incremental:
+        # Reads only the canonical rows after the cube's last day.
+        run_cached(settings, "cube", lambda: update_price_cube(settings), force=True)
+    elif build_cube:
+        run_cached(settings, "cube", lambda: build_price_cube(settings, df), force=True)
+    cube = PriceTensor.load(cube_dir) if needs_cube else None
+    logger.info("Precompute inputs loaded in %.1fs.", time.perf_counter() - started)
+
+    def dispersion() -> None:
+        if incremental:
+            refresh_dispersion(cube, md_dir / "market_dispersion.parquet")
+            return
+        series = dispersion_from_tensor(cube)
+        series.to_frame("dispersion").to_parquet(md_dir / "market_dispersion.parquet", compression="snappy")
+
+    def leadership() -> None:
+        if incremental:
+            result = refresh_leadership(cube, settings)
+            result.to_parquet(md_dir / "price_leadership_window.parquet", compression="snappy")
+            return
+        result = compute_price_leadership(cube, settings)
+        result.to_parquet(md_dir / "price_leadership.parquet", compression="snappy")
+
+    def timeline() -> None:
+        result = compute_leadership_timeline(cube, settings)
+        result.to_parquet(md_dir / "leadership_timeline.parquet", compression="snappy", index=False)
+
+    def hhi() -> None:
+        _save_hhi(settings, calculate_hhi(df, hhi_col))
+
+    def metrics() -> None:
+        metrics_df = compute_market_metrics(df, hhi_col, by_own_brand)
+        metrics_df.to_parquet(md_dir / "market_metrics.parquet", compression="snappy", index=False)
+
+    def events() -> None:
+        result = compute_price_events(df, settings)
+        result.to_parquet(events_path(settings), compression="snappy", index=False)
+
+    def shap() -> None:
+        precompute_shap(settings)
+
+    runners: dict[str, Callable[[], Any]] = {
+        "dispersion": dispersion,
+        "leadership": leadership,
+        "timeline": timeline,
+        "hhi": hhi,
+        "metrics": metrics,
+        "events": events,
+        "shap": shap,
+    }
+
+    def timed(task: str) -> tuple[TaskTiming, BaseException | None]:
+        begin = time.perf_counter()
+        error = None
+        try:
+            runners[task]()
+        except Exception as exc:  # noqa: BLE001 — re-raised once every task has finished
+            error = exc
+        timing = TaskTiming(
+            task=task,
+            started_s=round(begin - started, 3),
+            seconds=round(time.perf_counter() - begin, 3),
+            status="failed" if error else "ok",
+        )
+        logger.info("Precompute task '%s' %s in %.1fs.", task, timing.status, timing.seconds)
+        return timing, error
+
+    logger.info("Running precompute tasks %s with %s workers …", tasks, workers)
+    with ThreadPoolExecutor(workers, thread_name_prefix="precompute") as pool:
+        outcomes = list(pool.map(timed, tasks))
+    timings = sorted((t for t, _ in outcomes), key=lambda t: t.started_s + t.seconds)
+
+    with open(md_dir / "precompute_timings.json", "w", encoding="utf-8") as fh:
+        json.dump({
+            "total_seconds": round(time.perf_counter() - started, 3),
+            "workers": workers,
+            "tasks": [asdict(t) for t in timings],
+        }, fh, indent=2)
+    errors = [(t.task, e) for t, e in outcomes if e is not None]
+    if errors:
+        task, error = errors[0]
+        raise RuntimeError(f"Precompute task '{task}' failed ({len(errors)} failed in total).") from error
+
+    logger.info("All precomputation complete in %.1fs. ✓", time.perf_counter() - started)
+    return timings
 
 
 def run_hhi(settings: Settings) -> Path:
@@ -316,12 +861,6 @@ def run_hhi(settings: Settings) -> Path:
     if not canonical_path.exists():
         raise FileNotFoundError(f"Canonical products not found at {canonical_path}.")
 
-    df = pd.read_parquet(canonical_path, engine="pyarrow")
-    hhi = calculate_hhi(df)
-
-    output_path = settings.market_dynamics.output_dir / "hhi_index.parquet"
-    settings.market_dynamics.output_dir.mkdir(parents=True, exist_ok=True)
-    hhi.to_parquet(output_path, compression="snappy", index=False)
-
-    logger.info("HHI saved to %s", output_path)
-    return output_path
+    hhi_col = _hhi_column(_canonical_columns(canonical_path))
+    df = pd.read_parquet(canonical_path, columns=[hhi_col, "supermarket"], engine="pyarrow")
+    return _save_hhi(settings, calculate_hhi(df, hhi_col))
@@ -0,0 +1,344 @@
+"""Incremental, append-only refresh of the market dynamics outputs.
+
+``run.py precompute`` recomputes dispersion and leadership over the
+whole price history.  ``--incremental`` runs only these two tasks and
+brings them up to date from the price cube's new days:
+
+* dispersion is a per-day aggregate, so only the days after the last one
+  in ``market_dispersion.parquet`` are computed and appended;
+* leadership is kept over a sliding window of the last
+  ``leadership_window_days`` cube days and written to
+  ``price_leadership_window.parquet``, next to the full-history
+  ``price_leadership.parquet``.  :class:`LeadershipState` persists the
+  window's sufficient statistics — per-lag sums, sums of squares and
+  cross products of every (product, retailer pair) — and slides them a
+  day at a time by adding the entering day's terms and subtracting the
+  leaving day's.
+
+The cube itself is brought up to date first by
+:func:`pricepoint.price_tensor.update_price_cube`, which reads only the
+canonical rows after its last day and appends them in place, so every
+step scales with the number of new days.  History is assumed to be
+append-only: days already covered are never revisited.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pricepoint.config import Settings
+from pricepoint.market_analysis import (
+    dispersion_from_tensor,
+    leadership_from_correlations,
+)
+from pricepoint.price_tensor import PriceTensor, correlation_from_lag_sums, lag_sums
+
+logger = logging.getLogger(__name__)
+
+_INIT_BLOCK_PRODUCTS = 512
+
+
+@dataclass
+class LeadershipState:
+    """Lagged-correlation sufficient statistics over a sliding day window.
+
+    The window covers the ``length`` cube days up to and including
+    ``end_date``; ``length`` grows to ``window_days`` and then stays
+    there.  Correlations from the state equal
+    :func:`~pricepoint.price_tensor.lagged_correlations` on the window's
+    slice of the cube.
+
+    Attributes
+    ----------
+    products, retailers : np.ndarray
+        Axes 0 and 1 of the statistics.
+    end_date : np.datetime64
+        Last cube day in the window.
+    window_days, length : int
+        Window size, and days currently in the window.
+    sx, sxx : np.ndarray
+        ``(n_products, n_retailers, n_lags)`` float64 overlap sums and sums
+        of squares (see :func:`~pricepoint.price_tensor.lag_sums`).
+    sxy : np.ndarray
+        ``(n_products, n_retailers, n_retailers, n_lags)`` float64 cross products.
+    missing : np.ndarray
+        ``(n_products, n_retailers)`` days without a price in the window.
+    """
+
+    products: np.ndarray
+    retailers: np.ndarray
+    end_date: np.datetime64
+    window_days: int
+    length: int
+    sx: np.ndarray
+    sxx: np.ndarray
+    sxy: np.ndarray
+    missing: np.ndarray
+
+    @property
+    def max_lag(self) -> int:
+        return self.sx.shape[-1] // 2
+
+    @property
+    def complete(self) -> np.ndarray:
+        """``(n_products, n_retailers)`` mask of series without gaps in the window."""
+        return self.missing == 0
+
+    @classmethod
+    def initialise(
+        cls,
+        tensor: PriceTensor,
+        products,
+        window_days: int,
+        max_lag: int,
+        end: int | None = None,
+    ) -> LeadershipState:
+        """Statistics for ``products`` over the window ending before day position ``end``."""
+        end = len(tensor.dates) if end is None else end
+        start = max(end - window_days, 0)
+        rows = _rows(tensor, products)
+        n_retailers, n_lags = len(tensor.retailers), 2 * max_lag + 1
+        sx = np.zeros((len(rows), n_retailers, n_lags))
+        sxx = np.zeros_like(sx)
+        sxy = np.zeros((len(rows), n_retailers, n_retailers, n_lags))
+        missing = np.zeros((len(rows), n_retailers), dtype=np.int32)
+        window = tensor.values[..., start:end]
+        for block in range(0, len(rows), _INIT_BLOCK_PRODUCTS):
+            part = slice(block, block + _INIT_BLOCK_PRODUCTS)
+            x = np.asarray(window[rows[part]], dtype=np.float64)
+            missing[part] = np.isnan(x).sum(axis=-1)
+            sx[part], sxx[part], sxy[part] = lag_sums(np.nan_to_num(x), max_lag)
+        return cls(
+            products=np.asarray(products, dtype=object),
+            retailers=np.asarray(tensor.retailers, dtype=object),
+            end_date=tensor.dates[end - 1],
+            window_days=window_days,
+            length=end - start,
+            sx=sx,
+            sxx=sxx,
+            sxy=sxy,
+            missing=missing,
+        )
+
+    def correlations(self) -> np.ndarray:
+        """``(n_products, R, R, n_lags)`` lagged correlations over the window."""
+        lags = np.arange(-self.max_lag, self.max_lag + 1)
+        n = np.maximum(self.length - np.abs(lags), 0).astype(np.float64)
+        return correlation_from_lag_sums(self.sx, self.sxx, self.sxy, n)
+
+    def refresh(self, tensor: PriceTensor, products) -> LeadershipState:
+        """Slide the window to the tensor's last day for ``products``.
+
+        Known products keep their statistics and only the days after
+        ``end_date`` are applied; products new to the state are
+        initialised over the current window first.  A cube with other
+        retailers, without ``end_date``, or with a full window of new days
+        is recomputed from scratch.
+        """
+        end = int(np.searchsorted(tensor.dates, self.end_date)) + 1
+        new_days = len(tensor.dates) - end
+        if (
+            list(tensor.retailers) != list(self.retailers)
+            or end > len(tensor.dates)
+            or tensor.dates[end - 1] != self.end_date
+            or new_days >= self.window_days
+        ):
+            logger.info("Leadership state does not match the cube; recomputing the window.")
+            return LeadershipState.initialise(tensor, products, self.window_days, self.max_lag)
+
+        products = np.asarray(products, dtype=object)
+        rows = pd.Index(self.products).get_indexer(products)
+        known = rows >= 0
+        state = LeadershipState(
+            products=products,
+            retailers=self.retailers,
+            end_date=self.end_date,
+            window_days=self.window_days,
+            length=self.length,
+            sx=_align(self.sx, rows),
+            sxx=_align(self.sxx, rows),
+            sxy=_align(self.sxy, rows),
+            missing=_align(self.missing, rows),
+        )
+        if not known.all():
+            fresh = LeadershipState.initialise(
+                tensor, products[~known], self.window_days, self.max_lag, end=end
+            )
+            for name in ("sx", "sxx", "sxy", "missing"):
+                getattr(state, name)[~known] = getattr(fresh, name)
+        logger.info(
+            "Leadership state: %s known and %s new products, %s new days.",
+            f"{int(known.sum()):,}", f"{int((~known).sum()):,}", new_days,
+        )
+
+        cube_rows = _rows(tensor, products)
+        for day in range(end, len(tensor.dates)):
+            state._advance(tensor, cube_rows, day)
+        return state
+
+    def _advance(self, tensor: PriceTensor, rows: np.ndarray, day: int) -> None:
+        """Append day position ``day``, dropping the oldest day once the window is full."""
+        values = tensor.values
+        lags = np.arange(-self.max_lag, self.max_lag + 1)
+        start = day - self.length
+        span = self.length + 1
+        self._apply(values, rows, day + np.minimum(lags, 0), day - np.maximum(lags, 0), span, 1)
+        self.missing += np.isnan(values[:, :, day][rows])
+        if self.length == self.window_days:
+            self._apply(values, rows, start + np.maximum(lags, 0), start + np.maximum(-lags, 0), span, -1)
+            self.missing -= np.isnan(values[:, :, start][rows])
+        else:
+            self.length += 1
+        self.end_date = tensor.dates[day]
+
+    def _apply(
+        self,
+        values: np.ndarray,
+        rows: np.ndarray,
+        x_days: np.ndarray,
+        y_days: np.ndarray,
+        span: int,
+        sign: int,
+    ) -> None:
+        """Add (``sign=1``) or remove the pair terms ``x[x_days] · y[y_days]`` per lag.
+
+        Lags without an overlap in a window of ``span`` days contribute nothing.
+        """
+        lags = np.arange(-self.max_lag, self.max_lag + 1)
+        valid = span - np.abs(lags) >= 1
+        x_days = np.clip(x_days, 0, values.shape[-1] - 1)
+        y_days = np.clip(y_days, 0, values.shape[-1] - 1)
+        x = np.nan_to_num(np.asarray(values[:, :, x_days][rows], dtype=np.float64)) * valid
+        y = np.nan_to_num(np.asarray(values[:, :, y_days][rows], dtype=np.float64)) * valid
+        self.sx += sign * x
+        self.sxx += sign * x * x
+        self.sxy += sign * x[:, :, None, :] * y[:, None, :, :]
+
+    def save(self, path: Path) -> Path:
+        np.savez(
+            path,
+            products=np.asarray(self.products, dtype=str),
+            retailers=np.asarray(self.retailers, dtype=str),
+            end_date=self.end_date,
+            window_days=self.window_days,
+            length=self.length,
+            sx=self.sx,
+            sxx=self.sxx,
+            sxy=self.sxy,
+            missing=self.missing,
+        )
+        return Path(path)
+
+    @classmethod
+    def load(cls, path: Path) -> LeadershipState:
+        with np.load(path) as data:
+            return cls(
+                products=data["products"].astype(object),
+                retailers=data["retailers"].astype(object),
+                end_date=data["end_date"][()],
+                window_days=int(data["window_days"]),
+                length=int(data["length"]),
+                sx=data["sx"],
+                sxx=data["sxx"],
+                sxy=data["sxy"],
+                missing=data["missing"],
+            )
+
+
+def _rows(tensor: PriceTensor, products) -> np.ndarray:
+    rows = pd.Index(tensor.products).get_indexer(np.asarray(products))
+    if (rows < 0).any():
+        raise KeyError(f"{int((rows < 0).sum())} products are not in the price tensor.")
+    return rows
+
+
+def _align(array: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Rows of ``array`` at ``rows``, zero where ``rows`` is -1."""
+    out = np.zeros((len(rows), *array.shape[1:]), dtype=array.dtype)
+    out[rows >= 0] = array[rows[rows >= 0]]
+    return out
+
+
+def refresh_dispersion(cube: PriceTensor, path: Path) -> pd.Series:
+    """Append dispersion for the cube days after the last one saved at ``path``.
+
+    Parameters
+    ----------
+    cube : PriceTensor
+        The price cube.
+    path : Path
+        ``market_dispersion.parquet``; computed in full when missing.
+
+    Returns
+    -------
+    pd.Series
+        The complete dispersion series.
+    """
+    existing = None
+    first_new = 0
+    if path.exists():
+        existing = pd.read_parquet(path, engine="pyarrow")["dispersion"]
+        if len(existing):
+            last = np.datetime64(existing.index.max(), "D")
+            first_new = int(np.searchsorted(cube.dates, last, side="right"))
+
+    if existing is not None and first_new >= len(cube.dates):
+        logger.info("Dispersion is up to date (%s).", existing.index.max().date())
+        return existing
+    logger.info("Appending dispersion for %s new days …", len(cube.dates) - first_new)
+    series = dispersion_from_tensor(cube.days(first_new))
+    if existing is not None:
+        series = pd.concat([existing, series])
+    series.to_frame("dispersion").to_parquet(path, compression="snappy")
+    return series
+
+
+def refresh_leadership(cube: PriceTensor, settings: Settings) -> pd.DataFrame:
+    """Slide the persisted leadership window to the cube's last day.
+
+    The state lives in ``leadership_state.npz`` next to the other market
+    dynamics outputs and is initialised on first use.  Every common
+    product (listed by ``min_stores_for_common`` retailers) is tracked;
+    ``sample_size`` does not apply.
+
+    Parameters
+    ----------
+    cube : PriceTensor
+        The price cube.
+    settings : Settings
+        Application settings (``market_dynamics`` section).
+
+    Returns
+    -------
+    pd.DataFrame
+        Leadership pairs over the window, as
+        :func:`~pricepoint.market_analysis.compute_price_leadership`.
+    """
+    cfg = settings.market_dynamics
+    state_path = cfg.output_dir / "leadership_state.npz"
+    common = cube.products[cube.listed.sum(axis=1) >= cfg.min_stores_for_common]
+
+    state = LeadershipState.load(state_path) if state_path.exists() else None
+    if (
+        state is None
+        or state.window_days != cfg.leadership_window_days
+        or state.max_lag != cfg.max_lag_days
+    ):
+        logger.info("Initialising the %s-day leadership window …", cfg.leadership_window_days)
+        state = LeadershipState.initialise(cube, common, cfg.leadership_window_days, cfg.max_lag_days)
+    else:
+        state = state.refresh(cube, common)
+    state.save(state_path)
+
+    result = leadership_from_correlations(
+        state.correlations(), state.complete, state.retailers, cfg.min_correlation
+    )
+    logger.info(
+        "Leadership over %s days to %s: %s pairs.", state.length, state.end_date, len(result)
+    )
+    return result
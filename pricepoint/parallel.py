@@ -0,0 +1,41 @@
+"""Spawn-context process pools whose workers load their state once.
+
+Workers of :func:`spawn_pool` run a module-level ``setup(*args)`` when
+they start — typically deserialising a model or loading a Dataset — and
+tasks read the dict it returned with :func:`worker_state`, instead of
+receiving the same large arguments with every task.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+_STATE: dict[str, Any] = {}
+
+
+def init_worker(setup: Callable[..., dict[str, Any]], *args: Any) -> None:
+    """Replace this process's worker state with ``setup(*args)``.
+
+    Used as the pool initializer, and called directly to run the same
+    tasks in-process.
+    """
+    _STATE.clear()
+    _STATE.update(setup(*args))
+
+
+def worker_state() -> dict[str, Any]:
+    """State set up by :func:`init_worker` in this process."""
+    return _STATE
+
+
+def spawn_pool(workers: int, setup: Callable[..., dict[str, Any]], *args: Any) -> ProcessPoolExecutor:
+    """Process pool (``spawn`` start method) whose workers run ``init_worker(setup, *args)``."""
+    return ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(setup, *args),
+    )
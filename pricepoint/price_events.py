@@ -0,0 +1,255 @@
+"""Price event detection over every (product, retailer) series at once.
+
+Each series is run-length encoded into runs of consecutive observations
+at one price.  Events are then read off neighbouring runs with array
+operations over the whole sorted long table — there is no per-series
+loop:
+
+* a **dip** is a run at least ``min_depth`` below the previous run that
+  returns to within ``return_tolerance`` of that price within
+  ``max_event_days`` (a promotion);
+* a **spike** is the upward counterpart (often a scraping error);
+* a **step** is any other change of at least ``min_step`` that holds for
+  ``min_step_days`` (a permanent repricing).
+
+The events table is small enough for the dashboard and is joined back
+onto rows by :func:`label_rows` to triage anomalies.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pricepoint.config import Settings
+
+logger = logging.getLogger(__name__)
+
+EVENT_COLUMNS = [
+    "canonical_name",
+    "supermarket",
+    "event",
+    "start",
+    "end",
+    "days",
+    "price_before",
+    "price",
+    "depth",
+]
+EVENT_TYPES = ["dip", "spike", "step"]
+_DAY = np.timedelta64(1, "D")
+
+
+def price_runs(df: pd.DataFrame) -> pd.DataFrame:
+    """Run-length encode every (product, retailer) price series.
+
+    Prices are rounded to the penny and duplicate observations of a day
+    are averaged first.  Days without an observation do not break a run.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Rows with ``canonical_name``, ``supermarket``, ``date`` and ``prices``.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per run, ordered by product, retailer and time: ``canonical_name``,
+        ``supermarket``, ``start`` and ``end`` (first and last observed
+        day), ``n_obs`` and ``price``.
+    """
+    prices = df["prices"].to_numpy(dtype=np.float64)
+    observed = ~np.isnan(prices)
+    df, prices = df[observed], prices[observed]
+    p_codes, products = pd.factorize(df["canonical_name"], sort=True)
+    r_codes, retailers = pd.factorize(df["supermarket"], sort=True)
+    series = p_codes.astype(np.int64) * max(len(retailers), 1) + r_codes
+    days = df["date"].to_numpy(dtype="datetime64[D]")
+
+    order = np.lexsort((days, series))
+    series, days, prices = series[order], days[order], prices[order]
+
+    # Average duplicate (series, day) observations.
+    new_cell = np.r_[True, (series[1:] != series[:-1]) | (days[1:] != days[:-1])]
+    cell = np.cumsum(new_cell) - 1
+    prices = np.round(np.bincount(cell, prices) / np.bincount(cell), 2)
+    series, days = series[new_cell], days[new_cell]
+
+    new_run = np.r_[True, (series[1:] != series[:-1]) | (prices[1:] != prices[:-1])]
+    starts = np.flatnonzero(new_run)
+    ends = np.r_[starts[1:], len(series)] - 1
+    run_series = series[starts]
+    return pd.DataFrame({
+        "canonical_name": pd.Categorical.from_codes(run_series // max(len(retailers), 1), products),
+        "supermarket": pd.Categorical.from_codes(run_series % max(len(retailers), 1), retailers),
+        "start": days[starts],
+        "end": days[ends],
+        "n_obs": (ends - starts + 1).astype(np.int32),
+        "price": prices[starts].astype(np.float32),
+    })
+
+
+def detect_price_events(
+    df: pd.DataFrame,
+    min_depth: float = 0.1,
+    max_event_days: int = 28,
+    return_tolerance: float = 0.02,
+    min_step: float = 0.05,
+    min_step_days: int = 14,
+) -> pd.DataFrame:
+    """Dips, spikes and steps in every price series (see the module docstring).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Rows with ``canonical_name``, ``supermarket``, ``date`` and ``prices``.
+    min_depth : float
+        Minimum relative move of a dip or spike.
+    max_event_days : int
+        Days from the start of a dip or spike to the return to the prior price.
+    return_tolerance : float
+        How close (relative) the price after a dip or spike must be to the
+        price before it.
+    min_step : float
+        Minimum relative change of a step.
+    min_step_days : int
+        Days the new price must hold for a step; a step in the last run
+        counts once it has been observed that long.
+
+    Returns
+    -------
+    pd.DataFrame
+        ``EVENT_COLUMNS``: the series, ``event`` type, first and last
+        observed day at the event price, ``days`` from the start to the
+        next price change (or the last observation), the prices before and
+        during the event, and ``depth = price / price_before - 1``.
+    """
+    runs = price_runs(df)
+    logger.info("Detecting price events in %s runs …", f"{len(runs):,}")
+    codes = runs["canonical_name"].cat.codes.to_numpy() * max(len(runs["supermarket"].cat.categories), 1)
+    codes = codes + runs["supermarket"].cat.codes.to_numpy()
+    price = runs["price"].to_numpy(dtype=np.float64)
+    start = runs["start"].to_numpy(dtype="datetime64[D]")
+    end = runs["end"].to_numpy(dtype="datetime64[D]")
+
+    # Neighbouring runs of the same series.
+    has_prev = np.r_[False, codes[1:] == codes[:-1]]
+    has_next = np.r_[codes[:-1] == codes[1:], False]
+    prev_price = np.r_[np.nan, price[:-1]]
+    next_price = np.r_[price[1:], np.nan]
+    next_start = np.r_[start[1:], start[-1:]]
+    held = np.where(has_next, next_start - start, end - start + _DAY) // _DAY
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        depth = price / prev_price - 1
+        returns = has_next & (np.abs(next_price / prev_price - 1) <= return_tolerance)
+    temporary = has_prev & returns & (held <= max_event_days) & (np.abs(depth) >= min_depth)
+    after_temporary = np.r_[False, temporary[:-1]]
+    step = (
+        has_prev
+        & ~temporary
+        & ~after_temporary
+        & (np.abs(depth) >= min_step)
+        & (held >= min_step_days)
+    )
+
+    kind = np.full(len(runs), -1, dtype=np.int8)
+    kind[temporary & (depth < 0)] = EVENT_TYPES.index("dip")
+    kind[temporary & (depth > 0)] = EVENT_TYPES.index("spike")
+    kind[step] = EVENT_TYPES.index("step")
+    rows = np.flatnonzero(kind >= 0)
+
+    events = pd.DataFrame({
+        "canonical_name": runs["canonical_name"].array.take(rows).remove_unused_categories(),
+        "supermarket": runs["supermarket"].array.take(rows),
+        "event": pd.Categorical.from_codes(kind[rows], EVENT_TYPES),
+        "start": start[rows].astype("datetime64[ns]"),
+        "end": end[rows].astype("datetime64[ns]"),
+        "days": held[rows].astype(np.int32),
+        "price_before": prev_price[rows].astype(np.float32),
+        "price": price[rows].astype(np.float32),
+        "depth": depth[rows].astype(np.float32),
+    })
+    logger.info(
+        "Price events: %s.",
+        ", ".join(f"{n:,} {k}s" for k, n in events["event"].value_counts(sort=False).items()),
+    )
+    return events
+
+
+def label_rows(df: pd.DataFrame, events: pd.DataFrame) -> pd.Series:
+    """Event type covering each row's (product, retailer, day), if any.
+
+    Events of a series never overlap, so each row is matched to the last
+    event starting on or before its day with one ``searchsorted``.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Rows with ``canonical_name``, ``supermarket`` and ``date``.
+    events : pd.DataFrame
+        Output of :func:`detect_price_events`.
+
+    Returns
+    -------
+    pd.Series
+        Categorical of ``EVENT_TYPES`` aligned with ``df``; NaN outside events.
+    """
+    names = _union(df["canonical_name"], events["canonical_name"])
+    stores = _union(df["supermarket"], events["supermarket"])
+
+    def keys(frame: pd.DataFrame, day_col: str) -> tuple[np.ndarray, np.ndarray]:
+        series = _positions(names, frame["canonical_name"]) * len(stores)
+        series += _positions(stores, frame["supermarket"])
+        day = frame[day_col].to_numpy(dtype="datetime64[D]").astype(np.int64)
+        return series, day
+
+    row_series, row_day = keys(df, "date")
+    codes = np.full(len(df), -1, dtype=np.int8)
+    if len(events) == 0 or len(df) == 0:
+        return pd.Series(pd.Categorical.from_codes(codes, EVENT_TYPES), index=df.index, name="price_event")
+    ev_series, ev_start = keys(events, "start")
+    ev_end = events["end"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+    # One sortable int64 key per (series, day).
+    first = min(ev_start.min(), row_day.min())
+    span = max(ev_end.max(), row_day.max()) - first + 1
+    ev_key = ev_series * span + ev_start - first
+    order = np.argsort(ev_key)
+    match = np.searchsorted(ev_key[order], row_series * span + row_day - first, side="right") - 1
+    event = order[np.maximum(match, 0)]
+    inside = (match >= 0) & (ev_series[event] == row_series) & (row_day <= ev_end[event])
+    codes[inside] = events["event"].cat.codes.to_numpy()[event[inside]]
+    return pd.Series(pd.Categorical.from_codes(codes, EVENT_TYPES), index=df.index, name="price_event")
+
+
+def _union(*columns: pd.Series) -> pd.Index:
+    return pd.Index(pd.unique(np.concatenate([np.asarray(pd.unique(c), dtype=object) for c in columns])))
+
+
+def _positions(index: pd.Index, column: pd.Series) -> np.ndarray:
+    """Positions of ``column``'s values in ``index``, via the categories when categorical."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return index.get_indexer(column.cat.categories).astype(np.int64)[column.cat.codes.to_numpy()]
+    return index.get_indexer(column).astype(np.int64)
+
+
+def compute_price_events(df: pd.DataFrame, settings: Settings) -> pd.DataFrame:
+    """:func:`detect_price_events` with the ``price_events`` settings."""
+    cfg = settings.price_events
+    return detect_price_events(
+        df,
+        min_depth=cfg.min_depth,
+        max_event_days=cfg.max_event_days,
+        return_tolerance=cfg.return_tolerance,
+        min_step=cfg.min_step,
+        min_step_days=cfg.min_step_days,
+    )
+
+
+def events_path(settings: Settings) -> Path:
+    """Location of ``price_events.parquet`` (written by ``run.py precompute``)."""
+    return settings.market_dynamics.output_dir / "price_events.parquet"
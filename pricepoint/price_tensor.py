@@ -0,0 +1,563 @@
+"""Dense (products × retailers × days) price tensor and batched lag correlations.
+
+Market analyses repeatedly pivot the canonical price table into one
+series per (product, retailer).  :class:`PriceTensor` does that pivot
+once into a float32 array that every analysis can share, and
+:func:`lagged_correlations` computes the correlation of every retailer
+pair at every lag for blocks of products with batched matrix products
+instead of one ``Series.corr`` call per product, pair and lag.
+
+Saved with :meth:`PriceTensor.save`, the tensor is the *price cube*: a
+directory with the values as a ``.npy`` array (memory-mapped on load),
+a bit-packed mask of the cells that were actually observed, and
+sidecar index files for the three axes.  ``python run.py cube`` builds
+it from the canonical products table.  The arrays on disk reserve spare
+products and days, so :meth:`PriceTensor.extend` can append new days in
+place instead of rebuilding the cube from the whole history.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pricepoint.config import Settings
+
+logger = logging.getLogger(__name__)
+
+_FILL_BLOCK_PRODUCTS = 4096
+
+
+@dataclass
+class PriceTensor:
+    """Daily prices as a dense ``(n_products, n_retailers, n_days)`` array.
+
+    Attributes
+    ----------
+    products : np.ndarray
+        Canonical product names (axis 0).
+    retailers : np.ndarray
+        Supermarkets (axis 1), in order of first appearance.
+    dates : np.ndarray
+        ``datetime64[D]`` days with at least one observation (axis 2).
+    values : np.ndarray
+        float32 prices; NaN where a series has no (carried-forward) price.
+    presence : np.ndarray
+        ``np.packbits`` of the observed-cell mask along the day axis,
+        ``(n_products, n_retailers, ceil(n_days / 8))`` uint8.
+    max_fill_days : int, optional
+        Forward-fill limit the values were built with (``None``: unlimited).
+    """
+
+    products: np.ndarray
+    retailers: np.ndarray
+    dates: np.ndarray
+    values: np.ndarray
+    presence: np.ndarray | None = None
+    max_fill_days: int | None = None
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        products=None,
+        ffill: bool = True,
+        max_fill_days: int | None = None,
+    ) -> PriceTensor:
+        """Pivot canonical price rows into a tensor.
+
+        Duplicate (product, retailer, day) observations are averaged, as
+        ``pivot_table`` does.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Rows with ``canonical_name``, ``supermarket``, ``date`` and ``prices``.
+        products : array-like, optional
+            Restrict (and order) axis 0 to these products.
+        ffill : bool
+            Carry each series' last price forward over days it was not observed.
+        max_fill_days : int, optional
+            With ``ffill``, carry a price forward at most this many days.
+        """
+        if products is not None:
+            df = df[df["canonical_name"].isin(products)]
+        prices = df["prices"].to_numpy(dtype=np.float64)
+        observed = ~np.isnan(prices)
+        df, prices = df[observed], prices[observed]
+
+        if products is not None:
+            products = np.asarray(products)
+            p_codes = pd.Index(products).get_indexer(df["canonical_name"])
+        else:
+            p_codes, products = pd.factorize(df["canonical_name"])
+            products = np.asarray(products)
+        r_codes, retailers = pd.factorize(df["supermarket"])
+        days = df["date"].to_numpy(dtype="datetime64[D]")
+        dates, d_codes = np.unique(days, return_inverse=True)
+
+        shape = (len(products), len(retailers), len(dates))
+        # Average duplicates over the observed cells only, so memory scales
+        # with the rows rather than with the (mostly sparse) full grid.
+        flat = np.ravel_multi_index((p_codes, r_codes, d_codes), shape)
+        cells, inverse = np.unique(flat, return_inverse=True)
+        sums = np.bincount(inverse, prices)
+        counts = np.bincount(inverse)
+        values = np.full(shape, np.nan, dtype=np.float32)
+        values.reshape(-1)[cells] = sums / counts
+        presence = np.packbits(~np.isnan(values), axis=-1)
+
+        if ffill:
+            for start in range(0, shape[0], _FILL_BLOCK_PRODUCTS):
+                block = slice(start, start + _FILL_BLOCK_PRODUCTS)
+                values[block] = forward_fill(values[block], max_fill_days)
+        logger.info(
+            "Price tensor: %s products × %s retailers × %s days (%.0f MB)",
+            f"{shape[0]:,}", shape[1], shape[2], values.nbytes / 1e6,
+        )
+        return cls(
+            products=products,
+            retailers=np.asarray(retailers),
+            dates=dates,
+            values=values,
+            presence=presence,
+            max_fill_days=max_fill_days if ffill else 0,
+        )
+
+    @property
+    def complete(self) -> np.ndarray:
+        """``(n_products, n_retailers)`` mask of series with a price on every day."""
+        return ~np.isnan(self.values).any(axis=-1)
+
+    @property
+    def listed(self) -> np.ndarray:
+        """``(n_products, n_retailers)`` mask of series observed at least once."""
+        if self.presence is None:
+            return ~np.isnan(self.values).all(axis=-1)
+        return (np.asarray(self.presence) != 0).any(axis=-1)
+
+    @property
+    def observed(self) -> np.ndarray:
+        """Boolean mask of cells with an actual (not carried-forward) price."""
+        if self.presence is None:
+            return ~np.isnan(self.values)
+        return np.unpackbits(self.presence, axis=-1, count=len(self.dates)).astype(bool)
+
+    def observed_on(self, day: int) -> np.ndarray:
+        """``(n_products, n_retailers)`` slice of :attr:`observed` for one day.
+
+        Only the day's byte column of ``presence`` is read, so a
+        memory-mapped cube is not unpacked in full.
+        """
+        if self.presence is None:
+            return ~np.isnan(self.values[:, :, day])
+        day = range(len(self.dates))[day]
+        return (np.asarray(self.presence[:, :, day // 8]) >> (7 - day % 8) & 1).astype(bool)
+
+    def select(self, products) -> PriceTensor:
+        """Sub-tensor for ``products`` (in that order); unknown names are an error."""
+        rows = pd.Index(self.products).get_indexer(np.asarray(products))
+        if (rows < 0).any():
+            raise KeyError(f"{int((rows < 0).sum())} products are not in the price tensor.")
+        return PriceTensor(
+            products=self.products[rows],
+            retailers=self.retailers,
+            dates=self.dates,
+            values=self.values[rows],
+            presence=None if self.presence is None else self.presence[rows],
+            max_fill_days=self.max_fill_days,
+        )
+
+    def days(self, start: int, stop: int | None = None) -> PriceTensor:
+        """Sub-tensor for day positions ``start:stop`` (a view of the values)."""
+        start, stop, _ = slice(start, stop).indices(len(self.dates))
+        presence = None
+        if self.presence is not None:
+            first = start // 8
+            bits = np.unpackbits(self.presence[..., first:-(-stop // 8)], axis=-1)
+            presence = np.packbits(bits[..., start - 8 * first:stop - 8 * first], axis=-1)
+        return PriceTensor(
+            products=self.products,
+            retailers=self.retailers,
+            dates=self.dates[start:stop],
+            values=self.values[..., start:stop],
+            presence=presence,
+            max_fill_days=self.max_fill_days,
+        )
+
+    def day_frame(self, day: int = -1, observed_only: bool = True) -> pd.DataFrame:
+        """Wide (product × retailer) prices on one day, like ``pivot_table``.
+
+        Parameters
+        ----------
+        day : int
+            Position on the day axis; the latest day by default.
+        observed_only : bool
+            Blank out carried-forward prices, keeping only that day's observations.
+        """
+        prices = np.asarray(self.values[:, :, day], dtype=np.float64)
+        if observed_only:
+            prices = np.where(self.observed_on(day), prices, np.nan)
+        frame = pd.DataFrame(
+            prices,
+            index=pd.Index(self.products, name="canonical_name"),
+            columns=pd.Index(self.retailers, name="supermarket"),
+        )
+        return frame.dropna(how="all")
+
+    def save(self, output_dir: Path, headroom: float = 0.0) -> Path:
+        """Write the cube: ``values.npy``, ``presence.npy`` and axis sidecars.
+
+        ``products.parquet`` and ``dates.npy`` index axes 0 and 2;
+        ``index.json`` holds the retailers (axis 1), shape, on-disk
+        capacity and fill policy.
+
+        Parameters
+        ----------
+        output_dir : Path
+            Cube directory.
+        headroom : float
+            Spare capacity, as a fraction of the products and of the days,
+            reserved in the arrays for :meth:`extend` (NaN values, unset bits).
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        n_products, n_retailers, n_days = self.values.shape
+        capacity = (
+            n_products + int(np.ceil(n_products * headroom)),
+            n_retailers,
+            n_days + int(np.ceil(n_days * headroom)),
+        )
+        presence = self.presence if self.presence is not None else np.packbits(self.observed, axis=-1)
+        values_out = np.lib.format.open_memmap(
+            output_dir / "values.npy", mode="w+", dtype=np.float32, shape=capacity
+        )
+        values_out[:] = np.nan
+        values_out[:n_products, :, :n_days] = self.values
+        presence_out = np.lib.format.open_memmap(
+            output_dir / "presence.npy", mode="w+", dtype=np.uint8,
+            shape=(capacity[0], n_retailers, -(-capacity[2] // 8)),
+        )
+        presence_out[:] = 0
+        presence_out[:n_products, :, :presence.shape[-1]] = presence
+        del values_out, presence_out  # flush
+        np.save(output_dir / "dates.npy", self.dates)
+        pd.DataFrame({"canonical_name": self.products}).to_parquet(
+            output_dir / "products.parquet", index=False
+        )
+        _write_index(output_dir, {
+            "retailers": [str(r) for r in self.retailers],
+            "shape": list(self.values.shape),
+            "capacity": list(capacity),
+            "max_fill_days": self.max_fill_days,
+        })
+        return output_dir
+
+    @classmethod
+    def load(cls, output_dir: Path, mmap: bool = True) -> PriceTensor:
+        """Open a saved cube; with ``mmap`` the values and mask are memory-mapped."""
+        output_dir = Path(output_dir)
+        index = _read_index(output_dir)
+        n_products, _, n_days = index["shape"]
+        values = np.load(output_dir / "values.npy", mmap_mode="r")[:n_products, :, :n_days]
+        presence = np.load(output_dir / "presence.npy", mmap_mode="r")[:n_products, :, :-(-n_days // 8)]
+        if not mmap:
+            values, presence = np.array(values), np.array(presence)
+        return cls(
+            products=pd.read_parquet(output_dir / "products.parquet")["canonical_name"].to_numpy(),
+            retailers=np.asarray(index["retailers"], dtype=object),
+            dates=np.load(output_dir / "dates.npy"),
+            values=values,
+            presence=presence,
+            max_fill_days=index["max_fill_days"],
+        )
+
+    @classmethod
+    def extend(cls, output_dir: Path, df: pd.DataFrame) -> PriceTensor | None:
+        """Append the days of ``df`` after a saved cube's last day, in place.
+
+        Only the new days' columns of ``values.npy`` and ``presence.npy``
+        are written (plus, with a fill limit, the last ``max_fill_days``
+        days are read to carry prices forward), so the cost scales with
+        the new rows rather than with the history.  New products take
+        spare rows.  Rows on or before the last day are ignored: history
+        is assumed to be append-only.
+
+        Parameters
+        ----------
+        output_dir : Path
+            Cube directory written by :meth:`save`.
+        df : pd.DataFrame
+            Canonical rows with at least ``CUBE_COLUMNS``.
+
+        Returns
+        -------
+        PriceTensor or None
+            The extended cube, memory-mapped; ``None`` when the new rows
+            do not fit — a new retailer, or no spare products or days
+            left — and the cube has to be rebuilt.
+        """
+        output_dir = Path(output_dir)
+        index = _read_index(output_dir)
+        _, n_retailers, n_days = index["shape"]
+        capacity = index.get("capacity", index["shape"])
+        dates = np.load(output_dir / "dates.npy")
+        if n_days:
+            df = df[df["date"].to_numpy(dtype="datetime64[D]") > dates[-1]]
+        new = cls.from_frame(df, ffill=False)
+        if not len(new.dates):
+            return cls.load(output_dir)
+
+        products = pd.read_parquet(output_dir / "products.parquet")["canonical_name"].to_numpy()
+        added = new.products[~pd.Index(new.products).isin(products)]
+        products = np.concatenate([products, added])
+        total_products, total_days = len(products), n_days + len(new.dates)
+        unknown = set(new.retailers) - set(index["retailers"])
+        if unknown or total_products > capacity[0] or total_days > capacity[2]:
+            logger.info(
+                "Price cube cannot be extended in place (%s).",
+                f"new retailers {sorted(unknown)}" if unknown else "no spare capacity",
+            )
+            return None
+
+        block = np.full((total_products, n_retailers, len(new.dates)), np.nan, dtype=np.float32)
+        rows = pd.Index(products).get_indexer(new.products)
+        cols = pd.Index(index["retailers"]).get_indexer(new.retailers)
+        block[np.ix_(rows, cols)] = new.values
+        observed = ~np.isnan(block)
+
+        values = np.load(output_dir / "values.npy", mmap_mode="r+")
+        presence = np.load(output_dir / "presence.npy", mmap_mode="r+")
+        limit = index["max_fill_days"]
+        # Carry prices into the new days from the days before them: the
+        # last (already filled) day when unlimited, else the observed
+        # prices of the last ``limit`` days.
+        lookback = min(1 if limit is None else limit, n_days)
+        if lookback:
+            tail = np.array(values[:total_products, :, n_days - lookback:n_days])
+            if limit is not None:
+                first = (n_days - lookback) // 8
+                bits = np.unpackbits(presence[:total_products, :, first:-(-n_days // 8)], axis=-1)
+                start = n_days - lookback - 8 * first
+                tail[~bits[..., start:start + lookback].astype(bool)] = np.nan
+            block = forward_fill(np.concatenate([tail, block], axis=-1), limit)[..., lookback:]
+
+        values[:total_products, :, n_days:total_days] = block
+        first = n_days // 8
+        bits = np.zeros((total_products, n_retailers, 8 * (-(-total_days // 8) - first)), dtype=bool)
+        bits[..., n_days - 8 * first:total_days - 8 * first] = observed
+        presence[:total_products, :, first:-(-total_days // 8)] |= np.packbits(bits, axis=-1)
+        values.flush()
+        presence.flush()
+        del values, presence
+
+        np.save(output_dir / "dates.npy", np.concatenate([dates, new.dates]))
+        if len(added):
+            pd.DataFrame({"canonical_name": products}).to_parquet(
+                output_dir / "products.parquet", index=False
+            )
+        _write_index(output_dir, {**index, "shape": [total_products, n_retailers, total_days]})
+        logger.info(
+            "Price cube extended by %d days and %d products to %s × %s × %s.",
+            len(new.dates), len(added), f"{total_products:,}", n_retailers, total_days,
+        )
+        return cls.load(output_dir)
+
+
+def _read_index(output_dir: Path) -> dict:
+    with open(output_dir / "index.json", "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _write_index(output_dir: Path, index: dict) -> None:
+    with open(output_dir / "index.json", "w", encoding="utf-8") as fh:
+        json.dump(index, fh, indent=2)
+
+
+def forward_fill(values: np.ndarray, limit: int | None = None) -> np.ndarray:
+    """Carry the last non-NaN value forward along the last axis.
+
+    With ``limit``, a value is carried at most ``limit`` positions; later
+    gaps stay NaN (``limit=0`` fills nothing).
+    """
+    valid = ~np.isnan(values)
+    positions = np.arange(values.shape[-1])
+    idx = np.where(valid, positions, 0)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    filled = np.take_along_axis(values, idx, axis=-1)
+    if limit is not None:
+        filled[positions - idx > limit] = np.nan
+    return filled
+
+
+def lagged_correlations(
+    values: np.ndarray,
+    max_lag: int,
+    block_size: int = 512,
+) -> np.ndarray:
+    """Pearson correlation of every retailer pair at every lag.
+
+    ``out[p, a, b, k]`` is the correlation of ``values[p, a, t]`` with
+    ``values[p, b, t - lag]`` for ``lag = k - max_lag`` — what
+    ``s_a.corr(s_b.shift(lag))`` gives for complete series, i.e. over
+    the overlapping days with each side centred on its own overlap mean.
+    Series with NaNs or zero variance on the overlap give NaN.
+
+    The cross products for all lags come from one batched matrix product
+    against a zero-padded sliding window view of the series; overlap sums
+    and sums of squares come from cumulative sums.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        ``(n_products, n_retailers, n_days)`` prices.
+    max_lag : int
+        Lags ``-max_lag … max_lag`` are evaluated.
+    block_size : int
+        Products per batched matrix product (bounds memory).
+
+    Returns
+    -------
+    np.ndarray
+        ``(n_products, n_retailers, n_retailers, 2 * max_lag + 1)`` float32.
+    """
+    n_products, n_retailers, n_days = values.shape
+    out = np.empty((n_products, n_retailers, n_retailers, 2 * max_lag + 1), dtype=np.float32)
+    n = lag_overlap(n_days, max_lag)
+    for start in range(0, n_products, block_size):
+        x = values[start:start + block_size].astype(np.float64)
+        out[start:start + len(x)] = correlation_from_lag_sums(*lag_sums(x, max_lag), n)
+    return out
+
+
+def lag_overlap(n_days: int, max_lag: int) -> np.ndarray:
+    """Days paired at each lag ``-max_lag … max_lag`` of an ``n_days`` series."""
+    return np.maximum(n_days - np.abs(np.arange(-max_lag, max_lag + 1)), 0).astype(np.float64)
+
+
+def lag_sums(x: np.ndarray, max_lag: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sufficient statistics of :func:`lagged_correlations` for one block.
+
+    At lag ``lag`` the series ``x[p, a]`` is paired with ``x[p, b]``
+    shifted by ``lag`` over their overlap.  ``sx`` and ``sxx`` are the
+    sums and sums of squares of the ``a`` side on that overlap, ``(m,
+    n_retailers, n_lags)``; the ``b`` side's are the same arrays with the
+    lag axis reversed.  ``sxy`` holds the cross products, ``(m,
+    n_retailers, n_retailers, n_lags)``.  NaNs propagate into the sums.
+    """
+    m, n_retailers, n_days = x.shape
+    lags = np.arange(-max_lag, max_lag + 1)
+    n_lags = len(lags)
+
+    # Overlap bounds per lag: x over [x_lo, x_hi).
+    x_lo = np.clip(lags, 0, n_days)
+    x_hi = np.clip(n_days + np.minimum(lags, 0), x_lo, n_days)
+    cs = np.zeros((m, n_retailers, n_days + 1))
+    cs2 = np.zeros((m, n_retailers, n_days + 1))
+    np.cumsum(x, axis=-1, out=cs[..., 1:])
+    np.cumsum(x * x, axis=-1, out=cs2[..., 1:])
+    sx, sxx = cs[..., x_hi] - cs[..., x_lo], cs2[..., x_hi] - cs2[..., x_lo]
+
+    # windows[..., w, t] = y[t - lag] with lag = max_lag - w (0 outside the series).
+    padded = np.zeros((m, n_retailers, n_days + 2 * max_lag))
+    padded[..., max_lag:max_lag + n_days] = np.nan_to_num(x)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, n_days, axis=-1)
+    windows = windows[:, :, ::-1].reshape(m, n_retailers * n_lags, n_days)
+    sxy = np.matmul(np.nan_to_num(x), windows.transpose(0, 2, 1))
+    return sx, sxx, sxy.reshape(m, n_retailers, n_retailers, n_lags)
+
+
+def correlation_from_lag_sums(
+    sx: np.ndarray, sxx: np.ndarray, sxy: np.ndarray, n: np.ndarray
+) -> np.ndarray:
+    """Lagged correlations from :func:`lag_sums` and :func:`lag_overlap`.
+
+    Leading axes of the inputs broadcast, so sums for several windows can
+    be converted at once.  Zero-variance overlaps give NaN.
+    """
+    sy, syy = sx[..., ::-1], sxx[..., ::-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx[..., :, None, :] * sy[..., None, :, :] / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        norm = np.sqrt(var_x[..., :, None, :] * var_y[..., None, :, :])
+        # Variance lost to rounding counts as zero (a constant overlap).
+        scale = np.sqrt(sxx[..., :, None, :] * syy[..., None, :, :])
+        return np.where(norm > 1e-9 * scale, cov / norm, np.nan).astype(np.float32)
+
+
+CUBE_COLUMNS = ["canonical_name", "supermarket", "date", "prices"]
+
+
+def build_price_cube(settings: Settings, df: pd.DataFrame | None = None) -> Path:
+    """Build the price cube from the canonical products table and save it.
+
+    Parameters
+    ----------
+    settings : Settings
+        Application settings (``price_cube`` section).
+    df : pd.DataFrame, optional
+        Already-loaded canonical rows with at least ``CUBE_COLUMNS``;
+        read from the canonical Parquet when omitted.
+
+    Returns
+    -------
+    Path
+        The cube directory.
+    """
+    if df is None:
+        canonical_path = settings.data.processed_dir / settings.matching.output_filename
+        if not canonical_path.exists():
+            raise FileNotFoundError(f"Canonical products not found at {canonical_path}.")
+        df = pd.read_parquet(canonical_path, columns=CUBE_COLUMNS, engine="pyarrow")
+    cfg = settings.price_cube
+    cube = PriceTensor.from_frame(df, max_fill_days=cfg.max_fill_days)
+    path = cube.save(cfg.output_dir, headroom=cfg.headroom)
+    logger.info("Price cube saved to %s", path)
+    return path
+
+
+def update_price_cube(settings: Settings) -> Path:
+    """Append the canonical table's days after the saved cube's last one.
+
+    Only those rows are read, through a Parquet filter on ``date``, and
+    :meth:`PriceTensor.extend` writes them into the cube's spare days.
+    The cube is rebuilt in full when it does not exist yet, was built
+    with another fill limit, or cannot be extended.
+
+    Parameters
+    ----------
+    settings : Settings
+        Application settings (``price_cube`` section).
+
+    Returns
+    -------
+    Path
+        The cube directory.
+    """
+    cfg = settings.price_cube
+    canonical_path = settings.data.processed_dir / settings.matching.output_filename
+    if not canonical_path.exists():
+        raise FileNotFoundError(f"Canonical products not found at {canonical_path}.")
+    if not (cfg.output_dir / "index.json").exists():
+        return build_price_cube(settings)
+    if _read_index(cfg.output_dir)["max_fill_days"] != cfg.max_fill_days:
+        return build_price_cube(settings)
+    dates = np.load(cfg.output_dir / "dates.npy")
+    filters = [("date", ">", pd.Timestamp(dates[-1]))] if len(dates) else None
+    df = pd.read_parquet(canonical_path, columns=CUBE_COLUMNS, filters=filters, engine="pyarrow")
+    if PriceTensor.extend(cfg.output_dir, df) is None:
+        return build_price_cube(settings)
+    return cfg.output_dir
+
+
+def load_price_cube(settings: Settings, mmap: bool = True) -> PriceTensor:
+    """Open the saved price cube, building it first if it does not exist yet."""
+    if not (settings.price_cube.output_dir / "index.json").exists():
+        build_price_cube(settings)
+    return PriceTensor.load(settings.price_cube.output_dir, mmap=mmap)
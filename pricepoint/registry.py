@@ -0,0 +1,320 @@
+"""Versioned model registry.
+
+Every trained model is registered as an immutable version directory::
+
+    models/registry/
+        v0003/
+            model.txt        # native LightGBM text model
+            forest/          # flat node arrays (memory-mappable .npy files)
+            manifest.json    # features, dtype schema, metrics, params, data fingerprint
+        current.json         # {"version": "v0003", "history": [...]}
+
+Loading never unpickles: the Booster is parsed from ``model.txt`` and the
+flat-array evaluator from :mod:`pricepoint.tree_export` is memory-mapped.
+Promotion and rollback only rewrite ``current.json`` (atomically), so
+they are instant.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from pricepoint.config import Settings
+from pricepoint.training import model_feature_names
+from pricepoint.tree_export import FlatForest, export_booster
+
+logger = logging.getLogger(__name__)
+
+_POINTER = "current.json"
+_LOAD_KINDS = ("booster", "flat")
+
+
+class ModelRegistry:
+    """Versioned model store with a ``current`` pointer.
+
+    Parameters
+    ----------
+    root : Path
+        Registry directory.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    # -- pointer ----------------------------------------------------------
+
+    def _read_pointer(self) -> dict[str, Any]:
+        path = self.root / _POINTER
+        if not path.exists():
+            return {"version": None, "history": []}
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def _write_pointer(self, pointer: dict[str, Any]) -> None:
+        tmp = self.root / f"{_POINTER}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(pointer, fh, indent=2)
+        os.replace(tmp, self.root / _POINTER)
+
+    def versions(self) -> list[str]:
+        """Registered versions, oldest first."""
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.glob("v*") if (p / "manifest.json").exists())
+
+    def current_version(self) -> str | None:
+        return self._read_pointer()["version"]
+
+    def set_current(self, version: str) -> None:
+        """Point ``current`` at ``version``."""
+        if version not in self.versions():
+            raise KeyError(f"Unknown model version {version!r}.")
+        pointer = self._read_pointer()
+        if pointer["version"] == version:
+            return
+        if pointer["version"]:
+            pointer["history"].append(pointer["version"])
+        pointer["version"] = version
+        self._write_pointer(pointer)
+        logger.info("Current model → %s", version)
+
+    def rollback(self, version: str | None = None) -> str:
+        """Point ``current`` at ``version`` or, by default, the previously current one."""
+        pointer = self._read_pointer()
+        if version is None:
+            if not pointer["history"]:
+                raise RuntimeError("No previous model version to roll back to.")
+            version = pointer["history"].pop()
+            if version not in self.versions():
+                raise KeyError(f"Previous model version {version!r} no longer exists.")
+            pointer["version"] = version
+            self._write_pointer(pointer)
+            logger.info("Rolled back current model → %s", version)
+            return version
+        self.set_current(version)
+        return version
+
+    # -- versions ---------------------------------------------------------
+
+    def register(
+        self,
+        model,
+        metrics: dict[str, float],
+        schema: dict[str, Any] | None = None,
+        data_fingerprint: str | None = None,
+        params: dict[str, Any] | None = None,
+        source: str = "train",
+        make_current: bool = True,
+    ) -> str:
+        """Store a trained model as a new version.
+
+        Parameters
+        ----------
+        model
+            ``LGBMRegressor`` or ``Booster``.
+        metrics : dict
+            Holdout metrics.
+        schema : dict, optional
+            Native-categorical schema (categorical features and codes).
+        data_fingerprint : str, optional
+            Hash of the training data.
+        params : dict, optional
+            Hyperparameters used.
+        source : str
+            What produced the model (``train``, ``incremental`` …).
+        make_current : bool
+            Point ``current`` at the new version.
+
+        Returns
+        -------
+        str
+            The new version id.
+        """
+        booster = getattr(model, "booster_", model)
+        existing = self.versions()
+        version = f"v{int(existing[-1][1:]) + 1 if existing else 1:04d}"
+        tmp_dir = self.root / f".{version}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        booster.save_model(str(tmp_dir / "model.txt"))
+        export_booster(booster).save(tmp_dir / "forest")
+
+        features = model_feature_names(model)
+        categorical = (schema or {}).get("categorical_features", [])
+        manifest = {
+            "version": version,
+            "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            "source": source,
+            "model_class": type(model).__name__,
+            "feature_names": features,
+            "dtypes": {f: "category_code" if f in categorical else "float32" for f in features},
+            "categorical_features": categorical,
+            "categories": (schema or {}).get("categories", {}),
+            "metrics": metrics,
+            "params": params or {},
+            "data_fingerprint": data_fingerprint,
+            "num_trees": booster.num_trees(),
+        }
+        with open(tmp_dir / "manifest.json", "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=2, default=str)
+        tmp_dir.rename(self.root / version)
+
+        logger.info("Registered model %s (%s trees) in %s", version, manifest["num_trees"], self.root)
+        if make_current:
+            self.set_current(version)
+        return version
+
+    def _resolve(self, version: str | None) -> Path:
+        version = version or self.current_version()
+        if version is None:
+            raise FileNotFoundError(f"No current model in registry {self.root}. Run training first.")
+        path = self.root / version
+        if not (path / "manifest.json").exists():
+            raise KeyError(f"Unknown model version {version!r}.")
+        return path
+
+    def manifest(self, version: str | None = None) -> dict[str, Any]:
+        with open(self._resolve(version) / "manifest.json", "r", encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def load(self, version: str | None = None, kind: str = "booster"):
+        """Load a version (default: current) without unpickling.
+
+        Parameters
+        ----------
+        version : str, optional
+            Version id; defaults to the current one.
+        kind : str
+            ``"booster"`` for a LightGBM ``Booster`` parsed from text, or
+            ``"flat"`` for a memory-mapped :class:`FlatForest`.
+        """
+        if kind not in _LOAD_KINDS:
+            raise ValueError(f"Unknown model kind {kind!r}; expected one of {_LOAD_KINDS}.")
+        path = self._resolve(version)
+        if kind == "flat":
+            return FlatForest.load(path / "forest")
+
+        import lightgbm as lgb
+
+        return lgb.Booster(model_file=str(path / "model.txt"))
+
+    def prune(self, keep: int) -> list[str]:
+        """Delete the oldest versions beyond ``keep``, never the current one."""
+        current = self.current_version()
+        removable = [v for v in self.versions() if v != current]
+        stale = removable[: max(0, len(removable) - (keep - 1 if current else keep))]
+        for version in stale:
+            shutil.rmtree(self.root / version)
+        if stale:
+            pointer = self._read_pointer()
+            pointer["history"] = [v for v in pointer["history"] if v not in stale]
+            self._write_pointer(pointer)
+            logger.info("Pruned model versions: %s", ", ".join(stale))
+        return stale
+
+
+def load_current_model(settings: Settings) -> tuple[Any, dict[str, Any]]:
+    """Load the model to serve and its feature schema.
+
+    Uses the registry's current version when there is one, otherwise the
+    native text model (plus its schema sidecar) or the joblib artifact.
+
+    Returns
+    -------
+    tuple
+        (predictor with ``predict``, schema dict with ``feature_names``,
+        ``categorical_features`` and ``categories``)
+    """
+    registry = ModelRegistry(settings.model.registry_dir)
+    if registry.current_version() is not None:
+        manifest = registry.manifest()
+        logger.info("Loading registry model %s …", manifest["version"])
+        return registry.load(kind="booster"), manifest
+
+    # Without a registry, the most recently written trainer artifact.
+    artifacts = [p for p in (settings.model.native_model_path, settings.model.model_path) if p.exists()]
+    if not artifacts:
+        raise FileNotFoundError(f"Model not found at {settings.model.model_path}. Run training first.")
+    model_path = max(artifacts, key=lambda p: p.stat().st_mtime)
+    logger.info("Loading model from %s …", model_path)
+    if model_path == settings.model.native_model_path:
+        import lightgbm as lgb
+
+        booster = lgb.Booster(model_file=str(model_path))
+        schema: dict[str, Any] = {"categorical_features": [], "categories": {}}
+        if settings.model.schema_path.exists():
+            with open(settings.model.schema_path, "r", encoding="utf-8") as fh:
+                schema = json.load(fh)
+        return booster, {**schema, "feature_names": booster.feature_name()}
+
+    import joblib
+
+    model = joblib.load(model_path)
+    schema = {"categorical_features": [], "categories": {}, "feature_names": model_feature_names(model)}
+    return model.booster_, schema
+
+
+def data_fingerprint(path: Path, hash_contents: bool = False) -> str | None:
+    """Short hash of a training data file or directory."""
+    from pricepoint.stage_cache import fingerprint_path
+
+    fp = fingerprint_path(path, hash_contents)
+    if fp is None:
+        return None
+    return hashlib.sha256(json.dumps(fp, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def register_trained_model(
+    settings: Settings,
+    model,
+    metrics: dict[str, float],
+    schema: dict[str, Any] | None = None,
+    source: str = "train",
+) -> str:
+    """Register a freshly trained model and prune old versions."""
+    registry = ModelRegistry(settings.model.registry_dir)
+    feature_path = settings.data.processed_dir / settings.features.output_filename
+    version = registry.register(
+        model,
+        metrics,
+        schema=schema,
+        data_fingerprint=data_fingerprint(feature_path, settings.cache.hash_inputs),
+        params=settings.model.lgbm_params,
+        source=source,
+    )
+    registry.prune(settings.model.keep_versions)
+    return version
+
+
+def benchmark_cold_load(settings: Settings, n_repeats: int = 5) -> dict[str, float]:
+    """Median cold-start load time (ms) of the pickle vs. registry artifacts."""
+    import joblib
+
+    registry = ModelRegistry(settings.model.registry_dir)
+    loaders = {
+        "joblib.load (pickle)": lambda: joblib.load(settings.model.model_path),
+        "Booster(model_file)": lambda: registry.load(kind="booster"),
+        "FlatForest (mmap)": lambda: registry.load(kind="flat"),
+    }
+    if not settings.model.model_path.exists():
+        loaders.pop("joblib.load (pickle)")
+
+    results = {}
+    for name, load in loaders.items():
+        timings = []
+        for _ in range(n_repeats):
+            start = time.perf_counter()
+            load()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = round(sorted(timings)[len(timings) // 2], 3)
+        logger.info("%s: %.3f ms", name, results[name])
+    return results
@@ -0,0 +1,244 @@
+"""Chunked batch scoring of feature data.
+
+Streams feature Parquet (a file or a partitioned directory) in Arrow
+record batches and works out once how each model feature is filled from
+the input columns: passed through, matched against a one-hot level, or
+mapped to a native category code.  Each batch then fills a reused
+float64 buffer (float32 would move values across split thresholds of
+models trained on float64 frames) and is predicted with a configurable LightGBM thread
+count.  Predictions are streamed to a date-partitioned Parquet dataset,
+so memory stays constant whatever the input size.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from pricepoint.config import Settings
+from pricepoint.registry import load_current_model
+from pricepoint.training import NON_FEATURE_COLS
+
+logger = logging.getLogger(__name__)
+
+ID_COLS = ["canonical_name", "supermarket", "date"]
+PREDICTION_COL = "prediction"
+
+
+@dataclass(frozen=True)
+class ColumnPlan:
+    """How to fill each model feature from an input batch.
+
+    ``sources[j]`` is ``(kind, column, arg)`` with ``kind`` one of
+    ``"numeric"``, ``"onehot"`` (``arg`` = level), ``"category"``
+    (``arg`` = vocabulary) or ``"missing"`` (filled with 0, as the
+    training-time ``reindex`` does).
+    """
+
+    feature_names: list[str]
+    sources: list[tuple[str, str | None, Any]]
+
+    @property
+    def input_columns(self) -> list[str]:
+        return sorted({col for _, col, _ in self.sources if col is not None})
+
+
+def build_column_plan(
+    feature_names: list[str],
+    input_schema,
+    categories: dict[str, list[str]] | None = None,
+) -> ColumnPlan:
+    """Align model features to input columns once.
+
+    Parameters
+    ----------
+    feature_names : list[str]
+        Model features, in order.
+    input_schema : pyarrow.Schema
+        Schema of the input data.
+    categories : dict, optional
+        Native-categorical vocabularies.
+
+    Returns
+    -------
+    ColumnPlan
+    """
+    import pyarrow.types as pat
+
+    categories = categories or {}
+    columns = set(input_schema.names)
+    string_cols = sorted(
+        (
+            f.name for f in input_schema
+            if (pat.is_string(f.type) or pat.is_large_string(f.type) or pat.is_dictionary(f.type))
+            and f.name not in NON_FEATURE_COLS
+        ),
+        key=len,
+        reverse=True,
+    )
+
+    sources: list[tuple[str, str | None, Any]] = []
+    for name in feature_names:
+        if name in categories and name in columns:
+            sources.append(("category", name, categories[name]))
+        elif name in columns:
+            sources.append(("numeric", name, None))
+        else:
+            # One-hot features are ``<column>_<level>``; prefer the longest match.
+            parent = next((c for c in string_cols if name.startswith(f"{c}_")), None)
+            if parent is None:
+                sources.append(("missing", None, None))
+            else:
+                sources.append(("onehot", parent, name[len(parent) + 1:]))
+
+    missing = [n for n, (kind, _, _) in zip(feature_names, sources) if kind == "missing"]
+    if missing:
+        logger.warning("%s model features absent from input, filled with 0: %s", len(missing), missing)
+    return ColumnPlan(feature_names=list(feature_names), sources=sources)
+
+
+def fill_matrix(plan: ColumnPlan, batch, out: np.ndarray) -> np.ndarray:
+    """Write a record batch's features into ``out[:num_rows]`` and return that view."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    n = batch.num_rows
+    X = out[:n]
+    for j, (kind, col, arg) in enumerate(plan.sources):
+        if kind == "missing":
+            X[:, j] = 0.0
+            continue
+        column = batch.column(col)
+        if kind == "numeric":
+            X[:, j] = pc.cast(column, pa.float64()).to_numpy(zero_copy_only=False)
+        elif kind == "onehot":
+            X[:, j] = pc.fill_null(pc.equal(column.cast(pa.string()), arg), False).to_numpy(
+                zero_copy_only=False
+            )
+        else:
+            codes = pc.index_in(column.cast(pa.string()), value_set=pa.array(arg, pa.string()))
+            X[:, j] = pc.cast(codes, pa.float64()).to_numpy(zero_copy_only=False)
+    return X
+
+
+def score_batches(
+    predictor,
+    plan: ColumnPlan,
+    batches,
+    batch_rows: int,
+    num_threads: int | None = None,
+    id_columns: list[str] | None = None,
+    log_every: int = 10,
+):
+    """Yield output record batches (ids + ``prediction``) for each input batch."""
+    import pyarrow as pa
+
+    buffer = np.empty((batch_rows, len(plan.feature_names)), dtype=np.float64)
+    predict_kwargs = {"num_threads": num_threads} if num_threads else {}
+    id_columns = id_columns or []
+    total, start = 0, time.perf_counter()
+    for i, batch in enumerate(batches, start=1):
+        if not batch.num_rows:
+            continue
+        X = fill_matrix(plan, batch, buffer)
+        preds = predictor.predict(X, **predict_kwargs)
+        arrays = [batch.column(c) for c in id_columns]
+        if "date" in id_columns:
+            j = id_columns.index("date")
+            arrays[j] = arrays[j].cast(pa.date32())
+        yield pa.RecordBatch.from_arrays(
+            [*arrays, pa.array(preds, pa.float32())], names=[*id_columns, PREDICTION_COL]
+        )
+        total += batch.num_rows
+        if i % log_every == 0:
+            elapsed = time.perf_counter() - start
+            logger.info("Scored %s rows (%s rows/s)", f"{total:,}", f"{total / elapsed:,.0f}")
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Scoring complete: %s rows in %.1fs (%s rows/s)",
+        f"{total:,}", elapsed, f"{total / max(elapsed, 1e-9):,.0f}",
+    )
+
+
+def run_scoring(
+    settings: Settings,
+    input_path: Path | None = None,
+    output_dir: Path | None = None,
+    since: str | None = None,
+    num_threads: int | None = None,
+) -> Path:
+    """Score feature data in bulk and write date-partitioned predictions.
+
+    Parameters
+    ----------
+    settings : Settings
+        Application settings.
+    input_path : Path, optional
+        Feature Parquet file or directory; defaults to the engineered
+        feature file.
+    output_dir : Path, optional
+        Output dataset directory; defaults to ``scoring.output_dir``.
+    since : str, optional
+        Only score rows on or after this ISO date (pushed down to Parquet).
+    num_threads : int, optional
+        LightGBM threads; defaults to ``scoring.num_threads``.
+
+    Returns
+    -------
+    Path
+        The output dataset directory.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    cfg = settings.scoring
+    input_path = input_path or settings.data.processed_dir / settings.features.output_filename
+    output_dir = output_dir or cfg.output_dir
+    if not input_path.exists():
+        raise FileNotFoundError(f"Feature data not found at {input_path}.")
+
+    predictor, schema = load_current_model(settings)
+    dataset = ds.dataset(input_path, format="parquet", partitioning="hive")
+    plan = build_column_plan(schema["feature_names"], dataset.schema, schema.get("categories"))
+    id_columns = [c for c in ID_COLS if c in dataset.schema.names]
+
+    row_filter = None
+    if since is not None:
+        date_type = dataset.schema.field("date").type
+        row_filter = ds.field("date") >= pa.scalar(np.datetime64(since, "s")).cast(date_type)
+
+    logger.info(
+        "Scoring %s → %s in batches of %s rows (%s threads) …",
+        input_path, output_dir, f"{cfg.batch_rows:,}", num_threads or cfg.num_threads or "all",
+    )
+    batches = dataset.to_batches(
+        columns=[*plan.input_columns, *[c for c in id_columns if c not in plan.input_columns]],
+        filter=row_filter,
+        batch_size=cfg.batch_rows,
+    )
+    out_schema = pa.schema(
+        [
+            pa.field(c, pa.date32() if c == "date" else dataset.schema.field(c).type)
+            for c in id_columns
+        ]
+        + [pa.field(PREDICTION_COL, pa.float32())]
+    )
+    partitioning = (
+        ds.partitioning(pa.schema([("date", pa.date32())]), flavor="hive")
+        if "date" in id_columns
+        else None
+    )
+    ds.write_dataset(
+        score_batches(predictor, plan, batches, cfg.batch_rows, num_threads or cfg.num_threads, id_columns),
+        output_dir,
+        schema=out_schema,
+        format="parquet",
+        partitioning=partitioning,
+        existing_data_behavior="delete_matching",
+    )
+    return output_dir
@@ -0,0 +1,468 @@
+"""Low-latency HTTP prediction service with request micro-batching.
+
+A small stdlib ``asyncio`` HTTP/1.1 server (keep-alive, JSON bodies)
+around the current model:
+
+* ``POST /predict`` — ``{"rows": [{feature: value, ...}, ...]}`` or a
+  single row object; returns ``{"predictions": [...]}``.  Rows use the
+  raw feature columns (e.g. ``"supermarket": "Tesco"``) or the model's
+  own (one-hot) feature names.
+* ``GET /metrics`` — request count, p50/p99 latency, queue depth and
+  batch-size statistics.
+* ``GET /health``
+
+Concurrent requests are coalesced by :class:`MicroBatcher` into one
+``predict`` call per time/size window, run in a worker thread so the
+event loop keeps accepting requests.  :func:`run_load_test` is a
+matching keep-alive load generator.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+
+from pricepoint.config import Settings
+from pricepoint.registry import load_current_model
+from pricepoint.scoring import ColumnPlan, build_column_plan
+
+logger = logging.getLogger(__name__)
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+# ---------------------------------------------------------------------------
+# Request → feature vector
+# ---------------------------------------------------------------------------
+
+
+def service_column_plan(
+    feature_names: list[str],
+    categorical_columns: list[str],
+    categories: dict[str, list[str]] | None = None,
+) -> ColumnPlan:
+    """Column plan for JSON rows keyed by raw feature columns."""
+    import pyarrow as pa
+
+    fields = [pa.field(c, pa.string()) for c in categorical_columns]
+    fields += [
+        pa.field(name, pa.float64())
+        for name in feature_names
+        if name not in categorical_columns
+        and not any(name.startswith(f"{c}_") for c in categorical_columns)
+    ]
+    return build_column_plan(feature_names, pa.schema(fields), categories)
+
+
+def vector_from_record(plan: ColumnPlan, record: dict[str, Any], out: np.ndarray) -> np.ndarray:
+    """Fill ``out`` with one JSON row; model feature names are accepted as-is."""
+    for j, (name, (kind, col, arg)) in enumerate(zip(plan.feature_names, plan.sources)):
+        if kind == "category":
+            value = record.get(col)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                value = arg.index(value) if value in arg else np.nan
+        elif name in record:
+            value = record[name]
+        elif kind == "missing" or col not in record:
+            value = 0.0 if kind in ("missing", "onehot") else np.nan
+        elif kind == "onehot":
+            value = float(record[col] == arg)
+        else:
+            value = record[col]
+        out[j] = np.nan if value is None else value
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Micro-batching
+# ---------------------------------------------------------------------------
+
+
+class MicroBatcher:
+    """Coalesce single-row predictions into batched ``predict`` calls.
+
+    A batch is dispatched once ``max_batch_size`` rows are queued or
+    ``max_wait_ms`` after its first row arrived.  Up to ``workers``
+    batches run concurrently in a thread pool; rows keep queuing (and
+    the next batch grows) while they do.
+
+    Parameters
+    ----------
+    predictor
+        Object with ``predict(X) -> array``.
+    max_batch_size : int
+        Largest batch sent to the model.
+    max_wait_ms : float
+        Longest time the first row of a batch waits for company.
+    workers : int
+        Concurrent prediction threads.
+    predict_kwargs : dict, optional
+        Extra keyword arguments for ``predict`` (e.g. ``num_threads``).
+    metrics_window : int
+        Number of recent requests kept for latency percentiles.
+    """
+
+    def __init__(
+        self,
+        predictor,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        workers: int = 1,
+        predict_kwargs: dict[str, Any] | None = None,
+        metrics_window: int = 10_000,
+    ) -> None:
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.predict_kwargs = predict_kwargs or {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="predict")
+        self._slots = asyncio.Semaphore(workers)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+        self._in_flight = 0
+        self.latencies_ms: deque[float] = deque(maxlen=metrics_window)
+        self.batch_sizes: deque[int] = deque(maxlen=metrics_window)
+        self.requests = 0
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+
+    async def predict(self, row: np.ndarray) -> float:
+        """Queue one feature vector and wait for its prediction."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future, time.perf_counter()))
+        return await future
+
+    @property
+    def queue_depth(self) -> int:
+        """Rows waiting for, or inside, a prediction call."""
+        return self._queue.qsize() + self._in_flight
+
+    async def _collect(self) -> list[tuple]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            await self._slots.acquire()
+            self._in_flight += len(batch)
+            asyncio.get_running_loop().create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch: list[tuple]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            X = np.stack([row for row, _, _ in batch])
+            preds = await loop.run_in_executor(
+                self._executor, lambda: self.predictor.predict(X, **self.predict_kwargs)
+            )
+        except Exception as exc:  # noqa: BLE001 — surfaced to every waiting request
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            now = time.perf_counter()
+            for (_, future, queued_at), pred in zip(batch, preds):
+                if not future.done():
+                    future.set_result(float(pred))
+                self.latencies_ms.append((now - queued_at) * 1000)
+            self.requests += len(batch)
+            self.batch_sizes.append(len(batch))
+        finally:
+            self._in_flight -= len(batch)
+            self._slots.release()
+
+    def metrics(self) -> dict[str, Any]:
+        lat = np.fromiter(self.latencies_ms, dtype=float)
+        sizes = np.fromiter(self.batch_sizes, dtype=float)
+        return {
+            "requests": self.requests,
+            "queue_depth": self.queue_depth,
+            "p50_ms": round(float(np.percentile(lat, 50)), 3) if len(lat) else None,
+            "p99_ms": round(float(np.percentile(lat, 99)), 3) if len(lat) else None,
+            "batches": len(sizes),
+            "mean_batch_size": round(float(sizes.mean()), 2) if len(sizes) else None,
+            "max_batch_size": int(sizes.max()) if len(sizes) else None,
+        }
+
+
+# ---------------------------------------------------------------------------
+# HTTP server
+# ---------------------------------------------------------------------------
+
+
+class PredictionService:
+    """Minimal asyncio HTTP/1.1 front end for a :class:`MicroBatcher`."""
+
+    def __init__(self, batcher: MicroBatcher, plan: ColumnPlan, model_version: str | None = None) -> None:
+        self.batcher = batcher
+        self.plan = plan
+        self.model_version = model_version
+        self._server: asyncio.base_events.Server | None = None
+
+    async def start(self, host: str, port: int) -> int:
+        """Start listening; returns the bound port (useful with ``port=0``)."""
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        bound = self._server.sockets[0].getsockname()[1]
+        logger.info("Prediction service listening on http://%s:%s", host, bound)
+        return bound
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple[int, dict[str, Any]]:
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok", "model_version": self.model_version}
+        if method == "GET" and path == "/metrics":
+            return 200, self.batcher.metrics()
+        if method != "POST" or path != "/predict":
+            return 404, {"error": f"No route for {method} {path}"}
+
+        try:
+            payload = json.loads(body)
+            records = payload["rows"] if isinstance(payload, dict) and "rows" in payload else [payload]
+            if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+                raise TypeError("expected a JSON object or {\"rows\": [object, ...]}")
+            n_features = len(self.plan.feature_names)
+            rows = [vector_from_record(self.plan, r, np.empty(n_features)) for r in records]
+        except (ValueError, TypeError, KeyError) as exc:
+            return 400, {"error": f"Invalid request: {exc}"}
+        try:
+            preds = await asyncio.gather(*(self.batcher.predict(row) for row in rows))
+        except Exception as exc:
+            logger.exception("Prediction failed")
+            return 500, {"error": str(exc)}
+        # JSON has no NaN/Infinity: non-finite predictions are sent as null.
+        preds = [p if math.isfinite(p) else None for p in preds]
+        return 200, {"predictions": preds, "model_version": self.model_version}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self._route(method, path, body)
+                data = json.dumps(payload, allow_nan=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def _model_and_plan(settings: Settings) -> tuple[Any, dict[str, Any], ColumnPlan]:
+    predictor, schema = load_current_model(settings)
+    plan = service_column_plan(
+        schema["feature_names"], settings.training.categorical_features, schema.get("categories")
+    )
+    return predictor, schema, plan
+
+
+def build_service(settings: Settings) -> PredictionService:
+    """Load the current model and wire up batcher and HTTP front end."""
+    cfg = settings.service
+    predictor, schema, plan = _model_and_plan(settings)
+    batcher = MicroBatcher(
+        predictor,
+        max_batch_size=cfg.max_batch_size,
+        max_wait_ms=cfg.max_wait_ms,
+        workers=cfg.workers,
+        predict_kwargs={"num_threads": cfg.lgbm_threads} if cfg.lgbm_threads else None,
+        metrics_window=cfg.metrics_window,
+    )
+    return PredictionService(batcher, plan, schema.get("version"))
+
+
+def run_service(settings: Settings) -> None:
+    """Serve predictions until interrupted."""
+
+    async def _serve() -> None:
+        service = build_service(settings)
+        await service.start(settings.service.host, settings.service.port)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await service.stop()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        logger.info("Prediction service stopped.")
+
+
+# ---------------------------------------------------------------------------
+# Load generator
+# ---------------------------------------------------------------------------
+
+
+async def _client(
+    host: str,
+    port: int,
+    bodies: list[bytes],
+    n_requests: int,
+    latencies: list[float],
+    errors: list[int],
+) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(n_requests):
+            body = bodies[i % len(bodies)]
+            start = time.perf_counter()
+            writer.write(
+                f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+            status = int((await reader.readline()).split(b" ", 2)[1])
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            if status != 200:
+                errors.append(status)
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        writer.close()
+
+
+async def _get_json(host: str, port: int, path: str) -> dict[str, Any]:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+def sample_records(settings: Settings, plan: ColumnPlan, n: int = 256) -> list[dict[str, Any]]:
+    """Realistic request rows taken from the feature data (or all-ones rows)."""
+    import pyarrow.parquet as pq
+
+    feature_path = settings.data.processed_dir / settings.features.output_filename
+    if not feature_path.exists():
+        return [{name: 1.0 for name in plan.feature_names}]
+    pf = pq.ParquetFile(feature_path)
+    table = pf.read_row_group(pf.num_row_groups - 1, columns=plan.input_columns).slice(0, n)
+    return json.loads(table.to_pandas().to_json(orient="records"))
+
+
+async def load_test(
+    host: str,
+    port: int,
+    records: list[dict[str, Any]],
+    n_requests: int,
+    concurrency: int,
+    rows_per_request: int = 1,
+) -> dict[str, Any]:
+    """Drive ``/predict`` from ``concurrency`` keep-alive connections.
+
+    Returns
+    -------
+    dict
+        Client-side throughput and latency, plus the server's ``/metrics``.
+    """
+    bodies = [
+        json.dumps({"rows": records[i:i + rows_per_request]}).encode("utf-8")
+        for i in range(0, max(1, len(records) - rows_per_request + 1), rows_per_request)
+    ]
+    per_client = max(1, n_requests // concurrency)
+    latencies: list[float] = []
+    errors: list[int] = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(_client(host, port, bodies, per_client, latencies, errors) for _ in range(concurrency))
+    )
+    if errors:
+        logger.warning("%s of %s requests failed (HTTP %s)", len(errors), per_client * concurrency,
+                       sorted(set(errors)))
+    elapsed = time.perf_counter() - start
+    lat = np.asarray(latencies)
+    return {
+        "requests": len(lat),
+        "errors": len(errors),
+        "concurrency": concurrency,
+        "rows_per_request": rows_per_request,
+        "requests_per_s": round(len(lat) / elapsed, 1),
+        "client_p50_ms": round(float(np.percentile(lat, 50)), 3) if len(lat) else None,
+        "client_p99_ms": round(float(np.percentile(lat, 99)), 3) if len(lat) else None,
+        "server": await _get_json(host, port, "/metrics"),
+    }
+
+
+def run_load_test(
+    settings: Settings,
+    n_requests: int = 5000,
+    concurrency: int = 32,
+    rows_per_request: int = 1,
+    host: str | None = None,
+    port: int | None = None,
+) -> dict[str, Any]:
+    """Load-test a running service, or an in-process one when ``host`` is omitted."""
+
+    async def _main() -> dict[str, Any]:
+        if host is not None:
+            _, _, plan = _model_and_plan(settings)
+            records = sample_records(settings, plan)
+            return await load_test(
+                host, port or settings.service.port, records, n_requests, concurrency, rows_per_request
+            )
+
+        service = build_service(settings)
+        bound = await service.start("127.0.0.1", 0)
+        try:
+            records = sample_records(settings, service.plan)
+            return await load_test("127.0.0.1", bound, records, n_requests, concurrency, rows_per_request)
+        finally:
+            await service.stop()
+
+    result = asyncio.run(_main())
+    logger.info("Load test: %s", result)
+    return result
@@ -0,0 +1,387 @@
+"""Content-addressed caching of pipeline stages.
+
+Each stage is fingerprinted from its input artifacts, the ``Settings``
+sub-configs it depends on and the source of the modules that implement
+it.  The fingerprint is written to a ``<output>.manifest.json`` file next
+to every output; when all manifests match the current fingerprint the
+stage is skipped.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import importlib.util
+import json
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pricepoint import __version__
+from pricepoint.config import PROJECT_ROOT, Settings
+
+logger = logging.getLogger(__name__)
+
+_HASH_CHUNK_BYTES = 1 << 20
+
+
+@dataclass(frozen=True)
+class Stage:
+    """Description of a cacheable pipeline stage."""
+
+    name: str
+    inputs: list[Path]
+    outputs: list[Path]
+    configs: tuple[Any, ...] = ()
+    modules: tuple[str, ...] = ()
+    extra: dict[str, Any] = field(default_factory=dict)
+
+
+# ---------------------------------------------------------------------------
+# Fingerprinting
+# ---------------------------------------------------------------------------
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert config values to a stable JSON-serialisable form."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: _jsonable(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    if isinstance(value, Path):
+        try:
+            return value.resolve().relative_to(PROJECT_ROOT).as_posix()
+        except ValueError:
+            return value.as_posix()
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def _digest(obj: Any) -> str:
+    payload = json.dumps(obj, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def fingerprint_file(path: Path, hash_contents: bool = False) -> dict[str, Any]:
+    """Fingerprint a single input file.
+
+    Uses size and modification time, plus row-group statistics from the
+    footer for Parquet files.  With ``hash_contents`` the full file is
+    hashed instead of relying on the modification time.
+    """
+    stat = path.stat()
+    fp: dict[str, Any] = {"size": stat.st_size}
+
+    if hash_contents:
+        sha = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(_HASH_CHUNK_BYTES), b""):
+                sha.update(chunk)
+        fp["sha256"] = sha.hexdigest()
+    else:
+        fp["mtime_ns"] = stat.st_mtime_ns
+
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        meta = pq.read_metadata(path)
+        fp["num_rows"] = meta.num_rows
+        fp["row_groups"] = [
+            [meta.row_group(i).num_rows, meta.row_group(i).total_byte_size]
+            for i in range(meta.num_row_groups)
+        ]
+    return fp
+
+
+def fingerprint_path(path: Path, hash_contents: bool = False) -> dict[str, Any] | None:
+    """Fingerprint a file or every file below a directory (``None`` if missing)."""
+    if path.is_file():
+        return fingerprint_file(path, hash_contents)
+    if path.is_dir():
+        return {
+            p.relative_to(path).as_posix(): fingerprint_file(p, hash_contents)
+            for p in sorted(path.rglob("*"))
+            if p.is_file() and not p.name.endswith(".manifest.json")
+        }
+    return None
+
+
+def code_version(modules: tuple[str, ...]) -> str:
+    """Hash the package version and the source of the given modules."""
+    sha = hashlib.sha256(__version__.encode("utf-8"))
+    for name in sorted(modules):
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.origin is None:
+            continue
+        sha.update(Path(spec.origin).read_bytes())
+    return sha.hexdigest()
+
+
+def stage_fingerprint(stage: Stage, hash_inputs: bool = False) -> dict[str, Any]:
+    """Compute the full fingerprint of a stage."""
+    return {
+        "inputs": {
+            _jsonable(p): fingerprint_path(p, hash_inputs) for p in stage.inputs
+        },
+        "config": _digest(_jsonable(list(stage.configs))),
+        "code": code_version(stage.modules),
+        "extra": _jsonable(stage.extra),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Manifests
+# ---------------------------------------------------------------------------
+
+
+def manifest_path(output: Path) -> Path:
+    """Manifest location for an output file or directory."""
+    return output.parent / f"{output.name}.manifest.json"
+
+
+def is_up_to_date(stage: Stage, fingerprint: dict[str, Any]) -> bool:
+    """Whether every output exists with a manifest matching ``fingerprint``."""
+    if any(fp is None for fp in fingerprint["inputs"].values()):
+        return False
+
+    digest = _digest(fingerprint)
+    for output in stage.outputs:
+        manifest = manifest_path(output)
+        if not output.exists() or not manifest.exists():
+            return False
+        try:
+            with open(manifest, "r", encoding="utf-8") as fh:
+                recorded = json.load(fh)
+        except (OSError, json.JSONDecodeError):
+            return False
+        if recorded.get("digest") != digest:
+            return False
+    return True
+
+
+def write_manifests(stage: Stage, fingerprint: dict[str, Any]) -> None:
+    """Record the stage fingerprint next to each of its outputs."""
+    record = {
+        "stage": stage.name,
+        "digest": _digest(fingerprint),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "fingerprint": fingerprint,
+    }
+    for output in stage.outputs:
+        if not output.exists():
+            logger.warning("Stage '%s' did not produce %s; no manifest written.", stage.name, output)
+            continue
+        with open(manifest_path(output), "w", encoding="utf-8") as fh:
+            json.dump(record, fh, indent=2)
+
+
+def run_stage(
+    stage: Stage,
+    fn: Callable[[], Any],
+    enabled: bool = True,
+    hash_inputs: bool = False,
+    force: bool = False,
+) -> Any:
+    """Run ``fn`` unless the stage's outputs are already up to date.
+
+    Parameters
+    ----------
+    stage : Stage
+        Stage description.
+    fn : callable
+        Zero-argument callable that computes the stage.
+    enabled : bool
+        When ``False`` the stage always runs and no manifests are written.
+    hash_inputs : bool
+        Hash input contents instead of using modification times.
+    force : bool
+        Recompute even when the stage is up to date.
+
+    Returns
+    -------
+    Any
+        The result of ``fn``, or the first output path if skipped.
+    """
+    if not enabled:
+        return fn()
+
+    # Fingerprint before running so inputs modified mid-run invalidate the cache.
+    fingerprint = stage_fingerprint(stage, hash_inputs)
+    if not force and is_up_to_date(stage, fingerprint):
+        logger.info("Stage '%s' is up to date — skipping. ✓", stage.name)
+        return stage.outputs[0]
+
+    result = fn()
+    write_manifests(stage, fingerprint)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Pipeline stage definitions
+# ---------------------------------------------------------------------------
+
+
+def pipeline_stages(settings: Settings) -> dict[str, Stage]:
+    """Describe the inputs, outputs and dependencies of each CLI stage."""
+    data = settings.data
+    interim_path = data.interim_dir / "cleaned_supermarket_data.parquet"
+    canonical_path = data.processed_dir / settings.matching.output_filename
+    feature_path = data.processed_dir / settings.features.output_filename
+    md_dir = settings.market_dynamics.output_dir
+    # Model consumers load the registry's current version when there is one,
+    # so its pointer is an input: a promote or rollback invalidates them.
+    registry_pointer = settings.model.registry_dir / "current.json"
+    model_inputs = [
+        p
+        for p in (settings.model.model_path, settings.model.native_model_path, registry_pointer)
+        if p.exists()
+    ]
+
+    return {
+        "ingest": Stage(
+            name="ingest",
+            inputs=[data.raw_dir / f for f in data.raw_files if (data.raw_dir / f).exists()],
+            outputs=[interim_path],
+            configs=(data,),
+            modules=("pricepoint.data_ingestion", "pricepoint.schemas"),
+        ),
+        "match": Stage(
+            name="match",
+            inputs=[interim_path],
+            outputs=[canonical_path],
+            configs=(settings.matching,),
+            modules=("pricepoint.product_matching",),
+        ),
+        "features": Stage(
+            name="features",
+            inputs=[canonical_path],
+            outputs=[feature_path],
+            configs=(settings.features,),
+            modules=("pricepoint.feature_engineering",),
+        ),
+        # Both trainers register into the same registry; recording each in
+        # the pointer's manifest makes switching between them rerun training.
+        "train": Stage(
+            name="train",
+            inputs=[feature_path],
+            outputs=[
+                settings.model.native_model_path
+                if settings.training.native_categorical
+                else settings.model.model_path,
+                registry_pointer,
+            ],
+            configs=(settings.model, settings.training),
+            modules=("pricepoint.training",),
+        ),
+        "train_streaming": Stage(
+            name="train_streaming",
+            inputs=[feature_path],
+            outputs=[settings.model.native_model_path, registry_pointer],
+            configs=(settings.model, settings.training),
+            modules=("pricepoint.training", "pricepoint.streaming"),
+        ),
+        "anomaly": Stage(
+            name="anomaly",
+            # Events only label the flagged rows, so the stage is cacheable without them.
+            inputs=[feature_path, *[p for p in (md_dir / "price_events.parquet",) if p.exists()]],
+            outputs=[data.processed_dir / "anomalies_flagged.parquet"],
+            configs=(settings.anomaly,),
+            modules=("pricepoint.anomaly", "pricepoint.price_events"),
+        ),
+        "hhi": Stage(
+            name="hhi",
+            inputs=[canonical_path],
+            outputs=[md_dir / "hhi_index.parquet"],
+            modules=("pricepoint.market_analysis",),
+        ),
+        "cube": Stage(
+            name="cube",
+            inputs=[canonical_path],
+            outputs=[settings.price_cube.output_dir],
+            configs=(settings.price_cube,),
+            modules=("pricepoint.price_tensor",),
+        ),
+        "precompute": Stage(
+            name="precompute",
+            # The cube is rebuilt from the canonical table when stale, so that
+            # table and the cube settings stand in for the cube directory.
+            inputs=[canonical_path, feature_path, *model_inputs],
+            outputs=[
+                md_dir / "market_dispersion.parquet",
+                md_dir / "price_leadership.parquet",
+                md_dir / "leadership_timeline.parquet",
+                md_dir / "hhi_index.parquet",
+                md_dir / "market_metrics.parquet",
+                md_dir / "price_events.parquet",
+                settings.shap.output_dir,
+            ],
+            configs=(
+                settings.market_dynamics,
+                settings.price_cube,
+                settings.price_events,
+                settings.shap,
+                settings.precompute,
+            ),
+            modules=(
+                "pricepoint.market_analysis",
+                "pricepoint.market_incremental",
+                "pricepoint.price_events",
+                "pricepoint.price_tensor",
+                "pricepoint.explain",
+            ),
+        ),
+        # Shares market_dispersion.parquet with "precompute": each records its
+        # own manifest there, so switching modes recomputes dispersion.
+        "precompute_incremental": Stage(
+            name="precompute_incremental",
+            inputs=[canonical_path],
+            outputs=[
+                md_dir / "market_dispersion.parquet",
+                md_dir / "price_leadership_window.parquet",
+            ],
+            configs=(settings.market_dynamics, settings.price_cube),
+            modules=(
+                "pricepoint.market_analysis",
+                "pricepoint.market_incremental",
+                "pricepoint.price_tensor",
+            ),
+        ),
+        "shap_interactions": Stage(
+            name="shap_interactions",
+            inputs=[
+                settings.shap.output_dir / "shap_sample_data.parquet",
+                settings.shap.output_dir / "shap_summary.parquet",
+                *model_inputs,
+            ],
+            outputs=[
+                settings.shap.output_dir / "shap_interactions.npz",
+                settings.shap.output_dir / "shap_interaction_pairs.parquet",
+            ],
+            configs=(settings.shap,),
+            modules=("pricepoint.market_analysis", "pricepoint.explain"),
+        ),
+    }
+
+
+def is_stage_current(settings: Settings, name: str) -> bool:
+    """Whether a named pipeline stage's outputs are up to date (never, with caching disabled)."""
+    if not settings.cache.enabled:
+        return False
+    stage = pipeline_stages(settings)[name]
+    return is_up_to_date(stage, stage_fingerprint(stage, settings.cache.hash_inputs))
+
+
+def run_cached(settings: Settings, name: str, fn: Callable[[], Any], force: bool = False) -> Any:
+    """Run a named pipeline stage through the stage cache."""
+    stage = pipeline_stages(settings)[name]
+    return run_stage(
+        stage,
+        fn,
+        enabled=settings.cache.enabled,
+        hash_inputs=settings.cache.hash_inputs,
+        force=force,
+    )
@@ -0,0 +1,258 @@
+"""Out-of-core training directly from (partitioned) Parquet.
+
+Streams only the model's feature columns and the target through Arrow
+record batches, with the date cutoff pushed down as a Parquet filter.
+Each split is spilled once into a float32 memory-mapped matrix that
+LightGBM consumes through an ``lgb.Sequence``, so bins are built from a
+row sample and the Dataset is pushed in batches — peak memory is the
+binned Dataset plus one record batch, not the raw feature table.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any
+
+import lightgbm as lgb
+import numpy as np
+
+from pricepoint.config import Settings
+from pricepoint.training import (
+    TARGET_COL,
+    booster_metrics,
+    dataset_params,
+    encode_categorical,
+    native_feature_columns,
+    save_native_model,
+    train_booster,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _open_dataset(path: Path):
+    import pyarrow.dataset as ds
+
+    return ds.dataset(path, format="parquet", partitioning="hive")
+
+
+def _column_kinds(schema) -> dict[str, str]:
+    import pyarrow.types as pat
+
+    return {
+        field.name: "numeric"
+        if pat.is_integer(field.type) or pat.is_floating(field.type) or pat.is_boolean(field.type)
+        else "other"
+        for field in schema
+    }
+
+
+def _stream_categories(dataset, columns: list[str], batch_rows: int) -> dict[str, list[str]]:
+    """Collect the category vocabulary of each column in one streaming pass."""
+    import pyarrow.compute as pc
+
+    seen: dict[str, set[str]] = {col: set() for col in columns}
+    if not columns:
+        return {}
+    for batch in dataset.to_batches(columns=columns, batch_size=batch_rows):
+        for col in columns:
+            values = pc.unique(batch.column(col).cast("string")).drop_null()
+            seen[col].update(values.to_pylist())
+    return {col: sorted(values) for col, values in seen.items()}
+
+
+def _max_date(dataset, batch_rows: int):
+    import pyarrow.compute as pc
+
+    latest = None
+    for batch in dataset.to_batches(columns=["date"], batch_size=batch_rows):
+        value = pc.max(batch.column("date")).as_py()
+        if value is not None and (latest is None or value > latest):
+            latest = value
+    return latest
+
+
+class _MemmapSequence(lgb.Sequence):
+    """``lgb.Sequence`` view over a memory-mapped feature matrix."""
+
+    def __init__(self, array: np.ndarray, batch_size: int) -> None:
+        self.array = array
+        self.batch_size = batch_size
+
+    def __getitem__(self, idx):
+        # Single rows feed bin sampling, which LightGBM requires as float64;
+        # batch slices are pushed as float32 directly.
+        if isinstance(idx, slice):
+            return self.array[idx]
+        return np.asarray(self.array[idx], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+
+def spill_split(
+    dataset,
+    filter_expr,
+    feature_names: list[str],
+    categories: dict[str, list[str]],
+    spill_path: Path,
+    batch_rows: int,
+) -> tuple[np.memmap, np.ndarray]:
+    """Stream one split into a float32 memmap and an in-memory label vector.
+
+    Parameters
+    ----------
+    dataset : pyarrow.dataset.Dataset
+        Feature data.
+    filter_expr : pyarrow.compute.Expression
+        Row filter pushed down to the Parquet scan.
+    feature_names : list[str]
+        Columns to read, in model order.
+    categories : dict
+        Category vocabulary for categorical columns.
+    spill_path : Path
+        File backing the memory-mapped matrix.
+    batch_rows : int
+        Record batch size.
+
+    Returns
+    -------
+    tuple
+        (features memmap, labels)
+    """
+    import pyarrow.compute as pc
+
+    n_rows = dataset.count_rows(filter=filter_expr)
+    spill_path.parent.mkdir(parents=True, exist_ok=True)
+    X = np.lib.format.open_memmap(
+        spill_path, mode="w+", dtype=np.float32, shape=(n_rows, len(feature_names))
+    )
+    y = np.empty(n_rows, dtype=np.float32)
+
+    offset = 0
+    for batch in dataset.to_batches(
+        columns=[*feature_names, TARGET_COL], filter=filter_expr, batch_size=batch_rows
+    ):
+        n = batch.num_rows
+        if not n:
+            continue
+        for j, col in enumerate(feature_names):
+            column = batch.column(col)
+            if col in categories:
+                X[offset:offset + n, j] = encode_categorical(
+                    column.to_pandas(), categories[col]
+                )
+            else:
+                X[offset:offset + n, j] = pc.cast(column, "float32").to_numpy(zero_copy_only=False)
+        y[offset:offset + n] = pc.cast(batch.column(TARGET_COL), "float32").to_numpy(
+            zero_copy_only=False
+        )
+        offset += n
+
+    X.flush()
+    logger.info("Spilled %s rows to %s", f"{offset:,}", spill_path)
+    return X, y
+
+
+def build_streaming_datasets(
+    feature_path: Path,
+    categorical_features: list[str],
+    lgbm_params: dict[str, Any],
+    test_days: int,
+    spill_dir: Path,
+    batch_rows: int,
+):
+    """Build train/validation Datasets from Parquet without loading it into pandas.
+
+    Returns
+    -------
+    tuple
+        (train_set, valid_set, schema) where ``schema`` matches
+        :attr:`pricepoint.training.NativeDataset.schema`.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset = _open_dataset(feature_path)
+    feature_names = native_feature_columns(_column_kinds(dataset.schema), categorical_features)
+    categorical = [c for c in categorical_features if c in feature_names]
+    categories = _stream_categories(dataset, categorical, batch_rows)
+
+    date_type = dataset.schema.field("date").type
+    latest = _max_date(dataset, batch_rows)
+    cutoff = pa.scalar(np.datetime64(latest) - np.timedelta64(test_days, "D")).cast(date_type)
+    has_target = ds.field(TARGET_COL).is_valid()
+    filters = {
+        "train": has_target & (ds.field("date") <= cutoff),
+        "valid": has_target & (ds.field("date") > cutoff),
+    }
+    logger.info(
+        "Streaming %s features (%s categorical) from %s, cutoff %s …",
+        len(feature_names),
+        len(categorical),
+        feature_path,
+        cutoff,
+    )
+
+    params = dataset_params(lgbm_params)
+    datasets = {}
+    spill_paths = []
+    for split, expr in filters.items():
+        spill_path = spill_dir / f"{split}_features.npy"
+        X, y = spill_split(dataset, expr, feature_names, categories, spill_path, batch_rows)
+        spill_paths.append(spill_path)
+        datasets[split] = lgb.Dataset(
+            _MemmapSequence(X, batch_rows),
+            label=y,
+            feature_name=feature_names,
+            categorical_feature=categorical,
+            params=params,
+            reference=datasets.get("train"),
+            free_raw_data=True,
+        ).construct()
+        logger.info("%s Dataset: %s rows", split.capitalize(), f"{datasets[split].num_data():,}")
+        del X
+
+    for path in spill_paths:
+        path.unlink(missing_ok=True)
+
+    schema = {
+        "feature_names": feature_names,
+        "categorical_features": categorical,
+        "categories": categories,
+    }
+    return datasets["train"], datasets["valid"], schema
+
+
+def run_streaming_training(settings: Settings) -> Path:
+    """Train on the full feature history out of core.
+
+    Parameters
+    ----------
+    settings : Settings
+        Application settings.
+
+    Returns
+    -------
+    Path
+        Path to the saved model artifact.
+    """
+    feature_path = settings.data.processed_dir / settings.features.output_filename
+    if not feature_path.exists():
+        raise FileNotFoundError(
+            f"Feature data not found at {feature_path}. Run feature engineering first."
+        )
+
+    cfg = settings.training
+    train_set, valid_set, schema = build_streaming_datasets(
+        feature_path,
+        cfg.categorical_features,
+        settings.model.lgbm_params,
+        cfg.test_days,
+        cfg.dataset_cache_dir / "spill",
+        cfg.stream_batch_rows,
+    )
+    booster, evals = train_booster(train_set, valid_set, settings.model.lgbm_params)
+    metrics = booster_metrics(evals, valid_set)
+    return save_native_model(settings, booster, schema, metrics)
@@ -1,13 +1,22 @@
 """LightGBM model training pipeline.
 
 Handles train/test splitting, model fitting, evaluation, and artifact
-serialization.
+serialization.  Two data paths are available:
+
+* the default one-hot path (:func:`prepare_training_data`), which fits an
+  sklearn ``LGBMRegressor``;
+* a native categorical path (:func:`load_or_build_dataset`), which encodes
+  categoricals as integer codes, bins the data once into an
+  ``lgb.Dataset`` cached with ``save_binary`` and trains a ``Booster``.
 """
 
 from __future__ import annotations
 
+import json
 import logging
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 import joblib
 import numpy as np
@@ -18,9 +27,25 @@ from pricepoint.config import Settings
 
 logger = logging.getLogger(__name__)
 
+TARGET_COL = "prices"
+NON_FEATURE_COLS = [TARGET_COL, "date", "product_name", "canonical_name", "normalised_name"]
+
+# LightGBM parameters that change how a Dataset is binned.  Only these
+# invalidate the cached binary Dataset; everything else is a training knob.
+_DATASET_PARAM_KEYS = (
+    "max_bin",
+    "max_bin_by_feature",
+    "min_data_in_bin",
+    "bin_construct_sample_cnt",
+    "use_missing",
+    "zero_as_missing",
+    "data_random_seed",
+)
+
 
 def prepare_training_data(
     df: pd.DataFrame,
+    test_days: int = 7,
 ) -> tuple[pd.DataFrame, pd.Series, pd.DataFrame, pd.Series]:
     """Prepare train/test splits using time-series strategy.
 
@@ -31,6 +56,8 @@ def prepare_training_data(
     ----------
     df : pd.DataFrame
         Feature-engineered data.
+    test_days : int
+        Number of trailing days held out as the test set.
 
     Returns
     -------
@@ -41,7 +68,7 @@ def prepare_training_data(
 
     df = df.copy()
     df["date"] = pd.to_datetime(df["date"])
-    cutoff = df["date"].max() - pd.Timedelta(days=7)
+    cutoff = df["date"].max() - pd.Timedelta(days=test_days)
 
     train = df[df["date"] <= cutoff]
     test = df[df["date"] > cutoff]
@@ -49,9 +76,8 @@ def prepare_training_data(
     logger.info("Train: %s rows, Test: %s rows", f"{len(train):,}", f"{len(test):,}")
 
     # Separate target
-    target_col = "prices"
-    drop_cols = [target_col, "date", "product_name", "canonical_name", "normalised_name"]
-    drop_cols = [c for c in drop_cols if c in train.columns]
+    target_col = TARGET_COL
+    drop_cols = [c for c in NON_FEATURE_COLS if c in train.columns]
 
     # One-hot encode categoricals
     cat_cols = train.select_dtypes(include=["object", "category"]).columns.tolist()
@@ -140,6 +166,348 @@ def evaluate_model(
     return metrics
 
 
+# ---------------------------------------------------------------------------
+# Native categorical path with a cached binary Dataset
+# ---------------------------------------------------------------------------
+
+
+def category_vocabulary(df: pd.DataFrame, columns: list[str]) -> dict[str, list[str]]:
+    """Sorted category values per column, used as the integer code mapping."""
+    return {col: sorted(df[col].dropna().astype(str).unique().tolist()) for col in columns}
+
+
+def encode_categorical(values: pd.Series, vocabulary: list[str]) -> np.ndarray:
+    """Encode a column as float32 category codes (NaN for missing/unseen values)."""
+    codes = pd.Index(vocabulary, dtype=object).get_indexer(values.astype(str))
+    out = codes.astype(np.float32)
+    out[(codes < 0) | values.isna().to_numpy()] = np.nan
+    return out
+
+
+def dataset_params(lgbm_params: dict[str, Any]) -> dict[str, Any]:
+    """Dataset-construction parameters derived from the model params.
+
+    ``feature_pre_filter`` is disabled so a cached Dataset can be reused
+    with any ``min_child_samples``.
+    """
+    params = {k: lgbm_params[k] for k in _DATASET_PARAM_KEYS if k in lgbm_params}
+    params.update(feature_pre_filter=False, verbose=-1)
+    return params
+
+
+def model_feature_names(model) -> list[str]:
+    """Feature names of an sklearn ``LGBMRegressor`` or a native ``Booster``."""
+    if hasattr(model, "feature_name_"):
+        return list(model.feature_name_)
+    return list(model.feature_name())
+
+
+@dataclass
+class NativeDataset:
+    """A binned LightGBM Dataset plus the metadata needed to split and score it."""
+
+    dataset: Any
+    dates: np.ndarray
+    feature_names: list[str]
+    categorical_features: list[str]
+    categories: dict[str, list[str]]
+
+    @property
+    def schema(self) -> dict[str, Any]:
+        return {
+            "feature_names": self.feature_names,
+            "categorical_features": self.categorical_features,
+            "categories": self.categories,
+        }
+
+    def split(self, test_days: int = 7) -> tuple[Any, Any]:
+        """Hold out the trailing ``test_days`` as a validation subset.
+
+        Both subsets share the parent's bin mappers.
+        """
+        cutoff = self.dates.max() - np.timedelta64(test_days, "D")
+        train_idx = np.flatnonzero(self.dates <= cutoff).astype(np.int32)
+        valid_idx = np.flatnonzero(self.dates > cutoff).astype(np.int32)
+        logger.info("Train: %s rows, Test: %s rows", f"{len(train_idx):,}", f"{len(valid_idx):,}")
+        return self.dataset.subset(train_idx), self.dataset.subset(valid_idx)
+
+    def save(self, cache_dir: Path) -> None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        bin_path = cache_dir / "dataset.bin"
+        bin_path.unlink(missing_ok=True)
+        self.dataset.save_binary(str(bin_path))
+        np.save(cache_dir / "dates.npy", self.dates)
+        with open(cache_dir / "schema.json", "w", encoding="utf-8") as fh:
+            json.dump(self.schema, fh, indent=2)
+        logger.info("Cached binary Dataset to %s", bin_path)
+
+    @classmethod
+    def load(cls, cache_dir: Path, params: dict[str, Any]) -> NativeDataset:
+        import lightgbm as lgb
+
+        logger.info("Loading cached binary Dataset from %s …", cache_dir)
+        dataset = lgb.Dataset(str(cache_dir / "dataset.bin"), params=params).construct()
+        with open(cache_dir / "schema.json", "r", encoding="utf-8") as fh:
+            schema = json.load(fh)
+        return cls(
+            dataset=dataset,
+            dates=np.load(cache_dir / "dates.npy"),
+            feature_names=schema["feature_names"],
+            categorical_features=schema["categorical_features"],
+            categories=schema["categories"],
+        )
+
+
+def native_feature_columns(columns: dict[str, str], categorical: list[str]) -> list[str]:
+    """Select model features from a ``{column: kind}`` mapping.
+
+    ``kind`` is ``"numeric"`` or ``"other"``; categoricals are kept
+    regardless of kind, non-feature columns are dropped.
+    """
+    return [
+        col
+        for col, kind in columns.items()
+        if col not in NON_FEATURE_COLS
+        and not col.startswith("__")
+        and (col in categorical or kind == "numeric")
+    ]
+
+
+def build_native_dataset(
+    df: pd.DataFrame,
+    categorical_features: list[str],
+    params: dict[str, Any],
+) -> NativeDataset:
+    """Bin feature data into an ``lgb.Dataset`` with native categoricals.
+
+    Features are copied column by column into a single float32 matrix;
+    rows with a missing target are dropped, missing feature values are
+    left for LightGBM to handle.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Feature-engineered data (only feature, target and date columns are used).
+    categorical_features : list[str]
+        Columns to treat as LightGBM categorical features.
+    params : dict
+        Dataset parameters (see :func:`dataset_params`).
+
+    Returns
+    -------
+    NativeDataset
+        Constructed Dataset over all usable rows.
+    """
+    import lightgbm as lgb
+
+    kinds = {
+        col: "numeric" if pd.api.types.is_numeric_dtype(dtype) else "other"
+        for col, dtype in df.dtypes.items()
+    }
+    feature_names = native_feature_columns(kinds, categorical_features)
+    categorical = [c for c in categorical_features if c in feature_names]
+    categories = category_vocabulary(df, categorical)
+
+    mask = df[TARGET_COL].notna().to_numpy()
+    n_rows = int(mask.sum())
+    logger.info(
+        "Building native Dataset: %s rows × %s features (%s categorical) …",
+        f"{n_rows:,}",
+        len(feature_names),
+        len(categorical),
+    )
+
+    X = np.empty((n_rows, len(feature_names)), dtype=np.float32, order="F")
+    for j, col in enumerate(feature_names):
+        if col in categories:
+            X[:, j] = encode_categorical(df[col], categories[col])[mask]
+        else:
+            X[:, j] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)[mask]
+    y = df[TARGET_COL].to_numpy(dtype=np.float32)[mask]
+    dates = pd.to_datetime(df["date"]).to_numpy(dtype="datetime64[D]")[mask]
+
+    dataset = lgb.Dataset(
+        X,
+        label=y,
+        feature_name=feature_names,
+        categorical_feature=categorical,
+        params=params,
+        free_raw_data=True,
+    ).construct()
+
+    return NativeDataset(dataset, dates, feature_names, categorical, categories)
+
+
+def load_or_build_dataset(settings: Settings, force: bool = False) -> NativeDataset:
+    """Return the native training Dataset, rebuilding the binary cache if stale.
+
+    The cache is keyed on the feature file, the binning parameters and the
+    categorical feature list, so hyperparameter changes reuse it.
+    """
+    from pricepoint.stage_cache import (
+        Stage,
+        is_up_to_date,
+        stage_fingerprint,
+        write_manifests,
+    )
+
+    cfg = settings.training
+    feature_path = settings.data.processed_dir / settings.features.output_filename
+    if not feature_path.exists():
+        raise FileNotFoundError(
+            f"Feature data not found at {feature_path}. Run feature engineering first."
+        )
+
+    params = dataset_params(settings.model.lgbm_params)
+    cache_dir = cfg.dataset_cache_dir
+    stage = Stage(
+        name="lgb_dataset",
+        inputs=[feature_path],
+        outputs=[cache_dir / "dataset.bin", cache_dir / "dates.npy", cache_dir / "schema.json"],
+        configs=(cfg.categorical_features,),
+        modules=("pricepoint.training",),
+        extra={"params": params},
+    )
+    fingerprint = stage_fingerprint(stage, settings.cache.hash_inputs)
+    if settings.cache.enabled and not force and is_up_to_date(stage, fingerprint):
+        return NativeDataset.load(cache_dir, params)
+
+    import pyarrow.parquet as pq
+    import pyarrow.types as pat
+
+    schema = pq.read_schema(feature_path)
+    kinds = {
+        field.name: "numeric"
+        if pat.is_integer(field.type) or pat.is_floating(field.type) or pat.is_boolean(field.type)
+        else "other"
+        for field in schema
+    }
+    columns = native_feature_columns(kinds, cfg.categorical_features) + [TARGET_COL, "date"]
+
+    logger.info("Loading %s columns from %s …", len(columns), feature_path)
+    df = pd.read_parquet(feature_path, columns=columns, engine="pyarrow")
+    native = build_native_dataset(df, cfg.categorical_features, params)
+    del df
+
+    native.save(cache_dir)
+    write_manifests(stage, fingerprint)
+    return native
+
+
+def booster_params(lgbm_params: dict[str, Any]) -> tuple[dict[str, Any], int]:
+    """Split sklearn-style params into ``lgb.train`` params and a round count."""
+    params = dict(lgbm_params)
+    num_boost_round = int(params.pop("n_estimators", params.pop("num_iterations", 100)))
+    params["metric"] = ["l1", "rmse"]
+    params["feature_pre_filter"] = False
+    return params, num_boost_round
+
+
+def train_booster(
+    train_set,
+    valid_set,
+    lgbm_params: dict[str, Any],
+    callbacks: list | None = None,
+    init_model=None,
+    num_boost_round: int | None = None,
+):
+    """Train a native LightGBM Booster, recording validation metrics.
+
+    Parameters
+    ----------
+    train_set, valid_set : lightgbm.Dataset
+        Training and validation Datasets (sharing bin mappers).
+    lgbm_params : dict
+        LightGBM hyperparameters from config.
+    callbacks : list, optional
+        Extra ``lgb.train`` callbacks (e.g. early stopping).
+    init_model : Booster, optional
+        Model to continue boosting from.
+    num_boost_round : int, optional
+        Overrides ``n_estimators``.
+
+    Returns
+    -------
+    tuple
+        (booster, evals_result)
+    """
+    import lightgbm as lgb
+
+    params, rounds = booster_params(lgbm_params)
+    evals: dict[str, dict[str, list[float]]] = {}
+    logger.info("Training LightGBM Booster with params: %s", params)
+    booster = lgb.train(
+        params,
+        train_set,
+        num_boost_round=num_boost_round or rounds,
+        valid_sets=[valid_set],
+        valid_names=["valid"],
+        init_model=init_model,
+        callbacks=[lgb.record_evaluation(evals), *(callbacks or [])],
+    )
+    logger.info("Training complete. ✓")
+    return booster, evals
+
+
+def booster_metrics(evals: dict, valid_set, iteration: int | None = None) -> dict[str, float]:
+    """MAE, RMSE and R² from recorded validation metrics.
+
+    Parameters
+    ----------
+    evals : dict
+        ``evals_result`` from :func:`train_booster`.
+    valid_set : lightgbm.Dataset
+        The validation Dataset (used for the label variance in R²).
+    iteration : int, optional
+        1-based iteration to report (defaults to the last one).
+    """
+    idx = (iteration or len(evals["valid"]["l1"])) - 1
+    mae = float(evals["valid"]["l1"][idx])
+    rmse = float(evals["valid"]["rmse"][idx])
+    y = valid_set.get_label()
+    r2 = 1 - rmse**2 / float(np.var(y))
+
+    metrics = {"MAE": round(mae, 4), "RMSE": round(rmse, 4), "R2": round(r2, 4)}
+    logger.info("Evaluation metrics: %s", metrics)
+    return metrics
+
+
+def save_native_model(
+    settings: Settings,
+    booster,
+    schema: dict[str, Any],
+    metrics: dict[str, float],
+) -> Path:
+    """Persist a native Booster as a LightGBM text model plus its feature schema sidecar.
+
+    The text model goes to ``native_model_path``, not the joblib
+    ``model_path`` of the sklearn trainer, so each file holds one kind of
+    artifact.
+    """
+    settings.model.output_dir.mkdir(parents=True, exist_ok=True)
+    model_path = settings.model.native_model_path
+    logger.info("Saving model to %s …", model_path)
+    booster.save_model(str(model_path))
+    with open(settings.model.schema_path, "w", encoding="utf-8") as fh:
+        json.dump(schema, fh, indent=2)
+
+    from pricepoint.registry import register_trained_model
+
+    register_trained_model(settings, booster, metrics, schema)
+
+    logger.info("Training pipeline complete. MAE=£%.2f, RMSE=£%.2f", metrics["MAE"], metrics["RMSE"])
+    return model_path
+
+
+def _run_native_training(settings: Settings) -> Path:
+    """Train a Booster from the cached native-categorical Dataset."""
+    native = load_or_build_dataset(settings)
+    train_set, valid_set = native.split(settings.training.test_days)
+    booster, evals = train_booster(train_set, valid_set, settings.model.lgbm_params)
+    metrics = booster_metrics(evals, valid_set)
+    return save_native_model(settings, booster, native.schema, metrics)
+
+
 def run_training(settings: Settings) -> Path:
     """Execute the full training pipeline.
 
@@ -153,6 +521,9 @@ def run_training(settings: Settings) -> Path:
     Path
         Path to the saved model artifact.
     """
+    if settings.training.native_categorical:
+        return _run_native_training(settings)
+
     feature_path = settings.data.processed_dir / settings.features.output_filename
     if not feature_path.exists():
         raise FileNotFoundError(
@@ -162,7 +533,7 @@ def run_training(settings: Settings) -> Path:
     logger.info("Loading feature data from %s …", feature_path)
     df = pd.read_parquet(feature_path, engine="pyarrow")
 
-    X_train, y_train, X_test, y_test = prepare_training_data(df)
+    X_train, y_train, X_test, y_test = prepare_training_data(df, settings.training.test_days)
     model = train_model(X_train, y_train, settings.model.lgbm_params)
     metrics = evaluate_model(model, X_test, y_test)
 
@@ -173,6 +544,10 @@ def run_training(settings: Settings) -> Path:
 
     logger.info("Saving model to %s …", model_path)
     joblib.dump(model, model_path)
+
+    from pricepoint.registry import register_trained_model
+
+    register_trained_model(settings, model, metrics)
     logger.info("Training pipeline complete. MAE=£%.2f, RMSE=£%.2f", metrics["MAE"], metrics["RMSE"])
 
     return model_path
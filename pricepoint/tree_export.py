@@ -0,0 +1,241 @@
+"""Flat-array export and vectorized evaluation of LightGBM models.
+
+For single rows and small batches, ``LGBMRegressor.predict`` spends most
+of its time validating a pandas DataFrame and crossing the Python/C
+wrapper rather than walking trees.  :func:`export_booster` converts a
+trained model into flat NumPy node arrays (split feature, threshold,
+children, leaf values and missing-value routing) and
+:meth:`FlatForest.predict` walks every tree for every row at once, one
+tree level per step, on a raw float array — no pandas involved.
+
+Numerical and native categorical splits follow LightGBM's own decision
+rules, including ``missing_type`` / ``default_left`` handling.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ``missing_type`` codes, as in LightGBM's ``MissingType`` enum.
+_MISSING_NONE, _MISSING_ZERO, _MISSING_NAN = 0, 1, 2
+_MISSING_CODES = {"None": _MISSING_NONE, "Zero": _MISSING_ZERO, "NaN": _MISSING_NAN}
+_ZERO_THRESHOLD = 1e-35
+
+# Objectives whose raw score is on a log scale.
+_EXP_OBJECTIVES = ("poisson", "gamma", "tweedie")
+
+
+@dataclass
+class FlatForest:
+    """A tree ensemble stored as flat node arrays.
+
+    Every node of every tree is one slot.  Leaves point both children at
+    themselves, so after ``max_depth`` steps every row sits on a leaf.
+    """
+
+    feature_names: list[str]
+    roots: np.ndarray  # (n_trees,) intp — slot of each tree's root
+    split_feature: np.ndarray  # (n_nodes,) intp
+    threshold: np.ndarray  # (n_nodes,) float64
+    children: np.ndarray  # (2 * n_nodes,) intp — [right, left] child slots per node
+    default_left: np.ndarray  # (n_nodes,) bool
+    missing_type: np.ndarray  # (n_nodes,) int8
+    value: np.ndarray  # (n_nodes,) float64 — leaf output (0 for internal nodes)
+    cat_row: np.ndarray  # (n_nodes,) int32 — row in ``cat_left`` or -1 for numerical splits
+    cat_left: np.ndarray  # (n_cat_splits, n_categories) bool — categories routed left
+    max_depth: int
+    output_transform: str = "identity"
+    average_output: bool = False
+
+    def __post_init__(self) -> None:
+        # Without categorical or zero-as-missing splits, NaN-free input
+        # only needs the plain ``x <= threshold`` comparison.
+        self._simple = not len(self.cat_left) and not (self.missing_type == _MISSING_ZERO).any()
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def save(self, directory: Path) -> None:
+        """Write one ``.npy`` file per array plus a JSON header."""
+        directory.mkdir(parents=True, exist_ok=True)
+        header = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, np.ndarray):
+                np.save(directory / f"{f.name}.npy", value)
+            else:
+                header[f.name] = value
+        with open(directory / "forest.json", "w", encoding="utf-8") as fh:
+            json.dump(header, fh, indent=2)
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> FlatForest:
+        """Load a saved forest, memory-mapping the node arrays by default."""
+        with open(directory / "forest.json", "r", encoding="utf-8") as fh:
+            header = json.load(fh)
+        arrays = {
+            f.name: np.load(directory / f"{f.name}.npy", mmap_mode="r" if mmap else None)
+            for f in fields(cls)
+            if f.name not in header
+        }
+        return cls(**header, **arrays)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict for a raw feature array in model feature order.
+
+        Parameters
+        ----------
+        X : np.ndarray
+            ``(n_rows, n_features)`` or ``(n_features,)`` float array.
+
+        Returns
+        -------
+        np.ndarray
+            ``(n_rows,)`` predictions.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if len(X) == 1:
+            # One row: index the feature vector directly.
+            row, node = X[0], self.roots
+        else:
+            row, node = X, np.broadcast_to(self.roots, (len(X), self.n_trees))
+
+        simple = self._simple and not np.isnan(X).any()
+        for _ in range(self.max_depth):
+            feature = self.split_feature[node]
+            x = row[feature] if row.ndim == 1 else np.take_along_axis(row, feature, axis=1)
+            go_left = x <= self.threshold[node] if simple else self._decide(node, x)
+            node = self.children[2 * node + go_left]
+
+        raw = np.atleast_2d(self.value[node]).sum(axis=1)
+        if self.average_output:
+            raw /= self.n_trees
+        if self.output_transform == "exp":
+            return np.exp(raw)
+        return raw
+
+    def _decide(self, node: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """LightGBM's numerical and categorical decision rules, vectorized."""
+        missing = self.missing_type[node]
+        is_nan = np.isnan(x)
+        # Numerical splits treat NaN as zero unless they route NaN explicitly.
+        x_num = np.where(is_nan & (missing != _MISSING_NAN), 0.0, x)
+        use_default = ((missing == _MISSING_ZERO) & (np.abs(x_num) <= _ZERO_THRESHOLD)) | (
+            (missing == _MISSING_NAN) & is_nan
+        )
+        go_left = np.where(use_default, self.default_left[node], x_num <= self.threshold[node])
+
+        cat_row = self.cat_row[node]
+        is_cat = cat_row >= 0
+        if is_cat.any():
+            # Categorical splits send NaN, negative and unseen codes right.
+            n_categories = self.cat_left.shape[1]
+            code = np.where(is_nan, -1, x).astype(np.int64)
+            in_range = (code >= 0) & (code < n_categories)
+            cat_go_left = self.cat_left[np.maximum(cat_row, 0), np.clip(code, 0, n_categories - 1)]
+            go_left = np.where(is_cat, in_range & cat_go_left, go_left)
+        return go_left
+
+
+def _walk(tree: dict[str, Any], slots: dict[str, list], cat_sets: list[set[int]]) -> tuple[int, int]:
+    """Append a (sub)tree to ``slots``; return (slot, depth below it)."""
+    slot = len(slots["value"])
+    for key, default in (
+        ("split_feature", 0), ("threshold", 0.0), ("left", slot), ("right", slot),
+        ("default_left", False), ("missing_type", _MISSING_NONE), ("value", 0.0), ("cat_row", -1),
+    ):
+        slots[key].append(default)
+
+    if "leaf_value" in tree:
+        slots["value"][slot] = float(tree["leaf_value"])
+        return slot, 0
+
+    slots["split_feature"][slot] = int(tree["split_feature"])
+    slots["default_left"][slot] = bool(tree["default_left"])
+    slots["missing_type"][slot] = _MISSING_CODES[tree["missing_type"]]
+    if tree["decision_type"] == "==":
+        slots["cat_row"][slot] = len(cat_sets)
+        cat_sets.append({int(c) for c in str(tree["threshold"]).split("||")})
+    else:
+        slots["threshold"][slot] = float(tree["threshold"])
+
+    left, left_depth = _walk(tree["left_child"], slots, cat_sets)
+    right, right_depth = _walk(tree["right_child"], slots, cat_sets)
+    slots["left"][slot] = left
+    slots["right"][slot] = right
+    return slot, 1 + max(left_depth, right_depth)
+
+
+def export_booster(model, num_iteration: int | None = None) -> FlatForest:
+    """Convert an ``LGBMRegressor`` or ``Booster`` into a :class:`FlatForest`.
+
+    Parameters
+    ----------
+    model
+        Trained sklearn ``LGBMRegressor`` or native ``Booster``.
+    num_iteration : int, optional
+        Number of iterations to export; defaults to the best iteration
+        when early stopping was used, else all of them.
+
+    Returns
+    -------
+    FlatForest
+        Flat-array model that reproduces ``model.predict``.
+    """
+    booster = getattr(model, "booster_", model)
+    if num_iteration is None and booster.best_iteration > 0:
+        num_iteration = booster.best_iteration
+    dump = booster.dump_model(num_iteration=num_iteration)
+    if dump["num_tree_per_iteration"] != 1:
+        raise ValueError("Only single-output (regression) models can be exported.")
+
+    slots: dict[str, list] = {
+        k: [] for k in (
+            "split_feature", "threshold", "left", "right",
+            "default_left", "missing_type", "value", "cat_row",
+        )
+    }
+    cat_sets: list[set[int]] = []
+    roots, max_depth = [], 0
+    for tree in dump["tree_info"]:
+        root, depth = _walk(tree["tree_structure"], slots, cat_sets)
+        roots.append(root)
+        max_depth = max(max_depth, depth)
+
+    n_categories = max((max(s) for s in cat_sets), default=-1) + 1
+    cat_left = np.zeros((len(cat_sets), n_categories), dtype=bool)
+    for i, cats in enumerate(cat_sets):
+        cat_left[i, list(cats)] = True
+
+    objective = str(dump.get("objective", "")).split()[0]
+    forest = FlatForest(
+        feature_names=list(dump["feature_names"]),
+        roots=np.asarray(roots, dtype=np.intp),
+        split_feature=np.asarray(slots["split_feature"], dtype=np.intp),
+        threshold=np.asarray(slots["threshold"], dtype=np.float64),
+        children=np.column_stack([slots["right"], slots["left"]]).ravel().astype(np.intp),
+        default_left=np.asarray(slots["default_left"], dtype=bool),
+        missing_type=np.asarray(slots["missing_type"], dtype=np.int8),
+        value=np.asarray(slots["value"], dtype=np.float64),
+        cat_row=np.asarray(slots["cat_row"], dtype=np.int32),
+        cat_left=cat_left,
+        max_depth=max_depth,
+        output_transform="exp" if objective.startswith(_EXP_OBJECTIVES) else "identity",
+        average_output=bool(dump.get("average_output", False)),
+    )
+    logger.info(
+        "Exported %s trees (%s nodes, max depth %s) to flat arrays",
+        forest.n_trees, f"{len(forest.value):,}", forest.max_depth,
+    )
+    return forest
@@ -0,0 +1,304 @@
+"""Budgeted hyperparameter search with successive halving.
+
+Samples ``lgbm_params`` candidates from the configured search space and
+races them over rungs of increasing boosting rounds, keeping the best
+``1 / eta`` at each rung.  Every fit uses validation-based early stopping
+on the shared binary Dataset, trials run in parallel worker processes,
+and the search stops when the wall-clock or CPU-hour budget is spent.
+
+The best parameters are written as a config overlay, and the trial log
+records fit time and predict latency next to MAE so models can be
+picked from the latency/accuracy frontier.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from pricepoint.config import Settings
+from pricepoint.cross_validation import split_core_budget
+from pricepoint.parallel import spawn_pool, worker_state
+from pricepoint.training import (
+    TARGET_COL,
+    booster_metrics,
+    dataset_params,
+    encode_categorical,
+    load_or_build_dataset,
+    train_booster,
+)
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Search space and schedule
+# ---------------------------------------------------------------------------
+
+
+def sample_params(space: dict[str, dict[str, Any]], rng: np.random.Generator) -> dict[str, Any]:
+    """Draw one candidate from the search space.
+
+    Each entry is either ``{"choices": [...]}`` or a range
+    ``{"low", "high", "log": bool, "int": bool}``.
+    """
+    params: dict[str, Any] = {}
+    for name, spec in space.items():
+        if "choices" in spec:
+            params[name] = spec["choices"][rng.integers(len(spec["choices"]))]
+            continue
+        low, high = float(spec["low"]), float(spec["high"])
+        if spec.get("log"):
+            value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        else:
+            value = float(rng.uniform(low, high))
+        params[name] = round(value) if spec.get("int") else round(value, 6)
+    return params
+
+
+def rung_schedule(min_rounds: int, max_rounds: int, eta: int) -> list[int]:
+    """Boosting-round budget per rung: ``min_rounds * eta**k`` capped at ``max_rounds``."""
+    rounds = [min_rounds]
+    while rounds[-1] < max_rounds:
+        rounds.append(min(rounds[-1] * eta, max_rounds))
+    return rounds
+
+
+def promote(results: list[dict[str, Any]], eta: int) -> list[int]:
+    """Trial ids of the best ``1 / eta`` results by MAE (at least one)."""
+    ranked = sorted(results, key=lambda r: r["MAE"])
+    keep = max(1, len(ranked) // eta)
+    return [r["trial"] for r in ranked[:keep]]
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+
+def _trial_state(
+    cache_dir: str, params: dict[str, Any], test_days: int, latency_rows: np.ndarray
+) -> dict[str, Any]:
+    """Load the shared Dataset once per worker process."""
+    from pricepoint.training import NativeDataset
+
+    native = NativeDataset.load(Path(cache_dir), params)
+    train_set, valid_set = native.split(test_days)
+    return {
+        "train_set": train_set.construct(),
+        "valid_set": valid_set.construct(),
+        "latency_rows": latency_rows,
+    }
+
+
+def _predict_latency(booster, rows: np.ndarray, n_single: int = 200) -> tuple[float, float]:
+    """(p50 single-row latency, full-batch latency) in milliseconds."""
+    single: list[float] = []
+    for row in rows[:n_single]:
+        start = time.perf_counter()
+        booster.predict(row[None, :], num_threads=1)
+        single.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    booster.predict(rows)
+    batch_ms = (time.perf_counter() - start) * 1000
+    return float(np.percentile(single, 50)), batch_ms
+
+
+def deadline_callback(deadline: float):
+    """LightGBM callback ending training once ``time.time()`` passes ``deadline``."""
+    import lightgbm as lgb
+
+    def _callback(env) -> None:
+        if time.time() > deadline:
+            raise lgb.callback.EarlyStopException(env.iteration, env.evaluation_result_list)
+
+    return _callback
+
+
+def _run_trial(
+    trial: int,
+    rung: int,
+    lgbm_params: dict[str, Any],
+    rounds: int,
+    early_stopping_rounds: int,
+    deadline: float,
+) -> dict[str, Any]:
+    """Fit one candidate at a given round budget (runs in a worker).
+
+    Training stops early at ``deadline`` (epoch seconds), so a trial that
+    is running when the budget runs out cannot overrun it.
+    """
+    import lightgbm as lgb
+
+    state = worker_state()
+    valid_set = state["valid_set"]
+    start = time.perf_counter()
+    booster, evals = train_booster(
+        state["train_set"],
+        valid_set,
+        lgbm_params,
+        callbacks=[
+            lgb.early_stopping(early_stopping_rounds, first_metric_only=True, verbose=False),
+            deadline_callback(deadline),
+        ],
+        num_boost_round=rounds,
+    )
+    fit_seconds = time.perf_counter() - start
+
+    # ``predict`` stops at ``best_iteration`` when early stopping fired.
+    best_iteration = booster.best_iteration or booster.current_iteration()
+    p50_ms, batch_ms = _predict_latency(booster, state["latency_rows"])
+
+    return {
+        "trial": trial,
+        "rung": rung,
+        "rounds": rounds,
+        "best_iteration": best_iteration,
+        **booster_metrics(evals, valid_set, best_iteration),
+        "fit_seconds": round(fit_seconds, 2),
+        "predict_p50_ms": round(p50_ms, 4),
+        "predict_batch_ms": round(batch_ms, 3),
+        "params": json.dumps(lgbm_params, sort_keys=True),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+
+def _latency_sample(settings: Settings, schema: dict[str, Any], n_rows: int) -> np.ndarray:
+    """Real feature rows from the last row group, encoded like the Dataset."""
+    import pyarrow.parquet as pq
+
+    feature_path = settings.data.processed_dir / settings.features.output_filename
+    features = schema["feature_names"]
+    pf = pq.ParquetFile(feature_path)
+    last_group = pf.read_row_group(pf.num_row_groups - 1, columns=[*features, TARGET_COL])
+    df = last_group.to_pandas().tail(n_rows)
+
+    X = np.empty((len(df), len(features)), dtype=np.float32)
+    for j, col in enumerate(features):
+        if col in schema["categories"]:
+            X[:, j] = encode_categorical(df[col], schema["categories"][col])
+        else:
+            X[:, j] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+    return X
+
+
+def write_overlay(path: Path, lgbm_params: dict[str, Any]) -> Path:
+    """Write ``model.lgbm_params`` as a YAML overlay for :func:`load_settings`."""
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write("# Written by `python run.py tune` — merged over config.yaml.\n")
+        yaml.safe_dump({"model": {"lgbm_params": lgbm_params}}, fh, sort_keys=False)
+    return path
+
+
+def run_tuning(settings: Settings) -> pd.DataFrame:
+    """Run the successive-halving search and write the best params overlay.
+
+    Parameters
+    ----------
+    settings : Settings
+        Application settings.
+
+    Returns
+    -------
+    pd.DataFrame
+        The trial log (one row per trial and rung).
+    """
+    cfg = settings.tuning
+    rng = np.random.default_rng(cfg.random_seed)
+    base_params = dict(settings.model.lgbm_params)
+    base_params.pop("n_estimators", None)
+    candidates = {i: {**base_params, **sample_params(cfg.search_space, rng)} for i in range(cfg.n_trials)}
+    rungs = rung_schedule(cfg.min_rounds, cfg.max_rounds, cfg.eta)
+
+    native = load_or_build_dataset(settings)
+    latency_rows = _latency_sample(settings, native.schema, cfg.latency_rows)
+    del native
+
+    workers, threads = split_core_budget(
+        cfg.n_trials, settings.training.core_budget or os.cpu_count() or 1, cfg.threads_per_trial
+    )
+    # Epoch time, so worker processes can compare against the same clock.
+    deadline = time.time() + cfg.time_budget_minutes * 60
+    cpu_budget_s = cfg.cpu_hours_budget * 3600 if cfg.cpu_hours_budget else math.inf
+    cpu_used_s = 0.0
+    logger.info(
+        "Tuning %s candidates over rungs %s (eta=%s) with %s workers × %s threads …",
+        cfg.n_trials, rungs, cfg.eta, workers, threads,
+    )
+
+    log: list[dict[str, Any]] = []
+    alive = list(candidates)
+    init_args = (
+        str(settings.training.dataset_cache_dir),
+        dataset_params(settings.model.lgbm_params),
+        settings.training.test_days,
+        latency_rows,
+    )
+    out_of_budget = False
+    with spawn_pool(workers, _trial_state, *init_args) as pool:
+        for rung, rounds in enumerate(rungs):
+            # Trials stop at the wall-clock deadline or when every worker
+            # running flat out would spend the remaining CPU budget.
+            trial_deadline = min(deadline, time.time() + (cpu_budget_s - cpu_used_s) / (workers * threads))
+            pending = {
+                pool.submit(
+                    _run_trial, t, rung, {**candidates[t], "num_threads": threads},
+                    rounds, cfg.early_stopping_rounds, trial_deadline,
+                )
+                for t in alive
+            }
+            rung_results: list[dict[str, Any]] = []
+            while pending:
+                done, pending = wait(pending, timeout=5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    cpu_used_s += result["fit_seconds"] * threads
+                    rung_results.append(result)
+                    logger.info(
+                        "Trial %s rung %s: MAE=£%.4f @ %s rounds (%.1fs, p50 %.3f ms)",
+                        result["trial"], rung, result["MAE"], result["best_iteration"],
+                        result["fit_seconds"], result["predict_p50_ms"],
+                    )
+                if time.time() > deadline or cpu_used_s > cpu_budget_s:
+                    # Queued trials are dropped; running ones stop at their deadline.
+                    logger.warning("Tuning budget exhausted — cancelling remaining trials.")
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    out_of_budget = True
+                    break
+            log.extend(rung_results)
+            if out_of_budget or not rung_results or rung == len(rungs) - 1:
+                break
+            alive = promote(rung_results, cfg.eta)
+
+    if not log:
+        raise RuntimeError("No tuning trial finished within the budget.")
+
+    trials = pd.DataFrame(log)
+    output_dir = settings.model.output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    trials.to_csv(output_dir / "tuning_trials.csv", index=False)
+
+    top_rung = trials[trials["rung"] == trials["rung"].max()]
+    best = top_rung.loc[top_rung["MAE"].idxmin()]
+    best_params = {**json.loads(best["params"]), "n_estimators": int(best["best_iteration"])}
+    best_params.pop("num_threads", None)
+    overlay = write_overlay(cfg.overlay_path, best_params)
+
+    logger.info(
+        "Tuning complete: best trial %s MAE=£%.4f (%s trials logged, %.2f CPU-hours). Overlay: %s",
+        best["trial"], best["MAE"], len(trials), cpu_used_s / 3600, overlay,
+    )
+    return trials
@@ -5,19 +5,45 @@ Usage:
     python run.py ingest       # Run data ingestion + validation
     python run.py match        # Run semantic product matching
     python run.py features     # Run feature engineering
+    python run.py update-features BATCH  # Online feature update for new prices
     python run.py train        # Train LightGBM model
-    python run.py anomaly      # Run anomaly detection
-    python run.py precompute   # Precompute SHAP + market dynamics
+    python run.py train --cv 5 # Parallel rolling-origin cross-validation
+    python run.py train --streaming  # Out-of-core training from Parquet
+    python run.py train --incremental  # Warm-start refresh on recent days
+    python run.py tune         # Budgeted successive-halving hyperparameter search
+    python run.py predict      # Batch-score feature Parquet → partitioned predictions
+    python run.py forecast     # Recursive multi-day forecast cube for every series
+    python run.py serve        # HTTP prediction service with request micro-batching
+    python run.py loadtest     # Load-generate against the service (in-process by default)
+    python run.py anomaly      # Run anomaly detection (labelled with price events after precompute)
+    python run.py cube         # Memory-mapped (product × retailer × day) price cube
+    python run.py precompute   # Dispersion, leadership (+ timeline), HHI, metrics, price events, SHAP concurrently
+    python run.py precompute --workers 2  # Cap the number of concurrent tasks
+    python run.py precompute --incremental  # Dispersion for new days + sliding leadership window only
+    python run.py precompute --interactions  # + top-K SHAP interaction summaries
     python run.py benchmark    # Run inference benchmark
+    python run.py benchmark --sweep  # Batch size × threads grid → models/benchmark_sweep.csv
+    python run.py benchmark --load   # Open-loop concurrent clients → models/benchmark_load.csv
     python run.py hhi          # Calculate HHI index
+    python run.py pipeline     # ingest → match → features → train (cached)
+    python run.py registry list       # Registered model versions
+    python run.py registry rollback   # Point "current" back at the previous version
+    python run.py registry bench-load # Cold-start load time per artifact format
+
+Stages whose inputs, config section and code are unchanged are skipped;
+pass ``--force`` to recompute.
 """
 
 from __future__ import annotations
 
+from pathlib import Path
+from typing import Annotated
+
 import typer
 
 from pricepoint.config import load_settings
 from pricepoint.logging_config import setup_logging
+from pricepoint.stage_cache import run_cached
 
 app = typer.Typer(
     name="pricepoint",
@@ -25,6 +51,10 @@ app = typer.Typer(
     add_completion=False,
 )
 
+ForceOption = Annotated[
+    bool, typer.Option("--force", help="Recompute even if inputs and config are unchanged.")
+]
+
 
 def _init() -> "Settings":
     """Load settings and configure logging."""
@@ -34,84 +64,352 @@ def _init() -> "Settings":
 
 
 @app.command()
-def ingest() -> None:
+def ingest(force: ForceOption = False) -> None:
     """Run data ingestion: load raw CSVs → clean → validate → Parquet."""
     from pricepoint.data_ingestion import run_ingestion
 
     settings = _init()
-    path = run_ingestion(settings)
+    path = run_cached(settings, "ingest", lambda: run_ingestion(settings), force)
     typer.echo(f"✓ Ingestion complete → {path}")
 
 
 @app.command()
-def match() -> None:
+def match(force: ForceOption = False) -> None:
     """Run semantic product matching (Sentence-BERT + FAISS)."""
     from pricepoint.product_matching import run_matching
 
     settings = _init()
-    path = run_matching(settings)
+    path = run_cached(settings, "match", lambda: run_matching(settings), force)
     typer.echo(f"✓ Product matching complete → {path}")
 
 
 @app.command()
-def features() -> None:
+def features(force: ForceOption = False) -> None:
     """Run feature engineering (rolling stats, lags, competitive)."""
     from pricepoint.feature_engineering import run_feature_engineering
 
     settings = _init()
-    path = run_feature_engineering(settings)
+    path = run_cached(settings, "features", lambda: run_feature_engineering(settings), force)
     typer.echo(f"✓ Feature engineering complete → {path}")
 
 
 @app.command()
-def train() -> None:
+def update_features(
+    batch_path: Annotated[Path, typer.Argument(help="Parquet/CSV file with new price observations.")],
+) -> None:
+    """Update the online feature store and emit features for a price batch."""
+    from pricepoint.feature_store import run_online_features
+
+    settings = _init()
+    path = run_online_features(settings, batch_path)
+    typer.echo(f"✓ Online features emitted → {path}")
+
+
+@app.command()
+def train(
+    force: ForceOption = False,
+    cv: Annotated[
+        int, typer.Option("--cv", help="Run N-fold rolling-origin cross-validation instead.")
+    ] = 0,
+    streaming: Annotated[
+        bool, typer.Option("--streaming", help="Train out of core, streaming Parquet batches.")
+    ] = False,
+    incremental: Annotated[
+        bool,
+        typer.Option("--incremental", help="Warm-start the current model on recent days."),
+    ] = False,
+) -> None:
     """Train LightGBM price prediction model."""
     from pricepoint.training import run_training
 
     settings = _init()
-    path = run_training(settings)
+    if cv:
+        from pricepoint.cross_validation import run_cross_validation
+
+        report = run_cross_validation(settings, cv)
+        typer.echo(report.to_string(index=False))
+        return
+    if incremental:
+        from pricepoint.incremental import run_incremental_training
+
+        result = run_incremental_training(settings)
+        status = "promoted" if result["promoted"] else "kept previous model"
+        typer.echo(
+            f"✓ Incremental {result['mode']}: MAE £{result['previous_MAE']} → "
+            f"£{result['candidate_MAE']} ({status})"
+        )
+        return
+    if streaming:
+        from pricepoint.streaming import run_streaming_training
+
+        path = run_cached(settings, "train_streaming", lambda: run_streaming_training(settings), force)
+    else:
+        path = run_cached(settings, "train", lambda: run_training(settings), force)
     typer.echo(f"✓ Training complete → {path}")
 
 
 @app.command()
-def anomaly() -> None:
+def tune(
+    minutes: Annotated[
+        float | None, typer.Option("--minutes", help="Wall-clock budget (overrides config).")
+    ] = None,
+    cpu_hours: Annotated[
+        float | None, typer.Option("--cpu-hours", help="CPU-hour budget (overrides config).")
+    ] = None,
+) -> None:
+    """Search LightGBM hyperparameters and write the best as a config overlay."""
+    from dataclasses import replace
+
+    from pricepoint.tuning import run_tuning
+
+    settings = _init()
+    overrides = {
+        k: v for k, v in {"time_budget_minutes": minutes, "cpu_hours_budget": cpu_hours}.items() if v
+    }
+    settings.tuning = replace(settings.tuning, **overrides)
+    trials = run_tuning(settings)
+    best = trials[trials["rung"] == trials["rung"].max()].nsmallest(1, "MAE")
+    typer.echo(best.to_string(index=False))
+    typer.echo(f"✓ Tuning complete → {settings.tuning.overlay_path}")
+
+
+@app.command()
+def predict(
+    input_path: Annotated[
+        Path | None, typer.Option("--input", help="Feature Parquet file or directory to score.")
+    ] = None,
+    output_dir: Annotated[
+        Path | None, typer.Option("--output", help="Output dataset directory.")
+    ] = None,
+    since: Annotated[
+        str | None, typer.Option("--since", help="Only score rows on/after this date (YYYY-MM-DD).")
+    ] = None,
+    threads: Annotated[
+        int | None, typer.Option("--threads", help="LightGBM prediction threads.")
+    ] = None,
+) -> None:
+    """Score feature data in bulk with the current model."""
+    from pricepoint.scoring import run_scoring
+
+    settings = _init()
+    path = run_scoring(settings, input_path, output_dir, since, threads)
+    typer.echo(f"✓ Predictions written → {path}")
+
+
+@app.command()
+def forecast(
+    horizon: Annotated[
+        int | None, typer.Option("--horizon", help="Days ahead (overrides config).")
+    ] = None,
+    output_dir: Annotated[
+        Path | None, typer.Option("--output", help="Forecast cube directory.")
+    ] = None,
+) -> None:
+    """Forecast every product × supermarket series several days ahead."""
+    from pricepoint.forecasting import run_forecast
+
+    settings = _init()
+    path = run_forecast(settings, horizon, output_dir)
+    typer.echo(f"✓ Forecast cube written → {path}")
+
+
+@app.command()
+def serve(
+    port: Annotated[int | None, typer.Option("--port", help="Port (overrides config).")] = None,
+) -> None:
+    """Serve low-latency predictions over HTTP."""
+    from dataclasses import replace
+
+    from pricepoint.service import run_service
+
+    settings = _init()
+    if port:
+        settings.service = replace(settings.service, port=port)
+    run_service(settings)
+
+
+@app.command()
+def loadtest(
+    requests: Annotated[int, typer.Option("--requests", help="Total requests.")] = 5000,
+    concurrency: Annotated[int, typer.Option("--concurrency", help="Keep-alive connections.")] = 32,
+    rows: Annotated[int, typer.Option("--rows", help="Rows per request.")] = 1,
+    host: Annotated[
+        str | None, typer.Option("--host", help="Target a running service instead of an in-process one.")
+    ] = None,
+    port: Annotated[int | None, typer.Option("--port", help="Port of the running service.")] = None,
+) -> None:
+    """Benchmark the prediction service with a bundled load generator."""
+    import json
+
+    from pricepoint.service import run_load_test
+
+    settings = _init()
+    result = run_load_test(settings, requests, concurrency, rows, host, port)
+    typer.echo(json.dumps(result, indent=2))
+
+
+@app.command()
+def anomaly(force: ForceOption = False) -> None:
     """Run Isolation Forest anomaly detection."""
     from pricepoint.anomaly import run_anomaly_detection
 
     settings = _init()
-    path = run_anomaly_detection(settings)
+    path = run_cached(settings, "anomaly", lambda: run_anomaly_detection(settings), force)
     typer.echo(f"✓ Anomaly detection complete → {path}")
 
 
 @app.command()
-def precompute() -> None:
-    """Pre-compute SHAP values + market dynamics for the dashboard."""
-    from pricepoint.market_analysis import run_precompute
+def cube(force: ForceOption = False) -> None:
+    """Build the shared price cube from canonical products."""
+    from pricepoint.price_tensor import build_price_cube
 
     settings = _init()
-    run_precompute(settings)
+    path = run_cached(settings, "cube", lambda: build_price_cube(settings), force)
+    typer.echo(f"✓ Price cube → {path}")
+
+
+@app.command()
+def precompute(
+    force: ForceOption = False,
+    interactions: Annotated[
+        bool,
+        typer.Option("--interactions", help="Also summarise SHAP interactions of the top-K features."),
+    ] = False,
+    workers: Annotated[
+        int | None, typer.Option("--workers", help="Concurrent tasks (default: precompute.workers).")
+    ] = None,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            "--incremental",
+            help="Dispersion for new days only; leadership over a sliding window from saved sums.",
+        ),
+    ] = False,
+) -> None:
+    """Pre-compute market dynamics, HHI and SHAP values for the dashboard."""
+    from pricepoint.market_analysis import precompute_shap_interactions, run_precompute
+
+    settings = _init()
+    name = "precompute_incremental" if incremental else "precompute"
+    timings = run_cached(settings, name, lambda: run_precompute(settings, workers=workers, incremental=incremental), force)
+    for timing in timings if isinstance(timings, list) else []:
+        typer.echo(f"  {timing.task:<11} {timing.seconds:>8.1f}s  {timing.status}")
+    if interactions:
+        run_cached(settings, "shap_interactions", lambda: precompute_shap_interactions(settings), force)
     typer.echo("✓ All precomputation complete.")
 
 
 @app.command()
-def benchmark() -> None:
+def benchmark(
+    sweep: Annotated[
+        bool,
+        typer.Option("--sweep", help="Batch-size × thread-count grid on real feature rows."),
+    ] = False,
+    load: Annotated[
+        bool,
+        typer.Option("--load", help="Open-loop concurrent clients; find saturation throughput."),
+    ] = False,
+    processes: Annotated[
+        bool, typer.Option("--processes", help="With --load: one process per client instead of threads.")
+    ] = False,
+) -> None:
     """Benchmark model inference latency."""
-    from pricepoint.benchmarking import run_benchmark
+    from pricepoint.benchmarking import run_benchmark, run_load_benchmark, run_sweep
 
     settings = _init()
-    result = run_benchmark(settings)
-    typer.echo(str(result))
+    if load:
+        results = run_load_benchmark(settings, processes)
+        typer.echo(
+            results[["mode", "clients", "lgbm_threads", "target_rps", "achieved_rps", "p50_ms", "p99_ms",
+                     "p99_9_ms", "saturated_rps"]].to_string(index=False)
+        )
+        typer.echo(f"✓ Load benchmark saved → {settings.benchmarking.sweep_output_dir / 'benchmark_load.csv'}")
+        return
+    if sweep:
+        results = run_sweep(settings)
+        typer.echo(results[["batch_size", "threads", "p50_ms", "p99_ms", "rows_per_s"]].to_string(index=False))
+        typer.echo(f"✓ Sweep saved → {settings.benchmarking.sweep_output_dir / 'benchmark_sweep.csv'}")
+        return
+    results = run_benchmark(settings)
+    baselines: dict[bool, float] = {}
+    for name, result in results.items():
+        baseline = baselines.setdefault(name.startswith("input:"), result.p50_ms)
+        typer.echo(f"{name}  [{baseline / result.p50_ms:.1f}x p50 vs first of its kind]\n{result}\n")
 
 
 @app.command()
-def hhi() -> None:
+def hhi(force: ForceOption = False) -> None:
     """Calculate Herfindahl-Hirschman Index (market concentration)."""
     from pricepoint.market_analysis import run_hhi
 
     settings = _init()
-    path = run_hhi(settings)
+    path = run_cached(settings, "hhi", lambda: run_hhi(settings), force)
     typer.echo(f"✓ HHI calculation complete → {path}")
 
 
+@app.command()
+def pipeline(force: ForceOption = False) -> None:
+    """Run ingest → match → features → train, skipping up-to-date stages."""
+    from pricepoint.data_ingestion import run_ingestion
+    from pricepoint.feature_engineering import run_feature_engineering
+    from pricepoint.product_matching import run_matching
+    from pricepoint.training import run_training
+
+    settings = _init()
+    for name, fn in [
+        ("ingest", run_ingestion),
+        ("match", run_matching),
+        ("features", run_feature_engineering),
+        ("train", run_training),
+    ]:
+        path = run_cached(settings, name, lambda fn=fn: fn(settings), force)
+        typer.echo(f"✓ {name} → {path}")
+
+
+registry_app = typer.Typer(help="Versioned model registry.")
+app.add_typer(registry_app, name="registry")
+
+
+@registry_app.command("list")
+def registry_list() -> None:
+    """List registered model versions."""
+    from pricepoint.registry import ModelRegistry
+
+    settings = _init()
+    registry = ModelRegistry(settings.model.registry_dir)
+    current = registry.current_version()
+    for version in registry.versions():
+        manifest = registry.manifest(version)
+        marker = "*" if version == current else " "
+        typer.echo(
+            f"{marker} {version}  {manifest['created_at']}  {manifest['source']:<20} "
+            f"trees={manifest['num_trees']:<5} metrics={manifest['metrics']}"
+        )
+
+
+@registry_app.command("rollback")
+def registry_rollback(
+    version: Annotated[
+        str | None, typer.Argument(help="Version to make current (default: the previous one).")
+    ] = None,
+) -> None:
+    """Point the current model at another version."""
+    from pricepoint.registry import ModelRegistry
+
+    settings = _init()
+    current = ModelRegistry(settings.model.registry_dir).rollback(version)
+    typer.echo(f"✓ Current model → {current}")
+
+
+@registry_app.command("bench-load")
+def registry_bench_load() -> None:
+    """Benchmark cold-start model load time per artifact format."""
+    from pricepoint.registry import benchmark_cold_load
+
+    settings = _init()
+    for name, ms in benchmark_cold_load(settings).items():
+        typer.echo(f"{name:<24} {ms:>10.3f} ms")
+
+
 if __name__ == "__main__":
     app()
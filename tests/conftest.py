@@ -2,9 +2,17 @@
 
 from __future__ import annotations
 
+import dataclasses
+
+import numpy as np
 import pandas as pd
 import pytest
 
+from pricepoint.config import Settings, load_settings
+from pricepoint.training import run_training
+
+SMALL_LGBM_PARAMS = {"objective": "mae", "n_estimators": 20, "num_leaves": 7, "verbose": -1}
+
 
 @pytest.fixture
 def sample_raw_df() -> pd.DataFrame:
@@ -27,3 +35,55 @@ def sample_canonical_df() -> pd.DataFrame:
         "date": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]),
         "own_brand": [False, True, True],
     })
+
+
+@pytest.fixture
+def tmp_settings(tmp_path) -> Settings:
+    """Settings whose data and every pipeline output live under ``tmp_path``.
+
+    Features are read from ``tmp_path / "features.parquet"`` and models
+    are small (``SMALL_LGBM_PARAMS``).
+    """
+    s = load_settings()
+    s.data = dataclasses.replace(s.data, processed_dir=tmp_path)
+    s.features = dataclasses.replace(s.features, output_filename="features.parquet")
+    s.model = dataclasses.replace(
+        s.model,
+        output_dir=tmp_path / "models",
+        registry_dir=tmp_path / "models" / "registry",
+        lgbm_params=dict(SMALL_LGBM_PARAMS),
+    )
+    s.training = dataclasses.replace(s.training, dataset_cache_dir=tmp_path / "lgb_dataset")
+    s.scoring = dataclasses.replace(s.scoring, output_dir=tmp_path / "preds")
+    s.shap = dataclasses.replace(s.shap, output_dir=tmp_path / "shap")
+    s.market_dynamics = dataclasses.replace(
+        s.market_dynamics, output_dir=tmp_path / "md", sample_size=None
+    )
+    s.price_cube = dataclasses.replace(s.price_cube, output_dir=tmp_path / "cube")
+    return s
+
+
+@pytest.fixture
+def trained_settings(tmp_settings) -> Settings:
+    """``tmp_settings`` with a synthetic feature file and a model trained on it."""
+    rng = np.random.default_rng(0)
+    n = 600
+    df = pd.DataFrame({
+        "canonical_name": "p",
+        "supermarket": rng.choice(["Tesco", "ASDA", "Aldi"], n),
+        "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 20, n), unit="D"),
+        "price_lag_1d": rng.random(n) * 3,
+    })
+    df["prices"] = df["price_lag_1d"] + (df["supermarket"] == "Aldi") * -0.5
+    df.to_parquet(tmp_settings.data.processed_dir / "features.parquet", index=False)
+    run_training(tmp_settings)
+    return tmp_settings
+
+
+@pytest.fixture
+def market_settings(tmp_settings) -> Settings:
+    """``tmp_settings`` for market dynamics tests: any product listed twice is common."""
+    tmp_settings.market_dynamics = dataclasses.replace(
+        tmp_settings.market_dynamics, min_stores_for_common=2
+    )
+    return tmp_settings
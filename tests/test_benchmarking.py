@@ -0,0 +1,93 @@
+"""Tests for the inference benchmark sweep."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from pricepoint.benchmarking import (
+    default_thread_counts,
+    find_saturation,
+    open_loop_run,
+    sample_feature_rows,
+    sweep_inference,
+)
+from pricepoint.scoring import build_column_plan
+
+
+class _RecordingPredictor:
+    def __init__(self) -> None:
+        self.calls: list[tuple[int, int, float]] = []
+
+    def predict(self, X, num_threads=None):
+        self.calls.append((len(X), num_threads, X[0, 0]))
+        return X[:, 0]
+
+
+class TestSweep:
+
+    def test_default_thread_counts(self):
+        assert default_thread_counts(1) == [1]
+        assert default_thread_counts(6) == [1, 2, 4, 6]
+        assert default_thread_counts(8) == [1, 2, 4, 8]
+
+    def test_grid_cycles_through_rows(self):
+        predictor = _RecordingPredictor()
+        rows = np.arange(40, dtype=float).reshape(20, 2)
+        cells = sweep_inference(predictor, rows, [1, 8, 50], [1, 2], rows_per_cell=16, warmup_iterations=0)
+
+        assert [(c.batch_size, c.threads) for c in cells] == [(1, 1), (1, 2), (8, 1), (8, 2), (20, 1), (20, 2)]
+        assert [c.n_iterations for c in cells] == [16, 16, 5, 5, 5, 5]
+        assert all(c.rows_per_s > 0 for c in cells)
+        batch8 = [first for size, threads, first in predictor.calls if size == 8 and threads == 1]
+        assert batch8 == [0.0, 16.0, 0.0, 16.0, 0.0]
+
+    def test_sample_feature_rows(self, tmp_path):
+        df = pd.DataFrame({"supermarket": ["Tesco", "Aldi"] * 50, "x": np.arange(100.0)})
+        df.to_parquet(tmp_path / "f.parquet", row_group_size=10)
+        plan = build_column_plan(["x", "supermarket_Tesco"], pq.read_schema(tmp_path / "f.parquet"))
+
+        rows = sample_feature_rows(tmp_path / "f.parquet", plan, 25)
+        assert rows.shape == (25, 2)
+        np.testing.assert_array_equal(rows[:, 1], (rows[:, 0] % 2 == 0).astype(float))
+
+
+class _StallingPredictor:
+    """Fast, except the first call stalls for 50 ms."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def predict(self, X, num_threads=None):
+        self.calls += 1
+        if self.calls == 1:
+            time.sleep(0.05)
+        return X[:, 0]
+
+
+class TestOpenLoop:
+
+    def test_latency_includes_queueing_behind_a_stall(self):
+        predictor = _StallingPredictor()
+        with ThreadPoolExecutor(1) as pool:
+            result = open_loop_run(
+                pool, 400, 0.25, clients=1, predictor=predictor, rows=np.ones((10, 2))
+            )
+        assert result["requests"] == 100
+        # Requests due during the stall wait for it, although each is fast.
+        assert result["mean_service_ms"] < 5
+        assert result["p90_ms"] > 1
+        assert result["max_ms"] >= 50
+        assert sum(result["histogram"].values()) == 100
+
+    def test_find_saturation_stops_when_rate_not_sustained(self):
+        capacity = 3000.0
+        steps = find_saturation(
+            lambda rate: {"target_rps": rate, "achieved_rps": min(rate, capacity), "p99_ms": 1.0}, 500
+        )
+        assert [s["target_rps"] for s in steps] == [500, 1000, 2000, 4000]
+        assert max(s["achieved_rps"] for s in steps) == capacity
@@ -0,0 +1,30 @@
+"""Tests for rolling-origin cross-validation helpers."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from pricepoint.cross_validation import split_core_budget, time_series_folds
+
+
+class TestCrossValidation:
+
+    def test_folds_expand_and_end_on_last_date(self):
+        dates = np.arange("2024-01-01", "2024-02-01", dtype="datetime64[D]")
+        folds = time_series_folds(dates, n_folds=3, horizon_days=7)
+        assert len(folds) == 3
+        assert folds[-1][1] == dates.max()
+        assert folds[0][1] + np.timedelta64(7, "D") == folds[1][1]
+        assert all(end - start == np.timedelta64(6, "D") for start, end in folds)
+
+    def test_folds_without_history_are_skipped(self):
+        dates = np.arange("2024-01-01", "2024-01-15", dtype="datetime64[D]")
+        assert len(time_series_folds(dates, n_folds=5, horizon_days=7)) == 1
+
+    @pytest.mark.parametrize(
+        ("n_folds", "budget", "threads", "expected"),
+        [(5, 40, None, (5, 8)), (5, 4, None, (4, 1)), (5, 16, 8, (2, 8)), (3, 1, None, (1, 1))],
+    )
+    def test_split_core_budget(self, n_folds, budget, threads, expected):
+        assert split_core_budget(n_folds, budget, threads) == expected
@@ -0,0 +1,186 @@
+"""Tests for native SHAP contributions."""
+
+from __future__ import annotations
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from pricepoint.explain import (
+    InstanceExplainer,
+    InteractionSummary,
+    interaction_summary,
+    model_fingerprint,
+    quantile_edges,
+    sample_feature_matrix,
+    shap_contributions,
+    summarise_contributions,
+)
+from pricepoint.scoring import build_column_plan
+
+FEATURES = ["a", "b", "c"]
+
+
+@pytest.fixture
+def data() -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    X = rng.random((600, 3))
+    X[rng.random(600) < 0.1, 2] = np.nan
+    y = 3 * X[:, 0] - 2 * X[:, 1] + np.nan_to_num(X[:, 2])
+    return X, y
+
+
+@pytest.fixture
+def booster(data) -> lgb.Booster:
+    X, y = data
+    return lgb.train(
+        {"objective": "regression", "num_leaves": 7, "verbose": -1},
+        lgb.Dataset(X, y, feature_name=FEATURES),
+        num_boost_round=20,
+    )
+
+
+class TestShapContributions:
+
+    def test_additive_and_chunk_invariant(self, booster, data):
+        X, _ = data
+        contrib, base = shap_contributions(booster, X, chunk_rows=64, num_threads=1)
+        assert contrib.dtype == np.float32 and contrib.shape == X.shape
+        np.testing.assert_allclose(contrib.sum(axis=1) + base, booster.predict(X), atol=1e-4)
+
+        whole, _ = shap_contributions(booster, X, chunk_rows=len(X))
+        np.testing.assert_array_equal(contrib, whole)
+
+    def test_writes_into_memmap(self, booster, data, tmp_path):
+        X, _ = data
+        out = np.lib.format.open_memmap(tmp_path / "v.npy", mode="w+", dtype=np.float32, shape=X.shape)
+        shap_contributions(booster, X, out, chunk_rows=100)
+        out.flush()
+        np.testing.assert_array_equal(np.load(tmp_path / "v.npy"), shap_contributions(booster, X)[0])
+
+    def test_summary_statistics(self, booster, data):
+        X, _ = data
+        contrib, _ = shap_contributions(booster, X)
+        summary = summarise_contributions(contrib, X, FEATURES, chunk_rows=50).set_index("feature")
+        assert summary.index[0] == "a"
+        np.testing.assert_allclose(summary.loc[FEATURES, "mean_abs_shap"], np.abs(contrib).mean(axis=0), rtol=1e-5)
+        np.testing.assert_allclose(summary.loc[FEATURES, "std_shap"], contrib.std(axis=0), rtol=1e-4)
+        np.testing.assert_allclose(summary.loc[FEATURES, "max_shap"], contrib.max(axis=0), rtol=1e-6)
+
+        present = ~np.isnan(X[:, 2])
+        expected = np.corrcoef(X[present, 2], contrib[present, 2])[0, 1]
+        assert summary.loc["c", "value_corr"] == pytest.approx(expected, rel=1e-6)
+        assert summary.loc["a", "value_corr"] > 0.9 and summary.loc["b", "value_corr"] < -0.9
+
+
+class TestSampleFeatureMatrix:
+
+    def test_uniform_rows_across_row_groups(self, tmp_path):
+        path = tmp_path / "features.parquet"
+        table = pa.table({
+            "a": np.arange(1000, dtype=float),
+            "b": np.arange(1000, dtype=float) * 2,
+            "supermarket": np.array(["Tesco", "Aldi"] * 500),
+        })
+        pq.write_table(table, path, row_group_size=128)
+        plan = build_column_plan(["b", "a", "supermarket_Tesco"], table.schema)
+
+        X, rows = sample_feature_matrix(path, plan, 300, seed=1)
+        assert len(np.unique(rows)) == 300 and np.all(np.diff(rows) > 0)
+        np.testing.assert_array_equal(X[:, 1], rows)
+        np.testing.assert_array_equal(X[:, 0], rows * 2)
+        np.testing.assert_array_equal(X[:, 2], rows % 2 == 0)
+
+        everything, rows = sample_feature_matrix(path, plan, 5000)
+        assert len(everything) == 1000
+        pd.testing.assert_index_equal(pd.Index(rows), pd.RangeIndex(1000), exact=False)
+
+
+class TestInstanceExplainer:
+
+    def test_matches_batch_contributions(self, booster, data):
+        X, _ = data
+        explainer = InstanceExplainer(booster, "v1")
+        batch, base = shap_contributions(booster, X[:5])
+        for row, expected in zip(X[:5], batch):
+            explanation = explainer.explain(row)
+            np.testing.assert_allclose(explanation.contributions, expected, rtol=1e-5, atol=1e-6)
+            assert explanation.base_value == pytest.approx(base)
+            assert explanation.prediction == pytest.approx(booster.predict(row[None])[0])
+        assert explanation.top(2)["feature"].tolist()[0] in FEATURES
+
+    def test_cache_hits_and_lru_eviction(self, booster, data):
+        X, _ = data
+        explainer = InstanceExplainer(booster, "v1", max_entries=2)
+        explainer.explain(X[0])
+        explainer.explain(X[1])
+        explainer.explain(X[0].copy())  # hit; X[0] becomes most recent
+        explainer.explain(X[2])  # evicts X[1]
+        assert explainer.cache_info() == {"hits": 1, "misses": 3, "size": 2, "max_entries": 2}
+
+        explainer.explain_many(X[[0, 2]])
+        assert explainer.cache_info()["hits"] == 3
+        explainer.explain(X[1])
+        assert explainer.cache_info()["misses"] == 4
+
+    def test_model_version_is_part_of_the_key(self, booster, data):
+        X, _ = data
+        explainer = InstanceExplainer(booster, "v1")
+        explainer.explain(X[0])
+        explainer.set_model(booster, "v2")
+        explainer.explain(X[0])
+        assert explainer.cache_info()["misses"] == 2
+        explainer.set_model(booster, "v1")
+        explainer.explain(X[0])
+        assert explainer.cache_info()["hits"] == 1
+        assert len(model_fingerprint(booster)) == 16
+
+
+class TestInteractionSummary:
+
+    def test_chunked_updates_match_full_reduction(self, tmp_path):
+        rng = np.random.default_rng(0)
+        phi = rng.normal(size=(500, 3, 3))
+        phi = (phi + phi.transpose(0, 2, 1)) / 2
+        values = rng.random((500, 3))
+        values[::7, 1] = np.nan
+        edges = quantile_edges(values, 4)
+
+        summary = InteractionSummary.empty(FEATURES, edges)
+        for start in range(0, 500, 128):
+            part = InteractionSummary.empty(FEATURES, edges)
+            part.update(phi[start:start + 128], values[start:start + 128])
+            summary.merge(part)
+
+        assert summary.n_rows == 500
+        np.testing.assert_allclose(summary.strength, np.abs(phi).mean(axis=0))
+        assert summary.bin_counts[0].tolist() == [125, 125, 125, 125]
+        assert summary.bin_counts[1].sum() == 500 - len(range(0, 500, 7))
+
+        in_bin = values[:, 2] < edges[2, 1]
+        np.testing.assert_allclose(summary.dependence[2, 0, 0], phi[in_bin, 2, 0].mean())
+
+        pairs = summary.pairs()
+        assert len(pairs) == 3
+        top = pairs.iloc[0]
+        i, j = FEATURES.index(top["feature_a"]), FEATURES.index(top["feature_b"])
+        assert top["mean_abs_interaction"] == pytest.approx(2 * np.abs(phi[:, i, j]).mean())
+
+        loaded = InteractionSummary.load(summary.save(tmp_path / "interactions.npz"))
+        assert loaded.features == FEATURES
+        np.testing.assert_array_equal(loaded.bin_sums, summary.bin_sums)
+
+    def test_interaction_rows_sum_to_contributions(self, booster, data):
+        pytest.importorskip("shap")
+        X, _ = data
+        summary = interaction_summary(booster, X[:200], [0, 1, 2], n_bins=5, chunk_rows=64, workers=1)
+        assert summary.features == FEATURES and summary.n_rows == 200
+        contrib, _ = shap_contributions(booster, X[:200])
+        np.testing.assert_allclose(summary.sum.sum(axis=1) / 200, contrib.mean(axis=0), atol=1e-5)
+
+        pooled = interaction_summary(booster, X[:200], [1, 0], n_bins=5, chunk_rows=64, workers=2)
+        assert pooled.features == ["b", "a"]
+        np.testing.assert_allclose(pooled.strength, summary.strength[np.ix_([1, 0], [1, 0])])
@@ -0,0 +1,103 @@
+"""Tests for the online feature store."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricepoint.feature_engineering import add_temporal_features
+from pricepoint.feature_store import OnlineFeatureStore
+
+WINDOWS = [3, 7]
+LAGS = [1, 2]
+
+
+@pytest.fixture
+def history_df() -> pd.DataFrame:
+    """Ten days of prices for two products across three retailers."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-01", periods=10, freq="D")
+    rows = []
+    for date in dates:
+        for product in ["bananas", "milk"]:
+            for store in ["Tesco", "ASDA", "Aldi"]:
+                rows.append({
+                    "canonical_name": product,
+                    "supermarket": store,
+                    "date": date,
+                    "prices": round(1.0 + rng.random(), 2),
+                })
+    return pd.DataFrame(rows)
+
+
+def _split_last_day(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    last = df["date"].max()
+    return df[df["date"] < last], df[df["date"] == last]
+
+
+class TestOnlineFeatureStore:
+
+    def test_matches_batch_pipeline(self, history_df):
+        history, batch = _split_last_day(history_df)
+        store = OnlineFeatureStore.from_history(history, WINDOWS, LAGS)
+        online = store.update(batch)
+
+        expected = add_temporal_features(history_df, WINDOWS, LAGS)
+        expected = expected[expected["date"] == batch["date"].max()]
+
+        key = ["canonical_name", "supermarket"]
+        online = online.sort_values(key).reset_index(drop=True)
+        expected = expected.sort_values(key).reset_index(drop=True)
+        for col in store.feature_columns:
+            np.testing.assert_allclose(online[col], expected[col], rtol=1e-5, equal_nan=True)
+
+    def test_emits_competitive_and_cyclical_features(self, history_df):
+        history, batch = _split_last_day(history_df)
+        online = OnlineFeatureStore.from_history(history, WINDOWS, LAGS).update(batch)
+        assert "price_vs_market_avg" in online.columns
+        assert "day_of_week_sin" in online.columns
+
+    def test_stale_rows_are_skipped(self, history_df):
+        history, _ = _split_last_day(history_df)
+        store = OnlineFeatureStore.from_history(history, WINDOWS, LAGS)
+        replay = history[history["date"] == history["date"].max()]
+        assert store.update(replay).empty
+
+    def test_new_series_are_added(self, history_df):
+        history, batch = _split_last_day(history_df)
+        store = OnlineFeatureStore.from_history(history, WINDOWS, LAGS)
+        batch = pd.concat([batch, batch.head(1).assign(canonical_name="bread")])
+        online = store.update(batch)
+        bread = online[online["canonical_name"] == "bread"].iloc[0]
+        assert len(store.keys) == 7
+        assert np.isnan(bread["price_lag_1d"])
+        assert bread["price_rol_mean_3d"] == pytest.approx(bread["prices"])
+
+    def test_step_matches_update_and_latest_can_be_overwritten(self, history_df):
+        history, batch = _split_last_day(history_df)
+        online = OnlineFeatureStore.from_history(history, WINDOWS, LAGS).update(batch)
+
+        store = OnlineFeatureStore.from_history(history, WINDOWS, LAGS)
+        ids = store.keys.get_indexer(pd.MultiIndex.from_frame(online[["canonical_name", "supermarket"]]))
+        day = batch["date"].max().to_datetime64().astype("datetime64[D]").astype(np.int64)
+        features = store.step(ids, online["prices"].to_numpy(), day)
+        for col in store.feature_columns:
+            np.testing.assert_allclose(features[col], online[col], equal_nan=True)
+
+        store.overwrite_latest(ids, np.zeros(len(ids)))
+        assert (store.latest(ids) == 0).all()
+        assert (store.last_date[ids] == day).all()
+
+    def test_save_and_mmap_roundtrip(self, history_df, tmp_path):
+        history, batch = _split_last_day(history_df)
+        OnlineFeatureStore.from_history(history, WINDOWS, LAGS).save(tmp_path)
+
+        store = OnlineFeatureStore.load(tmp_path)
+        assert isinstance(store.values, np.memmap)
+        store.update(batch)
+        store.save(tmp_path)
+
+        reloaded = OnlineFeatureStore.load(tmp_path, mmap=False)
+        np.testing.assert_array_equal(reloaded.values, store.values)
+        assert store.update(batch).empty
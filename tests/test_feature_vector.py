@@ -0,0 +1,41 @@
+"""Tests for the precompiled feature-vector builder."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from pricepoint.feature_vector import FeatureVectorBuilder
+
+
+class TestFeatureVectorBuilder:
+
+    def test_matches_get_dummies_reindex(self):
+        features = ["price_lag_1d", "supermarket_Aldi", "supermarket_Tesco", "price_rol_mean_7d", "own_brand"]
+        builder = FeatureVectorBuilder(features, ["supermarket"])
+        assert builder.numeric_features == ["price_lag_1d", "price_rol_mean_7d", "own_brand"]
+
+        values = {"price_lag_1d": 1.5, "price_rol_mean_7d": 1.25, "unused": 9.0}
+        for level in ["Tesco", "Aldi", "ASDA", "Lidl"]:
+            expected = (
+                pd.get_dummies(pd.DataFrame([{**values, "supermarket": level}]), columns=["supermarket"])
+                .reindex(columns=features, fill_value=0)
+                .to_numpy(dtype=np.float32)
+            )
+            row = builder.build(values, supermarket=level)
+            assert row.dtype == np.float32
+            np.testing.assert_array_equal(row, expected)
+
+    def test_reuses_buffer_and_resets_slots(self):
+        builder = FeatureVectorBuilder(["x", "supermarket_Tesco"])
+        first = builder.build({"x": 2.0}, supermarket="Tesco")
+        second = builder.build({})
+        assert first is second
+        np.testing.assert_array_equal(second, [[0.0, 0.0]])
+
+    def test_native_category_codes(self):
+        builder = FeatureVectorBuilder(
+            ["supermarket", "x"], ["supermarket"], {"supermarket": ["ASDA", "Tesco"]}, dtype=np.float64
+        )
+        np.testing.assert_array_equal(builder.build({"x": None}, supermarket="Tesco"), [[1.0, np.nan]])
+        np.testing.assert_array_equal(builder.build({"x": 3}, supermarket="Lidl"), [[np.nan, 3.0]])
@@ -0,0 +1,93 @@
+"""Tests for vectorized recursive forecasting."""
+
+from __future__ import annotations
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricepoint.feature_engineering import (
+    add_competitive_features,
+    add_cyclical_features,
+    add_temporal_features,
+)
+from pricepoint.forecasting import competitive_features, recursive_forecast
+
+WINDOWS, LAGS = [3, 7], [1, 7]
+
+
+def _engineer(df: pd.DataFrame) -> pd.DataFrame:
+    df = add_temporal_features(df, WINDOWS, LAGS)
+    return add_cyclical_features(add_competitive_features(df))
+
+
+@pytest.fixture
+def history() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-01", periods=20)
+    rows = [
+        (product, store, date)
+        for product in ["bananas", "milk", "bread", "eggs"]
+        for store in ["Tesco", "ASDA", "Aldi"]
+        for date in dates
+    ]
+    df = pd.DataFrame(rows, columns=["canonical_name", "supermarket", "date"])
+    df = df.sample(frac=0.9, random_state=0)  # ragged histories
+    df["prices"] = np.round(1 + rng.random(len(df)) * 2, 2)
+    df["own_brand"] = (df["supermarket"] == "Aldi").astype(int)
+    return _engineer(df)
+
+
+@pytest.fixture
+def model(history):
+    X = pd.get_dummies(history.drop(columns=["canonical_name", "date", "prices"]), columns=["supermarket"])
+    X = X.astype(float)
+    return lgb.LGBMRegressor(n_estimators=30, num_leaves=7, min_child_samples=5, verbose=-1).fit(
+        X, history["prices"]
+    )
+
+
+class TestCompetitiveFeatures:
+
+    def test_matches_pandas(self):
+        df = pd.DataFrame({
+            "canonical_name": ["a", "a", "a", "b", "b", "c"],
+            "date": pd.Timestamp("2024-01-01"),
+            "prices": [2.0, 1.0, 2.0, 3.0, np.nan, 5.0],
+        })
+        expected = add_competitive_features(df)
+        got = competitive_features(pd.factorize(df["canonical_name"])[0], df["prices"].to_numpy())
+        for col, values in got.items():
+            np.testing.assert_allclose(values, expected[col].to_numpy(dtype=float), equal_nan=True)
+
+
+class TestRecursiveForecast:
+
+    def test_matches_feature_pipeline_step_by_step(self, history, model):
+        features = list(model.feature_name_)
+        cube = recursive_forecast(model, features, history, 3, WINDOWS, LAGS)
+        assert cube.values.shape == (12, 3)
+        assert str(cube.dates[0]) == "2024-01-21"
+
+        # Re-derive each step with the batch feature pipeline.
+        base = history[["canonical_name", "supermarket", "date", "prices", "own_brand"]]
+        last = base.sort_values("date").groupby(["canonical_name", "supermarket"]).tail(1)
+        frame = cube.to_frame()
+        for h, day in enumerate(pd.to_datetime(cube.dates)):
+            step = last.assign(date=day)
+            engineered = _engineer(pd.concat([base, step]))
+            rows = engineered[engineered["date"] == day]
+            X = pd.get_dummies(
+                rows.drop(columns=["canonical_name", "date", "prices"]), columns=["supermarket"]
+            ).reindex(columns=features, fill_value=0).astype(float)
+            expected = rows[["canonical_name", "supermarket"]].assign(expected=model.predict(X))
+            got = frame[frame["horizon"] == h + 1].merge(expected, on=["canonical_name", "supermarket"])
+            np.testing.assert_allclose(got["forecast"], got["expected"], rtol=1e-5)
+
+            # The forecast becomes that day's price for the next step.
+            last = step.drop(columns="prices").merge(
+                got[["canonical_name", "supermarket", "forecast"]].rename(columns={"forecast": "prices"}),
+                on=["canonical_name", "supermarket"],
+            )
+            base = pd.concat([base, last])
@@ -0,0 +1,81 @@
+"""Tests for warm-start incremental retraining."""
+
+from __future__ import annotations
+
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricepoint.incremental import feature_matrix, run_incremental_training
+from pricepoint.registry import ModelRegistry
+from pricepoint.training import run_training
+
+
+@pytest.fixture
+def settings(tmp_settings):
+    """Settings pointing at a synthetic feature file with a drifting target."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-01", periods=40)
+    n = len(dates) * 30
+    df = pd.DataFrame({
+        "canonical_name": "p",
+        "supermarket": rng.choice(["Tesco", "ASDA", "Aldi"], n),
+        "date": np.repeat(dates, 30),
+        "price_lag_1d": rng.random(n) * 3,
+    })
+    # Later days are priced higher, so a model fit on early days is stale.
+    drift = (df["date"] - dates[0]).dt.days / 20
+    df["prices"] = df["price_lag_1d"] + drift + (df["supermarket"] == "Aldi") * -0.5
+    s = tmp_settings
+    df.to_parquet(s.data.processed_dir / "features.parquet", index=False)
+    s.model = dataclasses.replace(s.model, lgbm_params={**s.model.lgbm_params, "n_estimators": 30})
+    s.training = dataclasses.replace(
+        s.training, test_days=5, incremental_window_days=10, incremental_rounds=30
+    )
+    return s
+
+
+class TestIncremental:
+
+    def test_feature_matrix_aligns_one_hot_columns(self):
+        df = pd.DataFrame({
+            "supermarket": ["Tesco", "Lidl", None],
+            "x": [1.0, 2.0, 3.0],
+            "prices": [1.0, 2.0, np.nan],
+        })
+        X, y = feature_matrix(df, ["x", "supermarket_Tesco", "supermarket_Aldi"])
+        assert list(X.columns) == ["x", "supermarket_Tesco", "supermarket_Aldi"]
+        assert X["supermarket_Tesco"].tolist() == [1, 0]
+        assert len(y) == 2
+
+    def test_promotes_improved_model_through_the_registry(self, settings):
+        run_training(settings)
+        trained = settings.model.model_path.read_bytes()
+        report = run_incremental_training(settings, "continue")
+
+        assert report["promoted"]
+        assert report["candidate_MAE"] < report["previous_MAE"]
+        registry = ModelRegistry(settings.model.registry_dir)
+        assert registry.current_version() == report["version"] == "v0002"
+        assert registry.manifest()["source"] == "incremental-continue"
+        assert registry.load().num_trees() == 60
+        assert settings.model.model_path.read_bytes() == trained
+        assert registry.rollback() == "v0001"
+
+    def test_warm_starts_from_the_registry_version(self, settings):
+        run_training(settings)
+        run_incremental_training(settings, "continue")
+        ModelRegistry(settings.model.registry_dir).rollback()
+
+        report = run_incremental_training(settings, "continue")
+        assert report["num_trees"] == 60  # v0001's 30 trees + 30, not v0002's 60 + 30
+
+    def test_keeps_model_below_min_improvement(self, settings):
+        settings.training = dataclasses.replace(settings.training, min_improvement=0.99)
+        run_training(settings)
+        report = run_incremental_training(settings, "refit")
+
+        assert not report["promoted"]
+        assert ModelRegistry(settings.model.registry_dir).versions() == ["v0001"]
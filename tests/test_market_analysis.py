@@ -0,0 +1,134 @@
+"""Tests for the daily market metrics and the concurrent precompute orchestrator."""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricepoint import market_analysis
+from pricepoint.market_analysis import (
+    METRICS_COLUMNS,
+    calculate_hhi,
+    compute_market_dispersion,
+    compute_market_metrics,
+    run_precompute,
+)
+
+
+@pytest.fixture
+def settings(market_settings):
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-01", periods=30)
+    rows = [
+        pd.DataFrame({
+            "canonical_name": f"p{i}",
+            "category": f"c{i % 3}",
+            "supermarket": store,
+            "date": dates,
+            "prices": 2 + rng.normal(0, 0.1, len(dates)),
+            "product_name": f"{store} product {i}",
+            "own_brand": i % 4 == 0,
+        })
+        for i in range(12)
+        for store in ["Tesco", "ASDA", "Aldi"][: 2 + i % 2]
+    ]
+    path = market_settings.data.processed_dir / market_settings.matching.output_filename
+    pd.concat(rows, ignore_index=True).to_parquet(path)
+    return market_settings
+
+
+class TestMarketMetrics:
+
+    def test_matches_per_category_day_reference(self):
+        df = pd.DataFrame({
+            "category": ["milk"] * 6 + ["bread"] * 2,
+            "date": pd.to_datetime(["2024-01-01"] * 5 + ["2024-01-02"] + ["2024-01-01"] * 2),
+            "canonical_name": ["m1", "m1", "m1", "m2", "m2", "m1", "b1", "b1"],
+            "supermarket": ["Tesco", "Tesco", "Aldi", "Aldi", "ASDA", "Tesco", "Aldi", "Tesco"],
+            "prices": [1.0, 1.2, 0.9, 2.0, 2.5, 1.0, 1.5, 1.5],
+        })
+        metrics = compute_market_metrics(df).set_index(["category", "date"])
+        assert list(metrics.columns) == METRICS_COLUMNS
+        milk = metrics.loc[("milk", pd.Timestamp("2024-01-01"))]
+
+        # Listings: Tesco 2, Aldi 2, ASDA 1.
+        assert milk["n_listings"] == 5 and milk["n_retailers"] == 3 and milk["n_products"] == 2
+        assert milk["hhi"] == pytest.approx(40**2 + 40**2 + 20**2)
+        # Retailer means: m1 Tesco 1.1 / Aldi 0.9, m2 Aldi 2.0 / ASDA 2.5.
+        expected = np.mean([np.std([1.1, 0.9], ddof=1) / 1.0, np.std([2.0, 2.5], ddof=1) / 2.25])
+        assert milk["dispersion"] == pytest.approx(expected, rel=1e-6)
+        assert milk["cheapest_retailer"] == "Aldi" and milk["cheapest_share"] == 1.0
+        assert milk["coverage"] == pytest.approx(2 / 3)
+
+        single = metrics.loc[("milk", pd.Timestamp("2024-01-02"))]
+        assert np.isnan(single["dispersion"]) and np.isnan(single["cheapest_share"])
+        assert single["hhi"] == 10_000
+
+        bread = metrics.loc[("bread", pd.Timestamp("2024-01-01"))]
+        assert bread["dispersion"] == 0 and bread["cheapest_retailer"] == "Aldi"  # tie → first by name
+
+    def test_own_brand_split_partitions_listings(self, settings):
+        df = pd.read_parquet(settings.data.processed_dir / settings.matching.output_filename)
+        split = compute_market_metrics(df, by_own_brand=True)
+        whole = compute_market_metrics(df)
+        assert set(split["own_brand"]) == {True, False}
+        totals = split.groupby(["category", "date"], observed=True)["n_listings"].sum()
+        np.testing.assert_array_equal(totals.to_numpy(), whole["n_listings"].to_numpy())
+
+
+class TestRunPrecompute:
+
+    def test_single_scan_outputs_and_timings(self, settings):
+        tasks = ["dispersion", "leadership", "timeline", "hhi", "metrics", "events"]
+        timings = run_precompute(settings, tasks=tasks, workers=2)
+        assert sorted(t.task for t in timings) == sorted(tasks)
+        assert all(t.status == "ok" and t.seconds >= 0 for t in timings)
+        assert (settings.price_cube.output_dir / "index.json").exists()
+
+        md_dir = settings.market_dynamics.output_dir
+        canonical = pd.read_parquet(settings.data.processed_dir / settings.matching.output_filename)
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(md_dir / "hhi_index.parquet"), calculate_hhi(canonical), check_dtype=False
+        )
+        dispersion = pd.read_parquet(md_dir / "market_dispersion.parquet")["dispersion"]
+        np.testing.assert_allclose(dispersion.to_numpy(), compute_market_dispersion(canonical).to_numpy(), rtol=1e-5)
+        assert (md_dir / "price_leadership.parquet").exists()
+        assert (md_dir / "leadership_timeline.parquet").exists()
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(md_dir / "market_metrics.parquet"), compute_market_metrics(canonical)
+        )
+
+        report = json.loads((md_dir / "precompute_timings.json").read_text())
+        assert report["workers"] == 2 and len(report["tasks"]) == 6
+
+    def test_stale_cube_is_rebuilt(self, settings):
+        run_precompute(settings, tasks=["dispersion"])
+        path = settings.data.processed_dir / settings.matching.output_filename
+        canonical = pd.read_parquet(path)
+        canonical = canonical[canonical["date"] < canonical["date"].max()]
+        canonical.to_parquet(path)
+
+        run_precompute(settings, tasks=["dispersion"])
+        dispersion = pd.read_parquet(settings.market_dynamics.output_dir / "market_dispersion.parquet")
+        assert dispersion.index.max() == canonical["date"].max()
+
+    def test_failed_task_does_not_stop_the_others(self, settings, monkeypatch):
+        def broken(*args, **kwargs):
+            raise ValueError("boom")
+
+        monkeypatch.setattr(market_analysis, "calculate_hhi", broken)
+        with pytest.raises(RuntimeError, match="'hhi' failed") as info:
+            run_precompute(settings, tasks=["hhi", "dispersion"])
+        assert isinstance(info.value.__cause__, ValueError)
+
+        md_dir = settings.market_dynamics.output_dir
+        assert (md_dir / "market_dispersion.parquet").exists()
+        report = json.loads((md_dir / "precompute_timings.json").read_text())
+        assert {t["task"]: t["status"] for t in report["tasks"]} == {"hhi": "failed", "dispersion": "ok"}
+
+    def test_unknown_task(self, settings):
+        with pytest.raises(ValueError, match="Unknown precompute tasks"):
+            run_precompute(settings, tasks=["dispersion", "nope"])
@@ -0,0 +1,135 @@
+"""Tests for the incremental market dynamics refresh."""
+
+from __future__ import annotations
+
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricepoint.market_analysis import (
+    compute_market_dispersion,
+    leadership_from_tensor,
+    run_precompute,
+)
+from pricepoint.market_incremental import LeadershipState
+from pricepoint.price_tensor import PriceTensor, build_price_cube, lagged_correlations
+
+RETAILERS = ["Tesco", "ASDA", "Aldi"]
+
+
+def _tensor(values: np.ndarray) -> PriceTensor:
+    n_products, _, n_days = values.shape
+    return PriceTensor(
+        products=np.array([f"p{i}" for i in range(n_products)], dtype=object),
+        retailers=np.array(RETAILERS, dtype=object),
+        dates=np.datetime64("2024-01-01") + np.arange(n_days),
+        values=values,
+    )
+
+
+class TestLeadershipState:
+
+    @pytest.mark.parametrize(("window", "max_lag"), [(10, 3), (3, 5), (25, 4)])
+    def test_sliding_matches_window_slice(self, window, max_lag):
+        rng = np.random.default_rng(0)
+        values = rng.random((30, 3, 40)).cumsum(axis=-1).astype(np.float32)
+        values[2, 1, :12] = np.nan  # listed late: incomplete until day 12
+        full = _tensor(values)
+        head = _tensor(values[..., :8])
+        middle = _tensor(values[..., :20])
+
+        state = LeadershipState.initialise(head, full.products[:20], window, max_lag)
+        state = state.refresh(middle, full.products[5:25])  # drops p0–p4, adds p20–p24
+        state = state.refresh(full, full.products)
+        assert state.length == window and state.end_date == full.dates[-1]
+
+        expected = lagged_correlations(values[..., -window:], max_lag)
+        complete = ~np.isnan(values[..., -window:]).any(axis=-1)
+        np.testing.assert_array_equal(state.complete, complete)
+        both = complete[:, :, None] & complete[:, None, :]
+        np.testing.assert_allclose(state.correlations()[both], expected[both], atol=1e-5)
+
+    def test_save_load_round_trip(self, tmp_path):
+        values = np.random.default_rng(1).random((4, 3, 12)).astype(np.float32)
+        state = LeadershipState.initialise(_tensor(values), ["p1", "p3"], 6, 2)
+        loaded = LeadershipState.load(state.save(tmp_path / "state.npz"))
+        assert loaded.products.tolist() == ["p1", "p3"] and loaded.end_date == state.end_date
+        np.testing.assert_array_equal(loaded.sxy, state.sxy)
+
+
+@pytest.fixture
+def canonical() -> pd.DataFrame:
+    """Tesco leads ASDA by two days on 12 products over 50 days."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-01", periods=50)
+    rows = []
+    for i in range(12):
+        tesco = 2 + np.cumsum(rng.normal(0, 0.1, len(dates) + 2))
+        series = {"Tesco": tesco[2:], "ASDA": tesco[:-2], "Aldi": 2 + rng.normal(0, 0.1, len(dates))}
+        for store, prices in series.items():
+            rows.append(pd.DataFrame({
+                "canonical_name": f"p{i}", "supermarket": store, "date": dates, "prices": prices,
+            }))
+    return pd.concat(rows, ignore_index=True)
+
+
+@pytest.fixture
+def settings(market_settings):
+    market_settings.market_dynamics = dataclasses.replace(
+        market_settings.market_dynamics, max_lag_days=4, min_correlation=0.3, leadership_window_days=20
+    )
+    return market_settings
+
+
+class TestIncrementalPrecompute:
+
+    def test_refresh_matches_full_recompute(self, settings, canonical):
+        path = settings.data.processed_dir / settings.matching.output_filename
+        md_dir = settings.market_dynamics.output_dir
+        for days in (35, 43, 50):
+            canonical[canonical["date"] < canonical["date"].min() + pd.Timedelta(days=days)].to_parquet(path)
+            build_price_cube(settings)
+            run_precompute(settings, tasks=["dispersion", "leadership"], incremental=True)
+
+        dispersion = pd.read_parquet(md_dir / "market_dispersion.parquet")["dispersion"]
+        assert dispersion.index.is_unique and len(dispersion) == 50
+        np.testing.assert_allclose(dispersion.to_numpy(), compute_market_dispersion(canonical).to_numpy(), rtol=1e-5)
+
+        cube = PriceTensor.load(settings.price_cube.output_dir)
+        expected = leadership_from_tensor(cube.days(-20), 4, 0.3)
+        leadership = pd.read_parquet(md_dir / "price_leadership_window.parquet")
+        assert not (md_dir / "price_leadership.parquet").exists()
+        pd.testing.assert_frame_equal(leadership, expected)
+        assert ("Tesco", "ASDA") in set(zip(leadership["leader"], leadership["follower"]))
+
+    def test_appends_new_days_without_rebuilding_the_cube(self, settings, canonical, monkeypatch):
+        path = settings.data.processed_dir / settings.matching.output_filename
+        start = canonical["date"].min()
+        canonical[canonical["date"] < start + pd.Timedelta(days=35)].to_parquet(path)
+        run_precompute(settings, tasks=["dispersion", "leadership"], incremental=True)
+
+        def full_rebuild(*args, **kwargs):
+            raise AssertionError("the price cube was rebuilt from the whole canonical table")
+
+        monkeypatch.setattr("pricepoint.market_analysis.build_price_cube", full_rebuild)
+        monkeypatch.setattr("pricepoint.price_tensor.build_price_cube", full_rebuild)
+        for days in (36, 40):
+            current = canonical[canonical["date"] < start + pd.Timedelta(days=days)]
+            current.to_parquet(path)
+            run_precompute(settings, tasks=["dispersion", "leadership"], incremental=True)
+
+        cube = PriceTensor.load(settings.price_cube.output_dir)
+        expected = PriceTensor.from_frame(current)
+        np.testing.assert_array_equal(cube.dates, expected.dates)
+        np.testing.assert_array_equal(cube.values, expected.values)
+        dispersion = pd.read_parquet(settings.market_dynamics.output_dir / "market_dispersion.parquet")
+        assert len(dispersion) == 40
+
+    def test_only_incremental_tasks(self, settings, canonical):
+        canonical.to_parquet(settings.data.processed_dir / settings.matching.output_filename)
+        with pytest.raises(ValueError, match="Unknown incremental precompute tasks"):
+            run_precompute(settings, tasks=["dispersion", "hhi"], incremental=True)
+        timings = run_precompute(settings, incremental=True)
+        assert sorted(t.task for t in timings) == ["dispersion", "leadership"]
@@ -0,0 +1,30 @@
+"""Tests for process pools with per-worker state."""
+
+from __future__ import annotations
+
+import os
+
+from pricepoint.parallel import init_worker, spawn_pool, worker_state
+
+
+def _state(scale: int) -> dict[str, int]:
+    return {"scale": scale, "pid": os.getpid()}
+
+
+def _task(x: int) -> tuple[int, int]:
+    state = worker_state()
+    return x * state["scale"], state["pid"]
+
+
+class TestWorkerState:
+
+    def test_in_process_init_replaces_state(self):
+        init_worker(_state, 2)
+        init_worker(_state, 3)
+        assert _task(2) == (6, os.getpid())
+
+    def test_spawned_workers_run_setup(self):
+        with spawn_pool(1, _state, 5) as pool:
+            results = list(pool.map(_task, [1, 2]))
+        assert [r[0] for r in results] == [5, 10]
+        assert {r[1] for r in results} != {os.getpid()}
@@ -0,0 +1,86 @@
+"""Tests for run-length price event detection."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricepoint.price_events import (
+    EVENT_COLUMNS,
+    detect_price_events,
+    label_rows,
+    price_runs,
+)
+
+DATES = pd.date_range("2024-01-01", periods=60)
+
+
+def series(prices, product="milk", store="Tesco") -> pd.DataFrame:
+    return pd.DataFrame({"canonical_name": product, "supermarket": store, "date": DATES, "prices": prices})
+
+
+@pytest.fixture
+def prices() -> pd.DataFrame:
+    milk = np.full(60, 2.0)
+    milk[10:17] = 1.5  # one-week promotion
+    milk[30:] = 2.4  # permanent repricing …
+    milk[45] = 5.0  # … with a one-day scraping error
+    bread = np.full(60, 1.2)
+    bread[50:] = 1.0  # cut that held only 8 days …
+    bread[58:] = 0.5  # … before a deep drop the series ends in
+    return pd.concat([series(milk), series(bread, "bread", "Aldi")], ignore_index=True)
+
+
+class TestPriceRuns:
+
+    def test_duplicates_are_averaged_and_gaps_do_not_split_runs(self):
+        df = series(np.full(60, 2.0)).drop(index=range(5, 10))
+        extra = pd.DataFrame({"canonical_name": "milk", "supermarket": "Tesco",
+                              "date": DATES[[20, 20]], "prices": [1.0, 3.0]})
+        runs = price_runs(pd.concat([extra, df]))
+        assert len(runs) == 1 and runs["n_obs"].iloc[0] == 55
+        assert runs["start"].iloc[0] == DATES[0] and runs["end"].iloc[0] == DATES[-1]
+
+
+class TestDetectPriceEvents:
+
+    def test_dip_spike_and_step(self, prices):
+        events = detect_price_events(prices)
+        assert list(events.columns) == EVENT_COLUMNS
+        milk = events.set_index("event")
+        assert set(events["canonical_name"]) == {"milk"}
+
+        dip = milk.loc["dip"]
+        assert (dip["start"], dip["end"], dip["days"]) == (DATES[10], DATES[16], 7)
+        assert dip["depth"] == pytest.approx(-0.25)
+        step = milk.loc["step"]
+        assert step["start"] == DATES[30] and step["price_before"] == 2.0
+        assert step["depth"] == pytest.approx(0.2)
+        spike = milk.loc["spike"]
+        assert spike["start"] == DATES[45] and spike["days"] == 1
+
+    def test_thresholds_and_order_independence(self, prices):
+        shuffled = prices.sample(frac=1, random_state=0)
+        pd.testing.assert_frame_equal(detect_price_events(shuffled), detect_price_events(prices))
+
+        # The 8-day cut counts once steps need to hold only a week.
+        bread = detect_price_events(prices, min_step_days=7)
+        bread = bread[bread["canonical_name"] == "bread"]
+        assert bread["event"].tolist() == ["step"] and bread["start"].iloc[0] == DATES[50]
+        assert detect_price_events(prices, min_depth=0.3)["event"].tolist() == ["step", "spike"]
+
+
+class TestLabelRows:
+
+    def test_rows_inside_events(self, prices):
+        events = detect_price_events(prices)
+        labels = label_rows(prices, events)
+        milk = labels[prices["canonical_name"] == "milk"].to_numpy()
+        assert (milk[10:17] == "dip").all() and pd.isna(milk[17:30]).all()
+        assert milk[45] == "spike" and (milk[30:45] == "step").all() and pd.isna(milk[46:]).all()
+        assert labels[prices["canonical_name"] == "bread"].isna().all()
+
+        categorical = prices.astype({"canonical_name": "category", "supermarket": "category"})
+        pd.testing.assert_series_equal(label_rows(categorical, events), labels)
+        assert label_rows(prices, events.iloc[:0]).isna().all()
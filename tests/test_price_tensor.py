@@ -0,0 +1,224 @@
+"""Tests for the price tensor and batched lag correlations."""
+
+from __future__ import annotations
+
+import dataclasses
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricepoint.config import load_settings
+from pricepoint.market_analysis import (
+    LEADERSHIP_COLUMNS,
+    compute_market_dispersion,
+    compute_price_leadership,
+    dispersion_from_tensor,
+    leadership_from_tensor,
+    leadership_timeline,
+    timeline_windows,
+)
+from pricepoint.price_tensor import PriceTensor, forward_fill, lagged_correlations
+
+RETAILERS = ["Tesco", "ASDA", "Aldi"]
+
+
+@pytest.fixture
+def prices() -> pd.DataFrame:
+    """Tesco moves first; ASDA copies it two days later, Aldi is noise."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-01", periods=60)
+    rows = []
+    for i in range(40):
+        tesco = 2 + np.cumsum(rng.normal(0, 0.1, len(dates) + 2))
+        series = {
+            "Tesco": tesco[2:],
+            "ASDA": tesco[:-2] + rng.normal(0, 0.01, len(dates)),
+            "Aldi": 2 + rng.normal(0, 0.1, len(dates)),
+        }
+        for store, values in series.items():
+            rows.append(pd.DataFrame({
+                "canonical_name": f"p{i}", "supermarket": store, "date": dates, "prices": values,
+            }))
+    return pd.concat(rows, ignore_index=True)
+
+
+class TestPriceTensor:
+
+    def test_pivot_averages_duplicates_and_forward_fills(self):
+        df = pd.DataFrame({
+            "canonical_name": ["a", "a", "a", "b"],
+            "supermarket": ["Tesco", "Tesco", "Tesco", "ASDA"],
+            "date": pd.to_datetime(["2024-01-01", "2024-01-01", "2024-01-03", "2024-01-02"]),
+            "prices": [1.0, 2.0, 4.0, 5.0],
+        })
+        tensor = PriceTensor.from_frame(df)
+        assert tensor.values.shape == (2, 2, 3)
+        np.testing.assert_array_equal(tensor.values[0, 0], [1.5, 1.5, 4.0])
+        np.testing.assert_array_equal(tensor.values[1, 1], [np.nan, 5.0, 5.0])
+        assert tensor.complete.tolist() == [[True, False], [False, False]]
+
+    def test_forward_fill(self):
+        x = np.array([[np.nan, 1, np.nan, 3, np.nan]])
+        np.testing.assert_array_equal(forward_fill(x), [[np.nan, 1, 1, 3, 3]])
+
+    def test_forward_fill_limit(self):
+        x = np.array([[1, np.nan, np.nan, np.nan, 5, np.nan]])
+        np.testing.assert_array_equal(forward_fill(x, limit=2), [[1, 1, 1, np.nan, 5, 5]])
+        np.testing.assert_array_equal(forward_fill(x, limit=0), x)
+
+
+@pytest.fixture
+def gappy(prices) -> pd.DataFrame:
+    """``prices`` with a fifth of the observations missing."""
+    keep = np.random.default_rng(1).random(len(prices)) > 0.2
+    return prices[keep].reset_index(drop=True)
+
+
+class TestPriceCube:
+
+    def test_presence_marks_observed_cells_only(self, gappy):
+        cube = PriceTensor.from_frame(gappy, max_fill_days=3)
+        assert cube.max_fill_days == 3
+        observed = cube.observed
+        assert observed.sum() == len(gappy)
+        assert np.isnan(cube.values[observed]).sum() == 0
+        np.testing.assert_array_equal(
+            cube.values, forward_fill(np.where(observed, cube.values, np.nan), limit=3)
+        )
+
+    def test_save_load_round_trip(self, gappy, tmp_path):
+        cube = PriceTensor.from_frame(gappy)
+        loaded = PriceTensor.load(cube.save(tmp_path / "cube"))
+        assert isinstance(loaded.values, np.memmap)
+        np.testing.assert_array_equal(loaded.values, cube.values)
+        np.testing.assert_array_equal(loaded.observed, cube.observed)
+        np.testing.assert_array_equal(loaded.dates, cube.dates)
+        assert loaded.products.tolist() == cube.products.tolist()
+        assert loaded.retailers.tolist() == cube.retailers.tolist()
+        assert loaded.max_fill_days is None
+
+    def test_day_frame_matches_pivot(self, gappy):
+        cube = PriceTensor.from_frame(gappy)
+        latest = gappy[gappy["date"] == gappy["date"].max()]
+        expected = latest.pivot_table(index="canonical_name", columns="supermarket", values="prices")
+        result = cube.day_frame()[expected.columns].loc[expected.index]
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-6)
+
+    def test_observed_on_matches_observed(self, gappy, tmp_path):
+        cube = PriceTensor.from_frame(gappy)
+        loaded = PriceTensor.load(cube.save(tmp_path))
+        for day in [0, 7, 8, len(cube.dates) - 1, -1]:
+            np.testing.assert_array_equal(loaded.observed_on(day), cube.observed[:, :, day])
+
+    @pytest.mark.parametrize("max_fill_days", [None, 3, 0])
+    def test_extend_matches_full_build(self, gappy, tmp_path, max_fill_days):
+        late = pd.DataFrame({
+            "canonical_name": "late", "supermarket": "Aldi",
+            "date": pd.date_range("2024-02-20", periods=5), "prices": 1.5,
+        })
+        full = pd.concat([gappy, late], ignore_index=True)
+        cutoff = pd.Timestamp("2024-02-10")
+        head = PriceTensor.from_frame(full[full["date"] < cutoff], max_fill_days=max_fill_days)
+        head.save(tmp_path, headroom=0.5)
+
+        extended = PriceTensor.extend(tmp_path, full[full["date"] >= cutoff - pd.Timedelta(days=3)])
+        expected = PriceTensor.from_frame(full, max_fill_days=max_fill_days)
+        assert isinstance(extended.values, np.memmap)
+        assert extended.products.tolist() == expected.products.tolist()
+        np.testing.assert_array_equal(extended.dates, expected.dates)
+        np.testing.assert_array_equal(extended.values, expected.values)
+        np.testing.assert_array_equal(extended.observed, expected.observed)
+        reloaded = PriceTensor.load(tmp_path, mmap=False)
+        np.testing.assert_array_equal(reloaded.presence, expected.presence)
+
+    def test_extend_without_capacity(self, gappy, tmp_path):
+        cutoff = pd.Timestamp("2024-02-10")
+        PriceTensor.from_frame(gappy[gappy["date"] < cutoff]).save(tmp_path)
+        assert PriceTensor.extend(tmp_path, gappy) is None
+        assert PriceTensor.load(tmp_path).dates[-1] < cutoff
+
+    def test_dispersion_matches_groupby(self, gappy):
+        expected = compute_market_dispersion(gappy)
+        result = dispersion_from_tensor(PriceTensor.from_frame(gappy), block_size=7)
+        assert result.index.equals(expected.index)
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-5)
+
+    def test_select_unknown_product(self, prices):
+        with pytest.raises(KeyError):
+            PriceTensor.from_frame(prices).select(["p0", "missing"])
+
+
+class TestLaggedCorrelations:
+
+    def test_matches_pandas_shifted_corr(self, prices):
+        tensor = PriceTensor.from_frame(prices[prices["canonical_name"].isin(["p0", "p1"])])
+        corr = lagged_correlations(tensor.values, 3, block_size=1)
+        for p in range(2):
+            for a in range(3):
+                for b in range(3):
+                    s1 = pd.Series(tensor.values[p, a].astype(float))
+                    s2 = pd.Series(tensor.values[p, b].astype(float))
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore", RuntimeWarning)
+                        expected = [s1.corr(s2.shift(lag)) for lag in range(-3, 4)]
+                    np.testing.assert_allclose(corr[p, a, b], expected, rtol=1e-5, atol=1e-6)
+
+    def test_constant_series_is_nan(self):
+        values = np.ones((1, 2, 10))
+        values[0, 1] = np.arange(10)
+        corr = lagged_correlations(values, 1)
+        assert np.isnan(corr[0, 0]).all()
+
+
+class TestLeadership:
+
+    def test_detects_two_day_leader(self, prices):
+        settings = load_settings()
+        settings.market_dynamics = dataclasses.replace(
+            settings.market_dynamics, sample_size=None, max_lag_days=5, min_correlation=0.5
+        )
+        result = compute_price_leadership(prices, settings).set_index(["leader", "follower"])
+        assert result.loc[("Tesco", "ASDA"), "median_lag_days"] == -2
+        assert result.loc[("ASDA", "Tesco"), "median_lag_days"] == 2
+        assert result.loc[("Tesco", "ASDA"), "n_products_analyzed"] == 40
+
+        from_cube = compute_price_leadership(PriceTensor.from_frame(prices), settings)
+        pd.testing.assert_frame_equal(
+            from_cube.set_index(["leader", "follower"]).sort_index(), result.sort_index()
+        )
+
+    def test_monthly_timeline_matches_per_month_leadership(self, prices):
+        # Aldi joins mid-January, so its series only counts in February.
+        late = (prices["supermarket"] == "Aldi") & (prices["date"] < "2024-01-15")
+        tensor = PriceTensor.from_frame(prices[~late])
+        timeline = leadership_timeline(tensor, 5, 0.5, freq="M")
+        assert timeline["window_start"].drop_duplicates().dt.month.tolist() == [1, 2]
+
+        for (start, end), window in timeline.groupby(["window_start", "window_end"]):
+            days = (tensor.dates >= start.to_datetime64()) & (tensor.dates <= end.to_datetime64())
+            sliced = PriceTensor(tensor.products, tensor.retailers, tensor.dates[days], tensor.values[..., days])
+            expected = leadership_from_tensor(sliced, 5, 0.5)
+            pd.testing.assert_frame_equal(window[LEADERSHIP_COLUMNS].reset_index(drop=True), expected)
+        january = timeline[timeline["window_start"].dt.month == 1]
+        assert "Aldi" not in set(january["leader"]) | set(january["follower"])
+        tesco = timeline[(timeline["leader"] == "Tesco") & (timeline["follower"] == "ASDA")]
+        assert tesco["median_lag_days"].tolist() == [-2, -2]
+
+    def test_rolling_windows_end_on_the_last_day(self, prices):
+        tensor = PriceTensor.from_frame(prices)
+        starts, stops = timeline_windows(tensor.dates, window_days=30, step_days=7)
+        assert stops[-1] == len(tensor.dates) and (stops - starts == 30).all()
+        assert (np.diff(stops) == 7).all() and stops[0] - 7 < 30
+
+        timeline = leadership_timeline(tensor, 5, 0.5, window_days=30, step_days=7)
+        assert timeline["window_end"].nunique() == len(stops)
+        assert (timeline["window_end"] - timeline["window_start"]).dt.days.eq(29).all()
+
+    def test_lags_longer_than_series(self):
+        values = np.random.default_rng(0).random((2, 2, 4))
+        corr = lagged_correlations(values, 5)
+        assert corr.shape == (2, 2, 2, 11)
+        assert np.isnan(corr[..., :3]).all() and np.isnan(corr[..., -3:]).all()
+        assert not np.isnan(corr[..., 5]).any()
@@ -0,0 +1,67 @@
+"""Tests for the versioned model registry."""
+
+from __future__ import annotations
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricepoint.registry import ModelRegistry
+
+
+@pytest.fixture
+def models() -> tuple[list, np.ndarray]:
+    """Two sklearn models of different sizes and a probe matrix."""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((300, 4)), columns=["a", "b", "c", "d"])
+    y = X["a"] * 2 + X["b"]
+    fitted = [
+        lgb.LGBMRegressor(n_estimators=n, num_leaves=7, verbose=-1).fit(X, y) for n in (10, 20)
+    ]
+    return fitted, X.to_numpy()[:50]
+
+
+class TestModelRegistry:
+
+    def test_register_and_load_without_pickle(self, tmp_path, models):
+        fitted, probe = models
+        registry = ModelRegistry(tmp_path)
+        version = registry.register(fitted[0], {"MAE": 0.1}, data_fingerprint="abc")
+
+        assert version == "v0001"
+        assert registry.current_version() == version
+        manifest = registry.manifest()
+        assert manifest["feature_names"] == ["a", "b", "c", "d"]
+        assert manifest["dtypes"]["a"] == "float32"
+        assert manifest["data_fingerprint"] == "abc"
+
+        expected = fitted[0].predict(probe)
+        np.testing.assert_allclose(registry.load(kind="booster").predict(probe), expected, rtol=1e-9)
+        forest = registry.load(kind="flat")
+        assert isinstance(forest.threshold, np.memmap)
+        np.testing.assert_allclose(forest.predict(probe), expected, rtol=1e-9)
+
+    def test_rollback_restores_previous_current(self, tmp_path, models):
+        fitted, _ = models
+        registry = ModelRegistry(tmp_path)
+        registry.register(fitted[0], {"MAE": 0.2})
+        registry.register(fitted[1], {"MAE": 0.1})
+        assert registry.load().num_trees() == 20
+
+        assert registry.rollback() == "v0001"
+        assert registry.load().num_trees() == 10
+        with pytest.raises(RuntimeError):
+            registry.rollback()
+        assert registry.rollback("v0002") == "v0002"
+
+    def test_prune_keeps_current(self, tmp_path, models):
+        fitted, _ = models
+        registry = ModelRegistry(tmp_path)
+        for model in fitted * 2:
+            registry.register(model, {"MAE": 0.1})
+        registry.rollback("v0001")
+
+        assert registry.prune(keep=2) == ["v0002", "v0003"]
+        assert registry.versions() == ["v0001", "v0004"]
+        assert registry.current_version() == "v0001"
@@ -0,0 +1,77 @@
+"""Tests for chunked batch scoring."""
+
+from __future__ import annotations
+
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from pricepoint.scoring import build_column_plan, fill_matrix, run_scoring
+from pricepoint.training import prepare_training_data, run_training
+
+
+@pytest.fixture
+def features() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 1500
+    df = pd.DataFrame({
+        "canonical_name": rng.choice(["bananas", "milk", "bread"], n),
+        "supermarket": rng.choice(["Tesco", "ASDA", "Aldi"], n),
+        "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 20, n), unit="D"),
+        "price_lag_1d": rng.random(n) * 3,
+    })
+    df["prices"] = df["price_lag_1d"] + (df["supermarket"] == "Aldi") * -0.5
+    return df
+
+
+class TestColumnPlan:
+
+    def test_plan_kinds(self):
+        schema = pa.schema([
+            ("supermarket", pa.string()), ("price_lag_1d", pa.float64()), ("canonical_name", pa.string()),
+        ])
+        plan = build_column_plan(
+            ["price_lag_1d", "supermarket_Tesco", "category_bakery"], schema
+        )
+        assert [kind for kind, _, _ in plan.sources] == ["numeric", "onehot", "missing"]
+        assert plan.input_columns == ["price_lag_1d", "supermarket"]
+
+        batch = pa.record_batch(
+            [pa.array(["Tesco", None]), pa.array([1.5, None]), pa.array(["a", "b"])], schema=schema
+        )
+        X = fill_matrix(plan, batch, np.full((4, 3), -1.0))
+        np.testing.assert_array_equal(X, [[1.5, 1.0, 0.0], [np.nan, 0.0, 0.0]])
+
+    def test_category_codes(self):
+        schema = pa.schema([("supermarket", pa.string())])
+        plan = build_column_plan(["supermarket"], schema, {"supermarket": ["ASDA", "Tesco"]})
+        batch = pa.record_batch([pa.array(["Tesco", "Lidl", None])], schema=schema)
+        X = fill_matrix(plan, batch, np.empty((3, 1)))
+        np.testing.assert_array_equal(X[:, 0], [1.0, np.nan, np.nan])
+
+
+class TestRunScoring:
+
+    def test_matches_model_predict(self, features, tmp_settings):
+        s = tmp_settings
+        features.to_parquet(s.data.processed_dir / "features.parquet", index=False)
+        s.scoring = dataclasses.replace(s.scoring, batch_rows=256)
+        run_training(s)
+
+        out = run_scoring(s, since="2024-01-15", num_threads=1)
+        preds = pd.read_parquet(out).sort_values(["canonical_name", "supermarket", "date"])
+        recent = features[features["date"] >= "2024-01-15"]
+        assert len(preds) == len(recent)
+        assert (out / "date=2024-01-15").is_dir()
+
+        import joblib
+
+        model = joblib.load(s.model.model_path)
+        X, _, _, _ = prepare_training_data(recent, test_days=0)
+        expected = recent.assign(
+            expected=model.predict(X.reindex(columns=model.feature_name_, fill_value=0))
+        ).sort_values(["canonical_name", "supermarket", "date"])
+        np.testing.assert_allclose(preds["prediction"], expected["expected"], rtol=1e-6)
@@ -0,0 +1,130 @@
+"""Tests for the micro-batching prediction service."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import numpy as np
+
+from pricepoint.service import (
+    MicroBatcher,
+    PredictionService,
+    build_service,
+    load_test,
+    service_column_plan,
+    vector_from_record,
+)
+
+
+class _SumPredictor:
+    def __init__(self) -> None:
+        self.calls: list[int] = []
+
+    def predict(self, X):
+        self.calls.append(len(X))
+        return X.sum(axis=1)
+
+
+class _NanPredictor:
+    def predict(self, X):
+        return np.where(X[:, 0] > 0, X[:, 0], np.nan)
+
+
+async def _post(port: int, body: bytes) -> tuple[int, bytes]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        b"POST /predict HTTP/1.1\r\nConnection: close\r\n"
+        + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), payload
+
+
+class TestVectorFromRecord:
+
+    def test_raw_and_model_columns(self):
+        plan = service_column_plan(["x", "supermarket_Tesco", "supermarket_Aldi"], ["supermarket"])
+        out = np.empty(3)
+        np.testing.assert_array_equal(vector_from_record(plan, {"x": 2, "supermarket": "Tesco"}, out), [2, 1, 0])
+        np.testing.assert_array_equal(vector_from_record(plan, {"x": None, "supermarket_Aldi": 1}, out), [np.nan, 0, 1])
+
+    def test_native_category_codes(self):
+        plan = service_column_plan(["supermarket", "x"], ["supermarket"], {"supermarket": ["ASDA", "Tesco"]})
+        out = np.empty(2)
+        np.testing.assert_array_equal(vector_from_record(plan, {"supermarket": "Tesco", "x": 1}, out), [1, 1])
+        np.testing.assert_array_equal(vector_from_record(plan, {"supermarket": "Lidl", "x": 1}, out), [np.nan, 1])
+
+
+class TestMicroBatcher:
+
+    def test_coalesces_concurrent_requests(self):
+        predictor = _SumPredictor()
+
+        async def main():
+            batcher = MicroBatcher(predictor, max_batch_size=8, max_wait_ms=50)
+            batcher.start()
+            try:
+                return await asyncio.gather(*(batcher.predict(np.array([i, 1.0])) for i in range(20))), batcher.metrics()
+            finally:
+                await batcher.stop()
+
+        preds, metrics = asyncio.run(main())
+        assert preds == [i + 1.0 for i in range(20)]
+        assert predictor.calls == [8, 8, 4]
+        assert metrics["requests"] == 20
+        assert metrics["max_batch_size"] == 8
+        assert metrics["queue_depth"] == 0
+
+
+class TestPredictionService:
+
+    def test_http_predict_matches_model(self, trained_settings):
+        records = [
+            {"supermarket": "Aldi", "price_lag_1d": 0.5},
+            {"supermarket": "Tesco", "price_lag_1d": 2.5},
+        ]
+
+        async def main():
+            service = build_service(trained_settings)
+            port = await service.start("127.0.0.1", 0)
+            try:
+                expected = service.batcher.predictor.predict(
+                    np.stack([vector_from_record(service.plan, r, np.empty(len(service.plan.feature_names)))
+                              for r in records])
+                )
+                status, body = await service._route("POST", "/predict", b'{"rows": []}')
+                assert (status, body["predictions"]) == (200, [])
+                result = await load_test("127.0.0.1", port, records, n_requests=40, concurrency=4, rows_per_request=2)
+                _, body = await service._route("POST", "/predict", json.dumps({"rows": records}).encode())
+                return expected, body, result
+            finally:
+                await service.stop()
+
+        expected, body, result = asyncio.run(main())
+        np.testing.assert_allclose(body["predictions"], expected, rtol=1e-9)
+        assert body["predictions"][0] < body["predictions"][1]
+        assert result["errors"] == 0
+        assert result["requests"] == 40
+        assert result["server"]["requests"] == 80
+
+    def test_rejects_non_objects_and_never_emits_nan(self):
+        plan = service_column_plan(["x"], [])
+
+        async def main():
+            service = PredictionService(MicroBatcher(_NanPredictor(), max_batch_size=8, max_wait_ms=1), plan)
+            port = await service.start("127.0.0.1", 0)
+            try:
+                rejected = [await _post(port, body) for body in (b"[1]", b'{"rows": [1]}', b'{"rows": 5}')]
+                accepted = await _post(port, b'{"rows": [{"x": 2}, {"x": -1}]}')
+                return rejected, accepted
+            finally:
+                await service.stop()
+
+        rejected, (status, payload) = asyncio.run(main())
+        assert [s for s, _ in rejected] == [400, 400, 400]
+        assert status == 200 and b"NaN" not in payload
+        assert json.loads(payload)["predictions"] == [2.0, None]
@@ -0,0 +1,153 @@
+"""Tests for content-addressed stage caching."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricepoint.registry import ModelRegistry
+from pricepoint.stage_cache import (
+    Stage,
+    manifest_path,
+    pipeline_stages,
+    run_cached,
+    run_stage,
+    stage_fingerprint,
+)
+from pricepoint.streaming import run_streaming_training
+from pricepoint.training import run_training
+
+
+@dataclass(frozen=True)
+class _Cfg:
+    alpha: float
+
+
+@pytest.fixture
+def stage_files(tmp_path):
+    src = tmp_path / "input.parquet"
+    pd.DataFrame({"x": [1, 2, 3]}).to_parquet(src)
+    return src, tmp_path / "output.txt"
+
+
+def _make_stage(src, out, alpha=1.0):
+    return Stage(
+        name="demo",
+        inputs=[src],
+        outputs=[out],
+        configs=(_Cfg(alpha),),
+        modules=("pricepoint.stage_cache",),
+    )
+
+
+class _Counter:
+    def __init__(self, out):
+        self.out = out
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        self.out.write_text("done")
+        return self.out
+
+
+class TestRunStage:
+
+    def test_second_run_is_skipped(self, stage_files):
+        src, out = stage_files
+        fn = _Counter(out)
+        run_stage(_make_stage(src, out), fn)
+        assert run_stage(_make_stage(src, out), fn) == out
+        assert fn.calls == 1
+        assert manifest_path(out).exists()
+
+    def test_config_change_invalidates(self, stage_files):
+        src, out = stage_files
+        fn = _Counter(out)
+        run_stage(_make_stage(src, out), fn)
+        run_stage(_make_stage(src, out, alpha=2.0), fn)
+        assert fn.calls == 2
+
+    def test_input_change_invalidates(self, stage_files):
+        src, out = stage_files
+        fn = _Counter(out)
+        run_stage(_make_stage(src, out), fn)
+        pd.DataFrame({"x": [1, 2, 3, 4]}).to_parquet(src)
+        run_stage(_make_stage(src, out), fn)
+        assert fn.calls == 2
+
+    def test_hash_mode_ignores_touch(self, stage_files):
+        src, out = stage_files
+        fn = _Counter(out)
+        run_stage(_make_stage(src, out), fn, hash_inputs=True)
+        stat = src.stat()
+        os.utime(src, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        run_stage(_make_stage(src, out), fn, hash_inputs=True)
+        assert fn.calls == 1
+
+    def test_force_and_disabled_always_run(self, stage_files):
+        src, out = stage_files
+        fn = _Counter(out)
+        run_stage(_make_stage(src, out), fn)
+        run_stage(_make_stage(src, out), fn, force=True)
+        run_stage(_make_stage(src, out), fn, enabled=False)
+        assert fn.calls == 3
+
+    def test_missing_input_runs_stage(self, tmp_path):
+        out = tmp_path / "output.txt"
+        fn = _Counter(out)
+        stage = _make_stage(tmp_path / "absent.parquet", out)
+        run_stage(stage, fn)
+        run_stage(stage, fn)
+        assert fn.calls == 2
+
+
+class TestPipelineStages:
+
+    def test_switching_trainer_reruns_training(self, tmp_settings):
+        rng = np.random.default_rng(0)
+        n = 400
+        df = pd.DataFrame({
+            "canonical_name": "p",
+            "supermarket": rng.choice(["Tesco", "ASDA", "Aldi"], n),
+            "category": rng.choice(["fresh_food", "bakery"], n),
+            "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 20, n), unit="D"),
+            "price_lag_1d": rng.random(n) * 3,
+        })
+        df["prices"] = df["price_lag_1d"]
+        df.to_parquet(tmp_settings.data.processed_dir / "features.parquet", index=False)
+
+        calls = []
+        trainers = {"train": run_training, "train_streaming": run_streaming_training}
+
+        def train(name):
+            calls.append(name)
+            return trainers[name](tmp_settings)
+
+        for name in ["train", "train", "train_streaming", "train_streaming", "train", "train_streaming"]:
+            run_cached(tmp_settings, name, lambda name=name: train(name))
+
+        assert calls == ["train", "train_streaming", "train", "train_streaming"]
+
+    @pytest.mark.parametrize("name", ["precompute", "shap_interactions"])
+    def test_registry_rollback_invalidates_model_consumers(self, trained_settings, name):
+        run_training(trained_settings)
+        before = stage_fingerprint(pipeline_stages(trained_settings)[name])
+        ModelRegistry(trained_settings.model.registry_dir).rollback()
+        assert stage_fingerprint(pipeline_stages(trained_settings)[name]) != before
+
+    def test_anomaly_stage_caches_without_price_events(self, tmp_settings):
+        pd.DataFrame({"x": [1, 2]}).to_parquet(tmp_settings.data.processed_dir / "features.parquet")
+        fn = _Counter(tmp_settings.data.processed_dir / "anomalies_flagged.parquet")
+        run_cached(tmp_settings, "anomaly", fn)
+        run_cached(tmp_settings, "anomaly", fn)
+        assert fn.calls == 1
+
+        tmp_settings.market_dynamics.output_dir.mkdir(parents=True)
+        pd.DataFrame({"x": [1]}).to_parquet(tmp_settings.market_dynamics.output_dir / "price_events.parquet")
+        run_cached(tmp_settings, "anomaly", fn)
+        assert fn.calls == 2
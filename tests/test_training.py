@@ -0,0 +1,125 @@
+"""Tests for the native categorical training path."""
+
+from __future__ import annotations
+
+import dataclasses
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricepoint.registry import load_current_model
+from pricepoint.streaming import build_streaming_datasets
+from pricepoint.training import (
+    NativeDataset,
+    booster_metrics,
+    build_native_dataset,
+    dataset_params,
+    encode_categorical,
+    run_training,
+    train_booster,
+)
+
+LGBM_PARAMS = {
+    "objective": "mae",
+    "n_estimators": 20,
+    "learning_rate": 0.1,
+    "num_leaves": 7,
+    "min_child_samples": 5,
+    "verbose": -1,
+}
+
+
+@pytest.fixture
+def feature_df() -> pd.DataFrame:
+    """Synthetic feature data with two categoricals and a missing target."""
+    rng = np.random.default_rng(1)
+    n = 600
+    df = pd.DataFrame({
+        "canonical_name": rng.choice(["bananas", "milk", "bread"], n),
+        "supermarket": rng.choice(["Tesco", "ASDA", "Aldi"], n),
+        "category": rng.choice(["fresh_food", "bakery"], n),
+        "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 30, n), unit="D"),
+        "price_lag_1d": rng.random(n) * 3,
+        "price_rank": rng.integers(1, 4, n).astype(float),
+    })
+    df["prices"] = df["price_lag_1d"] + (df["supermarket"] == "Aldi") * -0.5
+    df.loc[0, "prices"] = np.nan
+    return df
+
+
+class TestNativeDataset:
+
+    def test_encode_categorical_unseen_is_nan(self):
+        codes = encode_categorical(pd.Series(["ASDA", "Lidl", None]), ["ASDA", "Tesco"])
+        assert codes[0] == 0
+        assert np.isnan(codes[1]) and np.isnan(codes[2])
+
+    def test_build_excludes_non_features(self, feature_df):
+        native = build_native_dataset(feature_df, ["supermarket", "category"], dataset_params(LGBM_PARAMS))
+        assert "canonical_name" not in native.feature_names
+        assert "prices" not in native.feature_names
+        assert native.categorical_features == ["supermarket", "category"]
+        assert native.dataset.num_data() == len(feature_df) - 1
+
+    def test_split_is_by_date(self, feature_df):
+        native = build_native_dataset(feature_df, ["supermarket"], dataset_params(LGBM_PARAMS))
+        train_set, valid_set = native.split(test_days=7)
+        n_valid = (native.dates > native.dates.max() - np.timedelta64(7, "D")).sum()
+        assert valid_set.construct().num_data() == n_valid
+        assert train_set.construct().num_data() + n_valid == native.dataset.num_data()
+
+    def test_binary_cache_roundtrip_trains(self, feature_df, tmp_path):
+        params = dataset_params(LGBM_PARAMS)
+        build_native_dataset(feature_df, ["supermarket", "category"], params).save(tmp_path)
+
+        native = NativeDataset.load(tmp_path, params)
+        assert native.categories["supermarket"] == ["ASDA", "Aldi", "Tesco"]
+        train_set, valid_set = native.split(test_days=7)
+        booster, evals = train_booster(train_set, valid_set, LGBM_PARAMS)
+        metrics = booster_metrics(evals, valid_set)
+
+        assert booster.num_trees() == LGBM_PARAMS["n_estimators"]
+        assert set(metrics) == {"MAE", "RMSE", "R2"}
+        assert metrics["MAE"] < 0.5
+
+    def test_native_model_is_a_separate_text_artifact(self, feature_df, tmp_settings):
+        tmp_settings.training = dataclasses.replace(tmp_settings.training, native_categorical=True)
+        feature_df.to_parquet(tmp_settings.data.processed_dir / "features.parquet", index=False)
+
+        path = run_training(tmp_settings)
+        assert path == tmp_settings.model.native_model_path and path.suffix == ".txt"
+        assert not tmp_settings.model.model_path.exists()
+
+        # Without a registry the text model is loaded with its schema sidecar.
+        shutil.rmtree(tmp_settings.model.registry_dir)
+        booster, schema = load_current_model(tmp_settings)
+        assert schema["categorical_features"] == ["supermarket", "category"]
+        assert booster.num_trees() == tmp_settings.model.lgbm_params["n_estimators"]
+
+
+class TestStreamingDatasets:
+
+    @pytest.mark.parametrize("partitioned", [False, True])
+    def test_matches_in_memory_split(self, feature_df, tmp_path, partitioned):
+        path = tmp_path / "features"
+        if partitioned:
+            feature_df.to_parquet(path, partition_cols=["category"], index=False)
+        else:
+            path = path.with_suffix(".parquet")
+            feature_df.to_parquet(path, index=False)
+
+        train_set, valid_set, schema = build_streaming_datasets(
+            path, ["supermarket", "category"], LGBM_PARAMS, 7, tmp_path / "spill", batch_rows=64
+        )
+        native = build_native_dataset(feature_df, ["supermarket", "category"], dataset_params(LGBM_PARAMS))
+        native_train, native_valid = native.split(test_days=7)
+
+        assert train_set.num_data() == native_train.construct().num_data()
+        assert valid_set.num_data() == native_valid.construct().num_data()
+        assert schema["categories"] == native.categories
+        assert not any((tmp_path / "spill").iterdir())
+
+        _, evals = train_booster(train_set, valid_set, LGBM_PARAMS)
+        assert booster_metrics(evals, valid_set)["MAE"] < 0.5
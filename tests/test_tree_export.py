@@ -0,0 +1,83 @@
+"""Parity tests for the flat-array tree evaluator."""
+
+from __future__ import annotations
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricepoint.tree_export import export_booster
+
+
+@pytest.fixture
+def data() -> tuple[np.ndarray, np.ndarray]:
+    """Numeric features with NaNs and exact zeros, plus a categorical code column."""
+    rng = np.random.default_rng(0)
+    n = 2000
+    X = rng.random((n, 6))
+    X[:, 2] = rng.integers(0, 6, n)
+    X[:, 3] = np.where(rng.random(n) < 0.3, 0.0, X[:, 3])
+    X[rng.random((n, 6)) < 0.05] = np.nan
+    y = 2 * np.nan_to_num(X[:, 0]) + np.nan_to_num(X[:, 2]) + np.nan_to_num(X[:, 3]) + 1
+    return X, y
+
+
+def _probe(X: np.ndarray) -> np.ndarray:
+    """Held-out rows plus unseen/negative category codes."""
+    probe = X[:300].copy()
+    probe[:10, 2] = [7, 99, -1, np.nan, 0, 5, 3.0, 1, 2, 4]
+    return probe.astype(np.float32)
+
+
+class TestFlatForest:
+
+    def test_sklearn_model_matches_predict(self, data):
+        X, y = data
+        frame = pd.DataFrame(X, columns=[f"f{i}" for i in range(X.shape[1])])
+        model = lgb.LGBMRegressor(n_estimators=80, num_leaves=15, verbose=-1).fit(frame, y)
+        forest = export_booster(model)
+        probe = _probe(X)
+
+        expected = model.predict(pd.DataFrame(probe, columns=frame.columns))
+        np.testing.assert_allclose(forest.predict(probe), expected, rtol=1e-9, atol=1e-9)
+        assert forest.feature_names == list(frame.columns)
+
+    @pytest.mark.parametrize("params", [
+        {"objective": "mae"},
+        {"objective": "poisson"},
+        {"objective": "regression", "zero_as_missing": True},
+        {"objective": "regression", "boosting": "rf", "bagging_freq": 1, "bagging_fraction": 0.7},
+    ])
+    def test_native_categorical_booster_matches_predict(self, data, params):
+        X, y = data
+        booster = lgb.train(
+            {"num_leaves": 15, "min_data_in_leaf": 10, "verbose": -1, **params},
+            lgb.Dataset(X, y, categorical_feature=[2]),
+            num_boost_round=40,
+        )
+        forest = export_booster(booster)
+        probe = _probe(X)
+        np.testing.assert_allclose(forest.predict(probe), booster.predict(probe), rtol=1e-9, atol=1e-9)
+
+    def test_single_row_and_1d_input(self, data):
+        X, y = data
+        booster = lgb.train({"verbose": -1}, lgb.Dataset(X, y), num_boost_round=20)
+        forest = export_booster(booster)
+        row = _probe(X)[5]
+        assert forest.predict(row).shape == (1,)
+        np.testing.assert_allclose(forest.predict(row), booster.predict(row[None, :]), rtol=1e-9)
+
+    def test_exports_best_iteration(self, data):
+        X, y = data
+        train, valid = lgb.Dataset(X[:1500], y[:1500]), lgb.Dataset(X[1500:], y[1500:])
+        booster = lgb.train(
+            {"verbose": -1, "learning_rate": 0.5},
+            train,
+            num_boost_round=500,
+            valid_sets=[valid],
+            callbacks=[lgb.early_stopping(5, verbose=False)],
+        )
+        forest = export_booster(booster)
+        assert forest.n_trees == booster.best_iteration
+        np.testing.assert_allclose(forest.predict(X[:50]), booster.predict(X[:50]), rtol=1e-9)
@@ -0,0 +1,69 @@
+"""Tests for successive-halving hyperparameter search helpers."""
+
+from __future__ import annotations
+
+import time
+
+import lightgbm as lgb
+import numpy as np
+import yaml
+
+from pricepoint.config import DEFAULT_CONFIG_PATH, load_settings
+from pricepoint.training import train_booster
+from pricepoint.tuning import (
+    deadline_callback,
+    promote,
+    rung_schedule,
+    sample_params,
+    write_overlay,
+)
+
+SPACE = {
+    "learning_rate": {"low": 0.01, "high": 0.2, "log": True},
+    "num_leaves": {"low": 15, "high": 255, "log": True, "int": True},
+    "subsample_freq": {"choices": [0, 1]},
+}
+
+
+class TestTuning:
+
+    def test_sample_params_respects_space(self):
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            params = sample_params(SPACE, rng)
+            assert 0.01 <= params["learning_rate"] <= 0.2
+            assert isinstance(params["num_leaves"], int) and 15 <= params["num_leaves"] <= 255
+            assert params["subsample_freq"] in (0, 1)
+
+    def test_rung_schedule_is_capped(self):
+        assert rung_schedule(100, 2700, 3) == [100, 300, 900, 2700]
+        assert rung_schedule(100, 1000, 3) == [100, 300, 900, 1000]
+
+    def test_promote_keeps_best_fraction(self):
+        results = [{"trial": i, "MAE": mae} for i, mae in enumerate([0.3, 0.1, 0.2, 0.5, 0.4, 0.6])]
+        assert promote(results, eta=3) == [1, 2]
+        assert promote(results[:2], eta=3) == [1]
+
+    def test_overlay_is_merged_by_load_settings(self, tmp_path):
+        raw = yaml.safe_load(DEFAULT_CONFIG_PATH.read_text(encoding="utf-8"))
+        raw["overlays"] = ["tuned.yaml", "missing.yaml"]
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump(raw), encoding="utf-8")
+        write_overlay(tmp_path / "tuned.yaml", {"num_leaves": 63, "n_estimators": 420})
+
+        params = load_settings(config_path).model.lgbm_params
+        assert params["num_leaves"] == 63
+        assert params["n_estimators"] == 420
+        assert params["objective"] == raw["model"]["lgbm_params"]["objective"]
+
+    def test_deadline_stops_a_running_fit(self):
+        rng = np.random.default_rng(0)
+        X = rng.random((300, 3))
+        train_set = lgb.Dataset(X, X[:, 0] * 2, free_raw_data=False)
+        valid_set = lgb.Dataset(X[:50], X[:50, 0] * 2, reference=train_set)
+        params = {"objective": "mae", "num_leaves": 7, "verbose": -1}
+
+        booster, _ = train_booster(
+            train_set, valid_set, params, callbacks=[deadline_callback(time.time() - 1)], num_boost_round=500
+        )
+        assert booster.current_iteration() == 1